@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, Response
 from app.dependencies import get_db, get_current_user
 from app.db.repository import UserRepository
+import logging
 import os
 import requests
 from app.db.models import User as DBUser
@@ -9,8 +10,10 @@ from fastapi.responses import RedirectResponse
 import urllib.parse
 from dotenv import load_dotenv
 from app.core.jwt import issue_tokens, set_auth_cookies, clear_auth_cookies
+from app.core import tracing
 
 load_dotenv()
+logger = logging.getLogger("dreamscope.auth")
 router = APIRouter()
 
 
@@ -68,7 +71,7 @@ def google_callback(
     redirect_uri = (
         os.getenv("GOOGLE_REDIRECT_URI") or "http://localhost:8000/auth/google/callback"
     )
-    print("redirect_uri: ", redirect_uri)
+    logger.debug("google callback redirect_uri=%s", redirect_uri)
     if not client_id or not client_secret:
         raise HTTPException(
             status_code=500,
@@ -82,7 +85,9 @@ def google_callback(
         "grant_type": "authorization_code",
     }
 
-    r = requests.post(token_endpoint, data=data)
+    with tracing.client_span("POST", token_endpoint) as span:
+        r = requests.post(token_endpoint, data=data)
+        span.set_attribute("http.response.status_code", r.status_code)
     if r.status_code != 200:
         raise HTTPException(
             status_code=400, detail=f"Google token exchange failed: {r.text}"
@@ -94,7 +99,9 @@ def google_callback(
 
     userinfo_endpoint = "https://www.googleapis.com/oauth2/v2/userinfo"
     headers = {"Authorization": f"Bearer {access_token}"}
-    userinfo_resp = requests.get(userinfo_endpoint, headers=headers)
+    with tracing.client_span("GET", userinfo_endpoint) as span:
+        userinfo_resp = requests.get(userinfo_endpoint, headers=headers)
+        span.set_attribute("http.response.status_code", userinfo_resp.status_code)
     if userinfo_resp.status_code != 200:
         raise HTTPException(status_code=400, detail="Google user info fetch failed")
 
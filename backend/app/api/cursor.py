@@ -0,0 +1,31 @@
+"""
+키셋(keyset) 페이지네이션 커서
+- 마지막으로 본 행의 정렬 키(예: updated_at, id)를 불투명한 문자열로 인코딩
+- OFFSET과 달리 깊은 페이지도 인덱스에서 바로 이어 읽고, 중간에 행이 추가돼도 중복/누락이 없음
+"""
+
+import base64
+from datetime import datetime
+
+import orjson
+from fastapi import HTTPException
+
+
+def encode_cursor(*values) -> str:
+    """Opaque cursor for the sort key of the last item on a page."""
+    raw = orjson.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """Parse a cursor back into values of `types`; 400 on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = orjson.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError(cursor)
+        return tuple(
+            datetime.fromisoformat(v) if t is datetime else t(v) for t, v in zip(types, values)
+        )
+    except (ValueError, TypeError, orjson.JSONDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
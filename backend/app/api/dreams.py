@@ -1,60 +1,104 @@
-from fastapi import APIRouter, Body, Depends, HTTPException, Response
-from app.dependencies import get_db, get_current_user
+import logging
+from typing import List, Literal
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from app.dependencies import (
+    get_db,
+    get_current_user,
+    idempotency_key,
+    llm_admission,
+    run_idempotent,
+)
+from app.core.idempotency import fingerprint
 from datetime import datetime
 from sqlalchemy.orm import Session
+from app.db.base import session_scope
 from app.db.repository import (
+    ArchiveRepository,
     DreamRepository,
+    DreamCardRepository,
     TagRepository,
     CommentRepository,
 )
 from app.db.models import Comment as DBComment, User as DBUser
 from app.api.serializers import (
+    card_dicts,
+    comment_dicts,
+    serialize_card,
     serialize_dream,
-    serialize_dreams,
     serialize_comment,
-    serialize_comments,
 )
 from app.api.schema import (
+    Comment as CommentSchema,
     Dream as DreamSchema,
     DreamListResponse,
-    Tag as TagSchema,
+    RelatedDream,
 )
-from app.core.llm import dream_graph
+from app.api.tags import iter_all_dream_tags
+from app.core import outbox, pubsub, related, tracing
+from app.core.pipeline import get_dream_graph
+
+logger = logging.getLogger("dreamscope.dreams")
 
 router = APIRouter()
+# LLM을 호출하는 라우트는 별도 라우터로 분리 (read-only 프로필에서는 마운트하지 않음)
+llm_router = APIRouter()
 
 
-@router.post("/")
+class ModerationRejected(Exception):
+    def __init__(self, verdict: dict):
+        super().__init__(verdict.get("reason"))
+        self.verdict = verdict
+
+
+@llm_router.post("/", dependencies=[Depends(llm_admission)])
 def create_dream(
     content: str = Body(..., embed=True),
     db: Session = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
+    idem_key: str | None = Depends(idempotency_key),
 ):
-    """Create a dream using LangGraph pipeline with memory load/save."""
-    dream_repo = DreamRepository(db)
-    tag_repo = TagRepository(db)
-    try:
-        existing_tags_str = "\n".join([t.name for t in tag_repo.get_all()])
-        result_state = dream_graph.invoke(
-            {
-                "dream_text": content,
-                "existing_tags": existing_tags_str,
-                "user_id": current_user.id,
-                "db": db,
-            }
-        )
-        dream_id = result_state.get("saved_dream_id")
-        if not dream_id:
-            raise RuntimeError("LangGraph did not return saved_dream_id")
-        dream = dream_repo.get(dream_id)
-        if not dream:
-            raise RuntimeError("Dream not found after graph save")
-    except Exception as e:
-        import traceback
+    """Create a dream using LangGraph pipeline with memory load/save.
+
+    Retries carrying the same Idempotency-Key get the first result back
+    instead of running the graph again. Input rejected by the local
+    pre-filter answers 422 (409 for a near-duplicate of a recent dream)
+    without calling the LLM.
+    """
+
+    def run():
+        dream_repo = DreamRepository(db)
+        try:
+            with tracing.start_span("dream_graph", attributes={"enduser.id": current_user.id}):
+                result_state = get_dream_graph().invoke(
+                    {
+                        "dream_text": content,
+                        "user_id": current_user.id,
+                    }
+                )
+            verdict = result_state.get("moderation") or {}
+            if verdict.get("verdict") not in (None, "ok"):
+                raise ModerationRejected(verdict)
+            dream_id = result_state.get("saved_dream_id")
+            if not dream_id:
+                raise RuntimeError("LangGraph did not return saved_dream_id")
+            dream = dream_repo.get(dream_id)
+            if not dream:
+                raise RuntimeError("Dream not found after graph save")
+        except ModerationRejected as e:
+            raise HTTPException(
+                status_code=409 if e.verdict["verdict"] == "duplicate" else 422,
+                detail=e.verdict,
+            )
+        except Exception as e:
+            logger.exception("dream graph failed for user %s", current_user.id)
+            raise HTTPException(status_code=500, detail=str(e))
+        return serialize_dream(dream).model_dump(mode="json")
 
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
-    return serialize_dream(dream)
+    return run_idempotent(idem_key, run, fingerprint(content))
 
 
 @router.get("/", response_model=DreamListResponse)
@@ -62,57 +106,147 @@ def get_dreams(
     tags: str | None = None,
     page: int = 1,
     limit: int = 10,
-    response: Response = None,
+    sort: Literal["recent", "discussed", "active"] = "recent",
+    match: Literal["any", "all"] = "any",
+    exclude: str | None = None,
     db: Session = Depends(get_db),
 ):
-    """List dreams ordered by newest first.
+    """List dreams, newest first by default.
 
-    Supports optional comma-separated tag names via `tags`.
+    Supports optional comma-separated tag names via `tags` (`match=any`
+    for any of them, `match=all` for every one), tags to leave out via
+    `exclude`, and `sort=discussed` (most comments) or `sort=active`
+    (latest comment).
     """
     dream_repo = DreamRepository(db)
+    card_repo = DreamCardRepository(db)
     tag_repo = TagRepository(db)
 
-    tag_list: list[str] | None = None
-    if tags:
-        # parse comma-separated names, normalize and dedupe
-        parts = [p.strip().lower() for p in tags.split(",")]
-        tag_list = sorted({p for p in parts if p})
+    def parse(value: str | None) -> list[str] | None:
+        if not value:
+            return None
+        # parse comma-separated names, resolve variants/aliases to canonical names
+        # unknown names stay as-is: they match nothing and exclude nothing
+        names = set()
+        for part in {p.strip().lower() for p in value.split(",")} - {""}:
+            tag = tag_repo.resolve(part)
+            names.add(tag.name if tag else part)
+        return sorted(names) or None
+
+    tag_list = parse(tags)
+    exclude_list = parse(exclude)
 
-    total = dream_repo.count_advanced(tag_list)
-    dreams = dream_repo.search_advanced_page(tag_list, page, limit) if total else []
+    total = dream_repo.count_advanced(tag_list, match, exclude_list)
+    rows = (
+        card_repo.get_page_rows(tag_list, page, limit, sort, match, exclude_list)
+        if total
+        else []
+    )
 
-    selected_tags: list[TagSchema] | None = None
+    selected_tags: list[dict] | None = None
     if tag_list:
         # Resolve selected tag names to objects (including description)
         tags_objs = tag_repo.get_by_names(tag_list)
-        selected_tags = [
-            TagSchema(name=t.name, description=t.description) for t in tags_objs
-        ]
-    if response is not None:
-        try:
-            response.headers["X-Total-Count"] = str(total)
-        except Exception:
-            pass
-    return DreamListResponse(
-        dreams=serialize_dreams(dreams), selected_tags=selected_tags
+        selected_tags = [{"name": t.name, "description": t.description} for t in tags_objs]
+    # 행 -> dict -> orjson 바이트로 바로 응답 (response_model 재검증/인코딩 생략, 문서용으로만 유지)
+    return ORJSONResponse(
+        {"dreams": card_dicts(rows), "selected_tags": selected_tags},
+        headers={"X-Total-Count": str(total)},
     )
 
 
 @router.get("/{dream_id}", response_model=DreamSchema)
 def get_dream(dream_id: int, db: Session = Depends(get_db)):
-    dream_repo = DreamRepository(db)
-    d = dream_repo.get(dream_id)
-    if not d:
+    card = DreamCardRepository(db).get(dream_id)
+    if not card:
+        # 보관된 꿈은 핫 테이블에서 빠졌지만 id로는 계속 열람 가능
+        archived = ArchiveRepository(db).get(dream_id)
+        if archived is None:
+            raise HTTPException(status_code=404, detail="Dream not found")
+        return ORJSONResponse(archived["dream"])
+    return serialize_card(card)
+
+
+@router.get("/{dream_id}/related", response_model=List[RelatedDream])
+def get_related_dreams(
+    dream_id: int,
+    limit: int = Query(default=6, ge=1, le=related.RELATED_RERANK),
+    db: Session = Depends(get_db),
+):
+    """Dreams similar to this one: shared tags (IDF-weighted) blended with text similarity."""
+    card_repo = DreamCardRepository(db)
+    if card_repo.get(dream_id) is None:
         raise HTTPException(status_code=404, detail="Dream not found")
-    return serialize_dream(d)
+    related.ensure_fresh(iter_all_dream_tags, TagRepository(db).iter_dream_tags)
+
+    def load_texts(ids: list[int]) -> dict[int, str]:
+        return {
+            i: " ".join(filter(None, [c.summary, c.content]))
+            for i, c in card_repo.get_many(ids).items()
+        }
+
+    ranked = related.related_dreams(dream_id, limit, load_texts)
+    cards = card_repo.get_many([i for i, _ in ranked])
+    return [
+        RelatedDream(**serialize_card(cards[i]).model_dump(), score=score)
+        for i, score in ranked
+        if i in cards
+    ]
 
 
 # 댓글
-@router.get("/{dream_id}/comments")
+def comment_channel(dream_id: int) -> str:
+    return f"dream:{dream_id}:comments"
+
+
+def publish_comment_event(dream_id: int, event_type: str, **payload) -> None:
+    """Send a comment delta to subscribers of the dream's comment stream (after commit)."""
+    pubsub.publish(comment_channel(dream_id), {"type": event_type, "dream_id": dream_id, **payload})
+
+
+@router.get("/{dream_id}/comments", response_model=List[CommentSchema])
 def get_comments(dream_id: int, db: Session = Depends(get_db)):
     comment_repo = CommentRepository(db)
-    comments = comment_repo.get_for_dream(dream_id)
-    return serialize_comments(comments)
+    rows = comment_repo.get_rows_for_dream(dream_id)
+    if not rows:
+        archived = ArchiveRepository(db).get(dream_id)
+        if archived is not None:
+            return ORJSONResponse(archived["comments"])
+    return ORJSONResponse(comment_dicts(rows))
+
+
+def _dream_exists(dream_id: int) -> bool:
+    with session_scope() as db:
+        return DreamCardRepository(db).get(dream_id) is not None
+
+
+@router.get("/{dream_id}/comments/stream")
+async def stream_comments(
+    dream_id: int,
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
+):
+    """Server-sent events with comment deltas for one dream.
+
+    - Events: comment.created / comment.updated (payload `comment`),
+      comment.deleted (payload `id`, replies go with it), and `resync`
+      when the client should re-fetch GET /comments and reconnect.
+    - EventSource reconnects with Last-Event-ID and receives what it missed.
+    """
+    if not await run_in_threadpool(_dream_exists, dream_id):
+        raise HTTPException(status_code=404, detail="Dream not found")
+    try:
+        sub = pubsub.hub.subscribe(comment_channel(dream_id))
+    except pubsub.TooManySubscribers:
+        raise HTTPException(
+            status_code=503, detail="Too many live streams", headers={"Retry-After": "5"}
+        )
+    since = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    return StreamingResponse(
+        pubsub.sse_stream(sub, since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(sub.close),
+    )
 
 
 @router.post("/{dream_id}/comments")
@@ -121,17 +255,23 @@ def create_comment(
     content: str = Body(..., embed=True),
     db: Session = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
+    idem_key: str | None = Depends(idempotency_key),
 ):
-    comment_repo = CommentRepository(db)
-    c = DBComment(
-        dream_id=dream_id,
-        content=content,
-        parent_id=None,
-        user_id=current_user.id,
-        created_at=datetime.utcnow(),
-    )
-    c = comment_repo.create(c)
-    return serialize_comment(c)
+    def run():
+        comment_repo = CommentRepository(db)
+        c = DBComment(
+            dream_id=dream_id,
+            content=content,
+            parent_id=None,
+            user_id=current_user.id,
+            created_at=datetime.utcnow(),
+        )
+        c = comment_repo.create(c)
+        result = serialize_comment(c).model_dump(mode="json")
+        publish_comment_event(dream_id, "comment.created", comment=result)
+        return result
+
+    return run_idempotent(idem_key, run, fingerprint(dream_id, content))
 
 
 @router.post("/{dream_id}/comments/{comment_id}")
@@ -146,7 +286,9 @@ def update_comment(
     if not existing or existing.dream_id != dream_id:
         raise HTTPException(status_code=404, detail="Comment not found")
     updated = comment_repo.update_content(comment_id, content)
-    return serialize_comment(updated)
+    result = serialize_comment(updated)
+    publish_comment_event(dream_id, "comment.updated", comment=result.model_dump(mode="json"))
+    return result
 
 
 @router.delete("/{dream_id}/comments/{comment_id}")
@@ -156,6 +298,7 @@ def delete_comment(dream_id: int, comment_id: int, db: Session = Depends(get_db)
     if not c or c.dream_id != dream_id:
         raise HTTPException(status_code=404, detail="Comment not found")
     comment_repo.delete(c)
+    publish_comment_event(dream_id, "comment.deleted", id=comment_id)
     return {"ok": True}
 
 
@@ -167,17 +310,25 @@ def create_reply(
     content: str = Body(..., embed=True),
     db: Session = Depends(get_db),
     current_user: DBUser = Depends(get_current_user),
+    idem_key: str | None = Depends(idempotency_key),
 ):
-    comment_repo = CommentRepository(db)
-    parent = comment_repo.get(comment_id)
-    if not parent or parent.dream_id != dream_id:
-        raise HTTPException(status_code=404, detail="Parent comment not found")
-    c = DBComment(
-        dream_id=dream_id,
-        content=content,
-        parent_id=comment_id,
-        user_id=current_user.id,
-        created_at=datetime.utcnow(),
-    )
-    c = comment_repo.create(c)
-    return serialize_comment(c)
+    def run():
+        comment_repo = CommentRepository(db)
+        parent = comment_repo.get(comment_id)
+        if not parent or parent.dream_id != dream_id:
+            raise HTTPException(status_code=404, detail="Parent comment not found")
+        c = DBComment(
+            dream_id=dream_id,
+            content=content,
+            parent_id=comment_id,
+            user_id=current_user.id,
+            created_at=datetime.utcnow(),
+        )
+        c = comment_repo.create(c)
+        # 알림은 같은 트랜잭션에 아웃박스로 남겼으므로 디스패처만 깨움
+        outbox.dispatcher.notify()
+        result = serialize_comment(c).model_dump(mode="json")
+        publish_comment_event(dream_id, "comment.created", comment=result)
+        return result
+
+    return run_idempotent(idem_key, run, fingerprint(dream_id, comment_id, content))
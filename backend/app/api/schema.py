@@ -19,6 +19,18 @@ class Tag(BaseModel):
         return DBTag(name=self.name, description=self.description)
 
 
+class TagTrend(BaseModel):
+    name: str
+    score: float
+    dream_count: int
+
+
+class RelatedTag(BaseModel):
+    name: str
+    co_count: int
+    score: float
+
+
 class Dream(BaseModel):
     id: int
     user_id: int
@@ -29,6 +41,13 @@ class Dream(BaseModel):
     created_at: datetime
     author_name: str
     author_avatar_url: str
+    comment_count: int = 0
+    reply_count: int = 0
+    last_activity_at: datetime | None = None
+
+
+class RelatedDream(Dream):
+    score: float
 
 
 class DreamCreate(BaseModel):
@@ -41,6 +60,11 @@ class DreamListResponse(BaseModel):
     selected_tags: List[Tag] | None = None
 
 
+class DreamHistoryPage(BaseModel):
+    dreams: List[Dream]
+    next_cursor: str | None = None
+
+
 class DreamInterpretation(BaseModel):
     summary: str
     tags: List[Tag]
@@ -56,3 +80,27 @@ class Comment(BaseModel):
     user_id: int
     user_name: str
     user_avatar_url: str
+
+
+class InboxActor(BaseModel):
+    id: int
+    name: str | None = None
+
+
+class InboxItem(BaseModel):
+    id: int
+    kind: str
+    dream_id: int | None = None
+    count: int
+    comment_ids: List[int] = []
+    actors: List[InboxActor] = []
+    preview: str | None = None
+    created_at: datetime
+    updated_at: datetime
+    read_at: datetime | None = None
+
+
+class InboxPage(BaseModel):
+    items: List[InboxItem]
+    next_cursor: str | None = None
+    unread_count: int
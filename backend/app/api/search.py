@@ -1,22 +1,35 @@
-from fastapi import APIRouter, Depends
+import os
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List
 from app.dependencies import get_db
-from app.db.repository import DreamRepository, UserRepository
-from app.api.serializers import serialize_dreams
+from app.db.repository import DreamCardRepository
+from app.api.serializers import card_dicts
 from app.api.schema import Dream as DreamSchema
 
+# 질의어 중 이 비율 이상을 포함한 꿈만 결과에 포함
+SEARCH_MIN_MATCH = float(os.getenv("SEARCH_MIN_MATCH", "0.5"))
+# 이 비율보다 많은 꿈에 나오는 질의어는 (더 드문 질의어가 있으면) 순위 계산에서 제외
+SEARCH_MAX_DF_RATIO = float(os.getenv("SEARCH_MAX_DF_RATIO", "0.5"))
+
 router = APIRouter()
 
 
 @router.get("/", response_model=List[DreamSchema])
-def search(q: str = "", db: Session = Depends(get_db)):
+def search(
+    q: str = "",
+    limit: int = Query(default=50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    """Dreams matching `q`, most relevant first.
+
+    The query goes through the same Korean/English analyzer as the index,
+    so inflected forms match ("떨어지는" finds "떨어졌다", "falling" finds "falls").
+    """
     q = (q or "").strip()
     if not q:
-        return []
-    dream_repo = DreamRepository(db)
-    user_repo = UserRepository(db)
-    dreams = dream_repo.search_like(q)
-    user_ids = list({d.user_id for d in dreams})
-    users = user_repo.get_by_ids(user_ids)
-    return serialize_dreams(dreams, users)
\ No newline at end of file
+        return ORJSONResponse([])
+    rows = DreamCardRepository(db).search_rows(q, limit, SEARCH_MIN_MATCH, SEARCH_MAX_DF_RATIO)
+    return ORJSONResponse(card_dicts(rows))
@@ -1,5 +1,10 @@
-from typing import List
-from app.db.models import Dream as DBDream, Comment as DBComment
+from typing import Any, List
+from app.db.models import (
+    Dream as DBDream,
+    DreamCard as DBDreamCard,
+    Comment as DBComment,
+    Notification as DBNotification,
+)
 from app.api.schema import Dream, Comment, Tag as TagSchema
 
 
@@ -18,6 +23,9 @@ def serialize_dream(dream: DBDream) -> Dream:
         created_at=dream.created_at,
         author_name=dream.user.name(),
         author_avatar_url=dream.user.picture,
+        comment_count=dream.comment_count or 0,
+        reply_count=dream.reply_count or 0,
+        last_activity_at=dream.last_activity_at,
     )
 
 
@@ -25,6 +33,28 @@ def serialize_dreams(dreams: List[DBDream]) -> List[Dream]:
     return [serialize_dream(d) for d in dreams]
 
 
+def serialize_card(card: DBDreamCard) -> Dream:
+    """Serialize a prerendered feed card; no relationship loads."""
+    return Dream(
+        id=card.dream_id,
+        user_id=card.user_id,
+        content=card.content,
+        summary=card.summary,
+        analysis=card.analysis,
+        tags=[TagSchema(**t) for t in (card.tags or [])],
+        created_at=card.created_at,
+        author_name=card.author_name,
+        author_avatar_url=card.author_avatar_url,
+        comment_count=card.comment_count,
+        reply_count=card.reply_count,
+        last_activity_at=card.last_activity_at,
+    )
+
+
+def serialize_cards(cards: List[DBDreamCard]) -> List[Dream]:
+    return [serialize_card(c) for c in cards]
+
+
 def serialize_comment(c: DBComment) -> Comment:
     return Comment(
         id=c.id,
@@ -40,3 +70,64 @@ def serialize_comment(c: DBComment) -> Comment:
 
 def serialize_comments(comments: List[DBComment]) -> List[Comment]:
     return [serialize_comment(c) for c in comments]
+
+
+# 목록 엔드포인트용 빠른 경로: pydantic 모델을 거치지 않고 행에서 바로 dict를 만들어
+# ORJSONResponse로 인코딩한다. 키와 값 형태는 위 스키마(Dream, Comment)와 같다.
+
+
+def card_dict(card: Any) -> dict:
+    """Dream schema dict from a DreamCard or a dream_cards column row."""
+    return {
+        "id": card.dream_id,
+        "user_id": card.user_id,
+        "content": card.content,
+        "summary": card.summary,
+        "analysis": card.analysis,
+        "tags": card.tags or [],
+        "created_at": card.created_at,
+        "author_name": card.author_name,
+        "author_avatar_url": card.author_avatar_url,
+        "comment_count": card.comment_count,
+        "reply_count": card.reply_count,
+        "last_activity_at": card.last_activity_at,
+    }
+
+
+def card_dicts(cards: List[Any]) -> List[dict]:
+    return [card_dict(c) for c in cards]
+
+
+def comment_dict(row: Any) -> dict:
+    """Comment schema dict from a CommentRepository.get_rows_for_dream row."""
+    return {
+        "id": row.id,
+        "dream_id": row.dream_id,
+        "content": row.content,
+        "created_at": row.created_at,
+        "parent_id": row.parent_id,
+        "user_id": row.user_id,
+        "user_name": f"{row.given_name} {row.family_name}",
+        "user_avatar_url": row.picture,
+    }
+
+
+def comment_dicts(rows: List[Any]) -> List[dict]:
+    return [comment_dict(r) for r in rows]
+
+
+def notification_dict(n: DBNotification) -> dict:
+    """InboxItem schema dict; the coalesced payload is flattened into the item."""
+    payload = n.payload or {}
+    return {
+        "id": n.id,
+        "kind": n.kind,
+        "dream_id": n.dream_id,
+        "count": payload.get("count", 1),
+        "comment_ids": payload.get("comment_ids", []),
+        "actors": payload.get("actors", []),
+        "preview": payload.get("preview"),
+        "created_at": n.created_at,
+        "updated_at": n.updated_at,
+        "read_at": n.read_at,
+    }
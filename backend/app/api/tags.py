@@ -1,17 +1,19 @@
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal
 from app.dependencies import get_db
+from app.db.base import session_scope
 from app.db.repository import TagRepository
-from app.api.schema import Tag as TagSchema
+from app.api.schema import RelatedTag, Tag as TagSchema, TagTrend
+from app.core.tag_stats import tag_stats
 
 router = APIRouter()
 
 @router.get("/", response_model=List[str])
 def list_tags(db: Session = Depends(get_db)):
     repo = TagRepository(db)
-    tags = repo.get_all()
-    return [t.name for t in tags]
+    return ORJSONResponse(repo.get_names())
 
 
 @router.get("/meta", response_model=List[TagSchema])
@@ -27,5 +29,52 @@ def list_tag_meta(names: str | None = Query(default=None), db: Session = Depends
     cleaned = sorted({p for p in parts if p})
     if not cleaned:
         return []
-    tags = repo.get_by_names(cleaned)
+    tags = repo.get_by_names(repo.resolve_names(cleaned))
     return [TagSchema(name=t.name, description=getattr(t, "description", None)) for t in tags]
+
+
+def iter_all_dream_tags():
+    """Every live dream's tags from a session of its own (usable after the request ends)."""
+    with session_scope() as db:
+        yield from TagRepository(db).iter_dream_tags()
+
+
+def _fresh_tag_stats(db: Session):
+    """Load tag stats on first use, then catch up on other workers' dreams."""
+    tag_stats.ensure_fresh(iter_all_dream_tags, TagRepository(db).iter_dream_tags)
+    return tag_stats
+
+
+@router.get("/trending", response_model=List[TagTrend])
+def trending_tags(
+    window: Literal["24h", "7d", "all"] = "24h",
+    limit: int = Query(default=10, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """Tags ranked by time-decayed usage (`all`: total dream count)."""
+    stats = _fresh_tag_stats(db)
+    return ORJSONResponse(
+        [
+            {"name": name, "score": score, "dream_count": count}
+            for name, score, count in stats.trending(window, limit)
+        ]
+    )
+
+
+@router.get("/{name}/related", response_model=List[RelatedTag])
+def related_tags(
+    name: str,
+    limit: int = Query(default=10, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """Tags most often used together with `name` (Jaccard over dreams)."""
+    stats = _fresh_tag_stats(db)
+    tag = TagRepository(db).resolve(name)
+    if tag is None:
+        return ORJSONResponse([])
+    return ORJSONResponse(
+        [
+            {"name": other, "co_count": co, "score": score}
+            for other, co, score in stats.related(tag.name, limit)
+        ]
+    )
@@ -0,0 +1,169 @@
+import csv
+import io
+import os
+from typing import List, Literal
+
+import orjson
+from fastapi import APIRouter, Body, Depends, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.orm import Session
+from datetime import datetime
+
+from app.dependencies import get_db, get_current_user
+from app.db.base import session_scope
+from app.db.repository import DreamRepository, NotificationRepository
+from app.db.models import User as DBUser
+from app.api.cursor import decode_cursor, encode_cursor
+from app.api.serializers import notification_dict, serialize_dreams
+from app.api.schema import DreamHistoryPage, InboxPage
+
+# 내보내기: 서버 측 커서로 이만큼씩 읽고, 응답 버퍼가 이 크기를 넘으면 내보냄
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", "65536"))
+
+router = APIRouter()
+
+
+# 내 꿈 기록
+@router.get("/me/dreams", response_model=DreamHistoryPage)
+def get_my_dreams(
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user),
+):
+    """The current user's dreams, newest first, paged with `next_cursor`."""
+    before = decode_cursor(cursor, datetime, int) if cursor else None
+    dreams = DreamRepository(db).get_recent_for_user(current_user.id, limit + 1, before)
+    next_cursor = None
+    if len(dreams) > limit:
+        dreams = dreams[:limit]
+        next_cursor = encode_cursor(dreams[-1].created_at, dreams[-1].id)
+    return {"dreams": serialize_dreams(dreams), "next_cursor": next_cursor}
+
+
+def _export_record(dream, tags: list[str], comments) -> dict:
+    return {
+        "id": dream.id,
+        "created_at": dream.created_at,
+        "content": dream.content,
+        "summary": dream.summary,
+        "analysis": dream.analysis,
+        "tags": tags,
+        "comment_count": dream.comment_count,
+        "reply_count": dream.reply_count,
+        "last_activity_at": dream.last_activity_at,
+        "comments": [
+            {
+                "id": c.id,
+                "parent_id": c.parent_id,
+                "user_id": c.user_id,
+                "content": c.content,
+                "created_at": c.created_at,
+            }
+            for c in comments
+        ],
+    }
+
+
+def _export_ndjson(user_id: int):
+    with session_scope() as db:
+        buffer = bytearray()
+        for row in DreamRepository(db).iter_export_for_user(user_id, EXPORT_BATCH_SIZE):
+            buffer += orjson.dumps(_export_record(*row))
+            buffer += b"\n"
+            if len(buffer) >= EXPORT_CHUNK_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+
+CSV_COLUMNS = [
+    "id", "created_at", "content", "summary", "analysis", "tags",
+    "comment_count", "reply_count", "last_activity_at", "comments",
+]
+
+
+def _export_csv(user_id: int):
+    # 태그는 ';'로 잇고, 댓글 목록은 JSON 문자열 한 칸으로 넣음
+    with session_scope() as db:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(CSV_COLUMNS)
+        for row in DreamRepository(db).iter_export_for_user(user_id, EXPORT_BATCH_SIZE):
+            record = _export_record(*row)
+            record["tags"] = ";".join(record["tags"])
+            record["comments"] = orjson.dumps(record["comments"]).decode()
+            for key in ("created_at", "last_activity_at"):
+                record[key] = record[key].isoformat() if record[key] else ""
+            writer.writerow([record[c] for c in CSV_COLUMNS])
+            if out.tell() >= EXPORT_CHUNK_BYTES:
+                yield out.getvalue().encode()
+                out.seek(0)
+                out.truncate()
+        if out.tell():
+            yield out.getvalue().encode()
+
+
+@router.get("/me/dreams/export")
+def export_my_dreams(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: DBUser = Depends(get_current_user),
+):
+    """Download all of the current user's dreams with tags and comments.
+
+    Streamed in chunks straight from a DB cursor (oldest first), so the
+    size of the history does not matter.
+    """
+    # 스트리밍 중에는 요청 세션이 이미 닫혀 있으므로 생성기가 자기 세션을 엶
+    body = _export_ndjson(current_user.id) if format == "ndjson" else _export_csv(current_user.id)
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv; charset=utf-8"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="dreams-{current_user.id}.{format}"'
+        },
+    )
+
+
+# 알림함
+@router.get("/me/inbox", response_model=InboxPage)
+def get_inbox(
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    unread_only: bool = False,
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user),
+):
+    """Notifications for the current user, most recently updated first.
+
+    Pass `next_cursor` from the previous page as `cursor` to continue;
+    it is null on the last page.
+    """
+    repo = NotificationRepository(db)
+    after = decode_cursor(cursor, datetime, int) if cursor else None
+    rows = repo.get_page(current_user.id, limit + 1, after, unread_only)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].updated_at, rows[-1].id)
+    return ORJSONResponse(
+        {
+            "items": [notification_dict(n) for n in rows],
+            "next_cursor": next_cursor,
+            "unread_count": repo.unread_count(current_user.id),
+        }
+    )
+
+
+@router.post("/me/inbox/read")
+def mark_inbox_read(
+    ids: List[int] | None = Body(None, embed=True),
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_user),
+):
+    """Mark the given notifications (or all of them when `ids` is omitted) as read."""
+    updated = NotificationRepository(db).mark_read(current_user.id, ids)
+    return {"updated": updated}
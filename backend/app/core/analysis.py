@@ -0,0 +1,221 @@
+"""
+검색용 텍스트 분석기 (색인/질의에 같은 분석기를 사용)
+- 입력을 문자 체계(한글 / 라틴 / 그 밖의 문자)별 구간으로 나눠 구간마다 분석기를 적용
+  - 한글: 조사 -> 어미 -> 선어말어미(었/았/였/겠) 순서로 떼고 축약형을 되돌린 어간
+    ("떨어졌다", "떨어지는", "떨어졌는데" -> "떨어지") + 어간의 글자 2-gram (복합어/오분석 보완)
+  - 라틴: 소문자화, 불용어 제거, Porter 1단계 수준의 가벼운 어간 추출 ("falling" -> "fall")
+  - 그 밖(한자/가나 등): 글자 2-gram
+- 사전 없는 규칙 기반이라 과분석("바다" -> "바")이 있지만 색인과 질의가 같은 규칙을 쓰므로 일관됨
+- 형태소 분석기 등으로 바꾸려면 set_analyzer()로 교체 후 python -m app.db.reindex_search 실행
+"""
+
+import re
+import unicodedata
+from typing import Protocol
+
+MAX_TERM_LENGTH = 64
+
+_RUN_RE = re.compile(r"([가-힣]+)|([a-z0-9]+)|([^\W\d_a-z]+)", re.UNICODE)
+
+
+# --- 한국어 ---
+
+_HANGUL_BASE = 0xAC00
+_JONG_N, _JONG_L, _JONG_SS = 4, 8, 20
+_CHO_H = 18
+# ㅆ 받침을 뗄 때 되돌리는 모음 축약: ㅕ->ㅣ(지+었), ㅘ->ㅗ(보+았), ㅝ->ㅜ(꾸+었), ㅙ->ㅚ(되+었)
+_UNCONTRACT = {6: 20, 9: 8, 14: 13, 10: 11}
+
+# 받침 뒤에만 / 받침 없는 글자 뒤에만 오는 조사
+_JOSA_AFTER_CONSONANT = {"이", "은", "을", "과", "으로", "이랑", "으로는", "이나"}
+_JOSA_AFTER_VOWEL = {"가", "는", "를", "와", "로", "랑", "로는", "나"}
+_JOSA = sorted(
+    _JOSA_AFTER_CONSONANT
+    | _JOSA_AFTER_VOWEL
+    | {"에서는", "에게서", "에서", "에게", "한테", "까지", "부터", "처럼", "보다", "의", "에", "도", "만"},
+    key=len,
+    reverse=True,
+)
+_EOMI = sorted(
+    [
+        "었습니다", "았습니다", "였습니다", "습니다", "었어요", "았어요", "였어요", "었는데",
+        "았는데", "었지만", "았지만", "지만", "는데", "어요", "아요", "었다", "았다", "였다",
+        "었던", "았던", "었고", "았고", "면서", "어서", "아서", "니까", "다가", "으며", "는다",
+        "다", "고", "며", "던", "서", "면", "요", "는", "은", "을",
+    ],
+    key=len,
+    reverse=True,
+)
+_PAST = {"었", "았", "였", "겠"}
+
+
+def _decompose(syllable: str) -> tuple[int, int, int]:
+    code = ord(syllable) - _HANGUL_BASE
+    return code // 588, (code % 588) // 28, code % 28
+
+
+def _compose(cho: int, jung: int, jong: int) -> str:
+    return chr(_HANGUL_BASE + cho * 588 + jung * 28 + jong)
+
+
+def _strip_josa(word: str) -> str:
+    for josa in _JOSA:
+        if len(word) > len(josa) and word.endswith(josa):
+            has_final = _decompose(word[-len(josa) - 1])[2] != 0
+            if josa in _JOSA_AFTER_CONSONANT and not has_final:
+                continue
+            if josa in _JOSA_AFTER_VOWEL and has_final:
+                continue
+            return word[: -len(josa)]
+    return word
+
+
+def korean_stem(word: str) -> str:
+    """Rule-based stem of one Hangul word (particle, ending and tense marker removed)."""
+    word = _strip_josa(word)
+    for eomi in _EOMI:
+        if len(word) > len(eomi) and word.endswith(eomi):
+            word = word[: -len(eomi)]
+            break
+    if len(word) > 1 and word[-1] in _PAST:
+        word = word[:-1]
+    cho, jung, jong = _decompose(word[-1])
+    if jong == _JONG_SS:
+        # 떨어졌 -> 떨어지, 했 -> 하, 갔 -> 가
+        if jung == 1 and cho == _CHO_H:
+            jung = 0
+        word = word[:-1] + _compose(cho, _UNCONTRACT.get(jung, jung), 0)
+    elif jong in (_JONG_N, _JONG_L) and len(word) > 1:
+        # 관형형 ㄴ/ㄹ: 떨어진 -> 떨어지, 무서울 -> 무서우
+        word = word[:-1] + _compose(cho, jung, 0)
+    return word
+
+
+def bigrams(word: str) -> list[str]:
+    return [word[i : i + 2] for i in range(len(word) - 1)]
+
+
+class KoreanAnalyzer:
+    def analyze(self, run: str) -> list[str]:
+        stem = korean_stem(run)
+        terms = [stem]
+        if len(stem) > 2:
+            terms.extend(bigrams(stem))
+        elif len(stem) == 1 and len(run) > 1:
+            # 한 글자 어간은 겹치기 쉬우므로 조사만 뗀 형태도 남김 ("바다에서" -> "바", "바다")
+            surface = _strip_josa(run)
+            if surface != stem:
+                terms.append(surface)
+        return terms
+
+
+# --- 영어 ---
+
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by for from had has have he her his i in is it its "
+    "me my of on or our she so that the their them then there they this to was we were "
+    "with you your".split()
+)
+_VOWELS = frozenset("aeiou")
+
+
+def _has_vowel(stem: str) -> bool:
+    return any(ch in _VOWELS or (ch == "y" and i > 0) for i, ch in enumerate(stem))
+
+
+def _measure(stem: str) -> int:
+    # Porter의 m: 모음열 -> 자음열 전환 횟수
+    forms = "".join(
+        "v" if ch in _VOWELS or (ch == "y" and i > 0 and stem[i - 1] not in _VOWELS) else "c"
+        for i, ch in enumerate(stem)
+    )
+    return len(re.findall(r"v+c+", forms))
+
+
+def _ends_cvc(stem: str) -> bool:
+    if len(stem) < 3:
+        return False
+    a, b, c = stem[-3:]
+    return a not in _VOWELS and b in _VOWELS and c not in _VOWELS and c not in "wxy"
+
+
+def english_stem(word: str) -> str:
+    """Light Porter-style stem (plurals, -ed/-ing, -ly)."""
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    if word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("ies"):
+        word = word[:-3] + "y"
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    for suffix in ("ing", "ed"):
+        stem = word[: -len(suffix)]
+        if word.endswith(suffix) and len(stem) >= 2 and _has_vowel(stem):
+            if stem.endswith(("at", "bl", "iz")):
+                return stem + "e"
+            if len(stem) > 2 and stem[-1] == stem[-2] and stem[-1] not in "lsz":
+                return stem[:-1]
+            if _measure(stem) == 1 and _ends_cvc(stem):
+                return stem + "e"
+            return stem
+    if word.endswith("ly") and len(word) > 4:
+        return word[:-2]
+    return word
+
+
+class EnglishAnalyzer:
+    def analyze(self, run: str) -> list[str]:
+        if run in _STOPWORDS:
+            return []
+        return [english_stem(run)]
+
+
+class BigramAnalyzer:
+    """Fallback for scripts without word boundaries or rules here (CJK, kana, ...)."""
+
+    def analyze(self, run: str) -> list[str]:
+        return bigrams(run) if len(run) > 1 else [run]
+
+
+# --- 조합 ---
+
+
+class Analyzer(Protocol):
+    def analyze(self, text: str) -> list[str]:
+        """Return index/query terms for a text (duplicates kept, for term frequency)."""
+        ...
+
+
+class MixedAnalyzer:
+    """Splits text into Hangul / Latin+digit / other-script runs and analyzes each."""
+
+    def __init__(self, korean=None, english=None, other=None):
+        self.korean = korean or KoreanAnalyzer()
+        self.english = english or EnglishAnalyzer()
+        self.other = other or BigramAnalyzer()
+
+    def analyze(self, text: str) -> list[str]:
+        text = unicodedata.normalize("NFKC", text or "").casefold()
+        terms = []
+        for korean, latin, other in _RUN_RE.findall(text):
+            if korean:
+                terms.extend(self.korean.analyze(korean))
+            elif latin:
+                terms.extend(self.english.analyze(latin))
+            else:
+                terms.extend(self.other.analyze(other))
+        return [t[:MAX_TERM_LENGTH] for t in terms if t]
+
+
+_analyzer: Analyzer = MixedAnalyzer()
+
+
+def set_analyzer(analyzer: Analyzer) -> None:
+    """Replace the analyzer (then rebuild the index: python -m app.db.reindex_search)."""
+    global _analyzer
+    _analyzer = analyzer
+
+
+def analyze(text: str) -> list[str]:
+    return _analyzer.analyze(text)
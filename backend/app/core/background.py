@@ -0,0 +1,102 @@
+"""
+응답 이후에 처리해도 되는 작업(임베딩, 카운터, 캐시 워밍)을 위한 fire-and-forget 실행기
+- submit: 작업을 백그라운드 스레드 풀에 넘기고 즉시 반환
+- on_dream_saved: 꿈 저장 후 실행할 추가 후처리 훅 등록 (꿈을 저장한 파이프라인의 session_factory를 함께 받음)
+- on_dreams_removed: 꿈 삭제/보관 후 프로세스 캐시를 비우는 훅 등록 (가벼운 작업이라 호출한 스레드에서 바로 실행)
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.core import tracing
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", "2"))
+
+_executor = ThreadPoolExecutor(
+    max_workers=BACKGROUND_WORKERS, thread_name_prefix="dreamscope-bg"
+)
+
+_dream_saved_hooks: list[Callable[[int, Callable[[], Any]], None]] = []
+_dreams_removed_hooks: list[Callable[[list[int], set[int]], None]] = []
+
+_pending = 0
+_idle = threading.Condition()
+
+
+def _run(parent, fn: Callable, *args, **kwargs):
+    global _pending
+    try:
+        # 제출한 요청의 trace 아래에 이어 붙임 (요청 지표(RequestStats)는 넘기지 않음)
+        with tracing.start_span(f"background {getattr(fn, '__name__', fn)}", parent=parent):
+            return fn(*args, **kwargs)
+    except Exception:
+        logger.exception("background task %s failed", getattr(fn, "__name__", fn))
+    finally:
+        with _idle:
+            _pending -= 1
+            _idle.notify_all()
+
+
+def submit(fn: Callable, *args, **kwargs) -> Future:
+    """Run `fn` in the background; failures are logged, never raised to the caller."""
+    global _pending
+    with _idle:
+        _pending += 1
+    return _executor.submit(_run, tracing.current_span(), fn, *args, **kwargs)
+
+
+def on_dream_saved(
+    fn: Callable[[int, Callable[[], Any]], None],
+) -> Callable[[int, Callable[[], Any]], None]:
+    """Register a hook called with (dream id, session factory) after the dream is committed.
+
+    Hooks must read the dream through that session factory: the pipeline
+    that saved it may use a database other than the app default.
+    """
+    _dream_saved_hooks.append(fn)
+    return fn
+
+
+def dispatch_dream_saved(dream_id: int, session_factory: Callable[[], Any]) -> None:
+    """Schedule every registered hook for a saved dream, each as its own task."""
+    for hook in list(_dream_saved_hooks):
+        submit(hook, dream_id, session_factory)
+
+
+def on_dreams_removed(fn: Callable[[list[int], set[int]], None]) -> Callable[[list[int], set[int]], None]:
+    """Register a hook called with (dream ids, their user ids) after they are deleted or archived."""
+    _dreams_removed_hooks.append(fn)
+    return fn
+
+
+def dispatch_dreams_removed(dream_ids: list[int], user_ids: set[int]) -> None:
+    """Run every removal hook now, so the next request no longer sees the dreams."""
+    if not dream_ids:
+        return
+    for hook in list(_dreams_removed_hooks):
+        try:
+            hook(dream_ids, user_ids)
+        except Exception:
+            logger.exception("dreams-removed hook %s failed", getattr(hook, "__name__", hook))
+
+
+def drain(timeout: float) -> bool:
+    """Wait until every submitted task has finished; False if the deadline passed."""
+    deadline = time.monotonic() + timeout
+    with _idle:
+        while _pending > 0:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _idle.wait(remaining)
+    return True
+
+
+def shutdown(wait: bool = True) -> None:
+    _executor.shutdown(wait=wait)
@@ -0,0 +1,268 @@
+"""
+Idempotency-Key 처리
+- 같은 키로 들어온 재시도 요청은 원 요청의 결과(JSON 호환 값)를 그대로 돌려준다.
+- 원 요청이 아직 실행 중이면 중복 요청은 끝날 때까지 기다린 뒤(single-flight) 저장된 결과를 받는다.
+- 결과는 TTL 동안만 보관하며, 실패한 요청은 저장하지 않아 같은 키로 다시 시도할 수 있다.
+
+결과 저장소(IdempotencyStore)는 교체 가능하다.
+- 기본값(IDEMPOTENCY_STORE=db)은 idempotency_keys 테이블: 실행 전에 키를 예약(INSERT, PK 충돌 = 다른 워커가 실행 중)하고
+  끝나면 결과를 기록하므로, 타임아웃 재시도가 다른 워커로 가도 그래프가 두 번 돌지 않는다.
+  예약은 IDEMPOTENCY_WAIT_TIMEOUT 뒤 만료되어 워커가 죽어도 키가 영원히 막히지 않는다.
+- IDEMPOTENCY_STORE=memory는 프로세스 메모리 저장소 (단일 프로세스/개발용)
+- 같은 프로세스 안의 중복 요청은 이벤트로 기다리고(single-flight), 다른 워커가 실행 중이면
+  IDEMPOTENCY_POLL_INTERVAL초마다 저장소를 다시 확인한다.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Protocol
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.db.base import session_scope
+from app.db.models import IdempotencyRecord
+
+IDEMPOTENCY_STORE = os.getenv("IDEMPOTENCY_STORE", "db")
+IDEMPOTENCY_POLL_INTERVAL = float(os.getenv("IDEMPOTENCY_POLL_INTERVAL", "0.5"))
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", str(24 * 60 * 60)))
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "120"))
+IDEMPOTENCY_KEY_MAX_LEN = 255
+
+
+class IdempotencyError(Exception):
+    status_code = 400
+
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+
+class IdempotencyInProgress(IdempotencyError):
+    status_code = 409
+
+
+class IdempotencyKeyReused(IdempotencyError):
+    status_code = 422
+
+
+class IdempotencyStore(Protocol):
+    def get(self, key: str) -> tuple[str, Any] | None:
+        """Return (fingerprint, result) for a live key, or None."""
+        ...
+
+    def reserve(self, key: str, fingerprint: str, lease: float) -> bool:
+        """Claim a key for running; False if it is stored or reserved elsewhere."""
+        ...
+
+    def put(self, key: str, fingerprint: str, result: Any, ttl: float) -> None: ...
+
+    def release(self, key: str) -> None:
+        """Drop a reservation whose request failed so the key can be retried."""
+        ...
+
+
+class InMemoryIdempotencyStore:
+    """Process-local store (single worker / development)."""
+
+    def __init__(self):
+        self._records: dict[str, tuple[float, str, Any]] = {}
+        self._reserved: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[str, Any] | None:
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                return None
+            expires_at, fingerprint, result = record
+            if expires_at < time.monotonic():
+                del self._records[key]
+                return None
+            return fingerprint, result
+
+    def reserve(self, key: str, fingerprint: str, lease: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            record = self._records.get(key)
+            if (record is not None and record[0] >= now) or self._reserved.get(key, 0.0) >= now:
+                return False
+            self._reserved[key] = now + lease
+            return True
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._reserved.pop(key, None)
+
+    def put(self, key: str, fingerprint: str, result: Any, ttl: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._reserved.pop(key, None)
+            self._records[key] = (now + ttl, fingerprint, result)
+            # 만료된 레코드는 쓰기 시점에 정리
+            if len(self._records) % 256 == 0:
+                expired = [k for k, r in self._records.items() if r[0] < now]
+                for k in expired:
+                    del self._records[k]
+
+
+class DbIdempotencyStore:
+    """idempotency_keys table, shared by every worker and process."""
+
+    # put() 몇 번마다 만료된 행을 정리할지
+    PURGE_EVERY = 256
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory
+        self._puts = 0
+
+    def _session(self):
+        return session_scope(self.session_factory) if self.session_factory else session_scope()
+
+    def get(self, key: str) -> tuple[str, Any] | None:
+        with self._session() as db:
+            row = db.execute(
+                select(IdempotencyRecord.fingerprint, IdempotencyRecord.result).where(
+                    IdempotencyRecord.key == key,
+                    IdempotencyRecord.completed_at.is_not(None),
+                    IdempotencyRecord.expires_at > datetime.utcnow(),
+                )
+            ).first()
+        return (row.fingerprint, row.result) if row else None
+
+    def reserve(self, key: str, fingerprint: str, lease: float) -> bool:
+        now = datetime.utcnow()
+        with self._session() as db:
+            # 만료된 예약/결과는 지우고 새로 예약
+            db.execute(
+                delete(IdempotencyRecord).where(
+                    IdempotencyRecord.key == key, IdempotencyRecord.expires_at <= now
+                )
+            )
+            try:
+                db.execute(
+                    insert(IdempotencyRecord).values(
+                        key=key,
+                        fingerprint=fingerprint,
+                        created_at=now,
+                        expires_at=now + timedelta(seconds=lease),
+                    )
+                )
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                return False
+        return True
+
+    def release(self, key: str) -> None:
+        with self._session() as db:
+            db.execute(
+                delete(IdempotencyRecord).where(
+                    IdempotencyRecord.key == key, IdempotencyRecord.completed_at.is_(None)
+                )
+            )
+            db.commit()
+
+    def put(self, key: str, fingerprint: str, result: Any, ttl: float) -> None:
+        now = datetime.utcnow()
+        values = {
+            "fingerprint": fingerprint,
+            "result": result,
+            "completed_at": now,
+            "expires_at": now + timedelta(seconds=ttl),
+        }
+        with self._session() as db:
+            updated = db.execute(
+                update(IdempotencyRecord).where(IdempotencyRecord.key == key).values(**values)
+            ).rowcount
+            if not updated:
+                # 예약 없이 기록하는 경우 (또는 예약이 만료되어 지워진 뒤)
+                db.execute(insert(IdempotencyRecord).values(key=key, created_at=now, **values))
+            self._puts += 1
+            if self._puts % self.PURGE_EVERY == 0:
+                db.execute(delete(IdempotencyRecord).where(IdempotencyRecord.expires_at <= now))
+            db.commit()
+
+
+def fingerprint(*parts: Any) -> str:
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+
+class Idempotency:
+    def __init__(self, store: IdempotencyStore | None = None, ttl: float = IDEMPOTENCY_TTL):
+        if store is None:
+            store = DbIdempotencyStore() if IDEMPOTENCY_STORE == "db" else InMemoryIdempotencyStore()
+        self.store: IdempotencyStore = store
+        self.ttl = ttl
+        self._in_flight: dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def has_result(self, key: str) -> bool:
+        """True if the key already has a stored result (a retry will be a replay)."""
+        return self.store.get(key) is not None
+
+    def run(self, key: str, fn: Callable[[], Any], fingerprint: str = "") -> Any:
+        """Run `fn` at most once per key and return its (stored) result."""
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_TIMEOUT
+        while True:
+            record = self.store.get(key)
+            if record is None:
+                with self._lock:
+                    event = self._in_flight.get(key)
+                    owner = event is None
+                    if owner:
+                        event = self._in_flight[key] = threading.Event()
+            if record is not None:
+                stored_fingerprint, result = record
+                if fingerprint and stored_fingerprint != fingerprint:
+                    raise IdempotencyKeyReused(
+                        "Idempotency-Key was already used with a different request"
+                    )
+                return result
+            if owner:
+                if self.store.reserve(key, fingerprint, IDEMPOTENCY_WAIT_TIMEOUT):
+                    break
+                # 다른 워커가 실행 중: 로컬 대기자도 깨우고 저장소를 주기적으로 다시 확인
+                with self._lock:
+                    self._in_flight.pop(key, None)
+                event.set()
+                if time.monotonic() >= deadline:
+                    raise IdempotencyInProgress(
+                        "A request with this Idempotency-Key is still in progress"
+                    )
+                time.sleep(IDEMPOTENCY_POLL_INTERVAL)
+                continue
+            # 원 요청이 끝나길 기다린 뒤 저장 결과를 다시 확인 (실패했다면 이 요청이 실행)
+            if not event.wait(max(0.0, deadline - time.monotonic())):
+                raise IdempotencyInProgress(
+                    "A request with this Idempotency-Key is still in progress"
+                )
+
+        try:
+            try:
+                result = fn()
+            except BaseException:
+                self.store.release(key)
+                raise
+            self.store.put(key, fingerprint, result, self.ttl)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            event.set()
+
+
+def scoped_key(user_id: int, scope: str, key: str) -> str:
+    if len(key) > IDEMPOTENCY_KEY_MAX_LEN:
+        raise IdempotencyError("Idempotency-Key is too long")
+    return f"{scope}:{user_id}:{key}"
+
+
+idempotency = Idempotency()
+
+
+def set_store(store: IdempotencyStore) -> None:
+    idempotency.store = store
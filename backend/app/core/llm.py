@@ -2,12 +2,20 @@ from langchain.prompts import PromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, START, END
-from typing import Optional, TypedDict, cast
+from typing import Callable, Optional, TypedDict, cast
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timezone
+import time
 from app.api.schema import DreamInterpretation  # type: ignore[import]
 from app.db.repository import DreamRepository, TagRepository
 from app.db.models import Dream as DBDream
+from app.db.base import SessionLocal, session_scope
+from app.core import background, metrics, moderation, tracing
+from app.core.memory import embed, memory_index, MemoryIndex, MEMORY_MAX_CANDIDATES
+from app.core.related import index_dream, related_index, remove_dreams
+from app.core.tag_stats import tag_stats
+from app.core.vocabulary import tag_vocabulary, TagVocabulary
+import numpy as np
 
 # 1) Pydantic parser 정의
 parser = PydanticOutputParser(pydantic_object=DreamInterpretation)
@@ -47,18 +55,43 @@ EXISTING TAGS:
     partial_variables={"format_instructions": parser.get_format_instructions()},
 )
 
-# 3) 모델 초기화
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash-lite",
-    temperature=0.7,
-)
+# 3) 모델 초기화 (첫 호출 시 생성)
+llm = None
+
+
+def get_llm():
+    global llm
+    if llm is None:
+        llm = ChatGoogleGenerativeAI(
+            model="gemini-2.5-flash-lite",
+            temperature=0.7,
+        )
+    return llm
+
+
+def set_llm(model) -> None:
+    """Replace the chat model, e.g. with a fake one for benchmarks."""
+    global llm
+    llm = model
 
 
 """
 LangGraph 기반 파이프라인
-- 1) load_memories: 사용자 과거 꿈을 불러와 memory_context 생성
-- 2) llm_infer: memory_context + 기존 태그를 포함한 프롬프트로 LLM 호출 후 파싱
-- 3) add_memory: 생성된 해몽과 함께 금일의 꿈을 DB에 저장(태그 연결 포함)
+- 준비 단계 (START에서 병렬 실행)
+  - load_memories: 사용자 과거 꿈 메모리 인덱스를 준비
+  - embed_dream: 새 꿈의 임베딩 계산
+  - load_tags: 기존 태그 목록(캐시) 로드
+- recall_memories: 임베딩과 메모리 인덱스로 유사한 과거 꿈을 골라 memory_context 생성
+- llm_infer: memory_context + 기존 태그를 포함한 프롬프트로 LLM 호출 후 파싱 (준비 단계 join)
+- add_memory: 생성된 해몽과 함께 금일의 꿈을 DB에 저장(태그 연결 포함)
+- post_process: 응답과 무관한 후처리(메모리 임베딩 추가, 태그 캐시 워밍 등)를 백그라운드로 넘기고 종료
+
+상태(DreamState)에는 직렬화 가능한 값만 담는다. DB 접근은 그래프 생성 시 주입한
+session_factory로 각 노드가 직접 세션을 열어 처리하므로, 체크포인터 재개나
+다른 프로세스/워커 풀에서의 실행이 가능하다.
+후처리도 같은 session_factory와 파이프라인의 인덱스를 쓴다. 앱 DB(SessionLocal)가 아닌
+session_factory로 만든 파이프라인은 전용 메모리/태그 목록/지문 캐시를 쓰고, API가 읽는
+태그 통계/관련 꿈 인덱스는 갱신하지 않는다.
 """
 
 
@@ -66,75 +99,233 @@ class DreamState(TypedDict, total=False):
     dream_text: str
     existing_tags: str
     user_id: int
-    db: Session
 
+    moderation: Optional[dict]
+    query_embedding: Optional[list[float]]
     memory_context: Optional[str]
-    interpretation: Optional[DreamInterpretation]
+    interpretation: Optional[dict]
     saved_dream_id: Optional[int]
 
 
-def node_load_memories(state: DreamState) -> dict:
-    db: Session = state["db"]
-    user_id: int = state["user_id"]
-    # 최근 5개 요약을 메모리 컨텍스트로 제공 (Repository 사용)
-    repo = DreamRepository(db)
-    recent = repo.get_recent_for_user(user_id=user_id, limit=5)
-    lines: list[str] = []
-    for d in recent:
-        date_str = d.created_at.strftime("%Y-%m-%d") if d.created_at else ""
-        summary = d.summary or (d.content[:120] + ("…" if len(d.content) > 120 else ""))
-        lines.append(f"- [{date_str}] {summary}")
-    memory_context = "\n".join(lines) if lines else ""
-    return {"memory_context": memory_context}
-
-
-def node_llm_infer(state: DreamState) -> dict:
-    # memory_context는 없을 수 있음
-    prompt_input = {
-        "dream_text": state["dream_text"],
-        "existing_tags": state["existing_tags"],
-        "memory_context": state.get("memory_context") or "",
-    }
-    result = (dream_prompt | llm | parser).invoke(prompt_input)
-    # result 는 DreamInterpretation (Pydantic 모델)
-    return {"interpretation": result}
-
-
-def node_add_memory(state: DreamState) -> dict:
-    db: Session = state["db"]
-    user_id: int = state["user_id"]
-    interpretation = cast(DreamInterpretation, state["interpretation"])
-
-    dream_repo = DreamRepository(db)
-    tag_repo = TagRepository(db)
-
-    dream = DBDream(
-        user_id=user_id,
-        content=state["dream_text"],
-        summary=interpretation.summary,
-        analysis=interpretation.analysis,
-        created_at=datetime.utcnow(),
+class DreamPipeline:
+    """Graph nodes bound to an injected session factory and chat model."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        model=None,
+        memory: MemoryIndex | None = None,
+        vocabulary: TagVocabulary | None = None,
+        fingerprints: moderation.RecentFingerprints | None = None,
+    ):
+        self.session_factory = session_factory
+        # None이면 호출 시점의 모듈 전역 llm(get_llm) 사용
+        self.model = model
+        # 다른 DB의 꿈이 앱 전역 캐시에 섞이지 않도록 앱 DB일 때만 전역 인덱스 공유
+        self.shared = session_factory is SessionLocal
+        self.memory = memory or (memory_index if self.shared else MemoryIndex())
+        self.vocabulary = vocabulary or (tag_vocabulary if self.shared else TagVocabulary())
+        self.fingerprints = fingerprints or (
+            moderation.recent_fingerprints if self.shared else moderation.RecentFingerprints()
+        )
+
+    def _load_user_memory(self, user_id: int):
+        def loader():
+            with session_scope(self.session_factory) as db:
+                return DreamRepository(db).get_recent_for_user(
+                    user_id=user_id, limit=MEMORY_MAX_CANDIDATES
+                )
+
+        return self.memory.get(user_id, loader)
+
+    def _tag_names(self) -> list[str]:
+        with session_scope(self.session_factory) as db:
+            return [t.name for t in TagRepository(db).get_all()]
+
+    def _live_ids(self, dream_ids: list[int]) -> set[int]:
+        with session_scope(self.session_factory) as db:
+            return DreamRepository(db).live_ids(dream_ids)
+
+    def _recent_fingerprints(self, user_id: int):
+        def loader():
+            with session_scope(self.session_factory) as db:
+                dreams = DreamRepository(db).get_recent_for_user(
+                    user_id=user_id, limit=moderation.MODERATION_RECENT
+                )
+                return [
+                    (d.id, d.content, d.created_at.replace(tzinfo=timezone.utc).timestamp())
+                    for d in dreams
+                ]
+
+        return self.fingerprints.get(user_id, loader)
+
+    def prefilter(self, state: DreamState) -> dict:
+        # LLM 전에 길이/언어/차단어/중복을 로컬에서 검사, 거절되면 그래프가 바로 끝남
+        if not moderation.MODERATION_ENABLED:
+            return {"moderation": {"verdict": "ok"}}
+        verdict = moderation.check(
+            state["dream_text"],
+            lambda: self._recent_fingerprints(state["user_id"]),
+            alive=lambda dream_id: dream_id in self._live_ids([dream_id]),
+        )
+        metrics.moderation_decisions.inc(verdict.verdict, verdict.reason or "")
+        return {"moderation": vars(verdict)}
+
+    def load_memories(self, state: DreamState) -> dict:
+        self._load_user_memory(state["user_id"])
+        return {}
+
+    def embed_dream(self, state: DreamState) -> dict:
+        return {"query_embedding": embed(state["dream_text"]).tolist()}
+
+    def load_tags(self, state: DreamState) -> dict:
+        if state.get("existing_tags") is not None:
+            return {}
+        return {"existing_tags": self.vocabulary.get(self._tag_names)}
+
+    def recall_memories(self, state: DreamState) -> dict:
+        # 새 꿈과 유사한 과거 꿈을 토큰 예산 안에서 골라 메모리 컨텍스트로 제공
+        memory = self._load_user_memory(state["user_id"])
+        query = np.asarray(state["query_embedding"], dtype=np.float32)
+        # 다른 프로세스에서 삭제/보관된 꿈은 후보에서 제외
+        context = memory.recall(state["dream_text"], query=query, live=self._live_ids)
+        return {"memory_context": context}
+
+    def llm_infer(self, state: DreamState) -> dict:
+        # memory_context는 없을 수 있음
+        prompt_input = {
+            "dream_text": state["dream_text"],
+            "existing_tags": state["existing_tags"],
+            "memory_context": state.get("memory_context") or "",
+        }
+        model = self.model if self.model is not None else get_llm()
+        model_name = getattr(model, "model", "") or type(model).__name__
+        # 파서 전에 모델 응답을 받아 제공자가 보고한 토큰 사용량을 기록
+        with tracing.start_span(
+            f"chat {model_name}",
+            kind="CLIENT",
+            attributes={"gen_ai.operation.name": "chat", "gen_ai.request.model": model_name},
+        ) as span:
+            message = (dream_prompt | model).invoke(prompt_input)
+            usage = getattr(message, "usage_metadata", None) or {}
+            span.set_attribute("gen_ai.usage.input_tokens", usage.get("input_tokens"))
+            span.set_attribute("gen_ai.usage.output_tokens", usage.get("output_tokens"))
+        metrics.record_llm_usage(message, model_name)
+        result = parser.invoke(message)
+        # result 는 DreamInterpretation (Pydantic 모델) -> 상태에는 dict로 저장
+        return {"interpretation": result.model_dump()}
+
+    def add_memory(self, state: DreamState) -> dict:
+        user_id: int = state["user_id"]
+        interpretation = DreamInterpretation.model_validate(state["interpretation"])
+
+        with session_scope(self.session_factory) as db:
+            dream_repo = DreamRepository(db)
+            tag_repo = TagRepository(db)
+
+            dream = DBDream(
+                user_id=user_id,
+                content=state["dream_text"],
+                summary=interpretation.summary,
+                analysis=interpretation.analysis,
+                created_at=datetime.utcnow(),
+            )
+            # 태그 연결 (변형 이름이 같은 태그로 합쳐질 수 있으므로 중복 제거)
+            tags = [tag_repo.get_or_create(tag.to_dbschema()) for tag in interpretation.tags]
+            dream.tags = list({t.id: t for t in tags}.values())
+            dream_id = dream_repo.create(dream).id
+        # 바로 이어서 같은 글을 다시 보내도 걸러지도록 훅을 기다리지 않고 지문을 추가
+        self.fingerprints.add(user_id, dream_id, state["dream_text"], time.time())
+        return {"saved_dream_id": dream_id}
+
+    def post_process(self, state: DreamState) -> dict:
+        # 응답을 기다리게 하지 않도록 후처리를 백그라운드로 실행 (이 파이프라인의 DB/인덱스 사용)
+        dream_id = cast(int, state["saved_dream_id"])
+        for hook in (self._index_dream_memory, self._index_dream_tags, self._warm_tag_vocabulary):
+            background.submit(hook, dream_id)
+        background.dispatch_dream_saved(dream_id, self.session_factory)
+        return {}
+
+    def _index_dream_memory(self, dream_id: int) -> None:
+        with session_scope(self.session_factory) as db:
+            dream = DreamRepository(db).get(dream_id)
+            if dream is not None:
+                self.memory.add(dream.user_id, dream)
+
+    def _index_dream_tags(self, dream_id: int) -> None:
+        if not self.shared or not (tag_stats.loaded or related_index.loaded):
+            return
+        with session_scope(self.session_factory) as db:
+            dream = DreamRepository(db).get(dream_id)
+            if dream is not None:
+                names = [t.name for t in dream.tags]
+                tag_stats.add(dream.id, dream.created_at, names)
+                index_dream(dream.id, names)
+
+    def _warm_tag_vocabulary(self, dream_id: int) -> None:
+        # 저장된 꿈의 태그만 캐시에 추가 (tags 전체 재조회는 TTL 만료 때만)
+        with session_scope(self.session_factory) as db:
+            dream = DreamRepository(db).get(dream_id)
+            if dream is not None:
+                self.vocabulary.add(t.name for t in dream.tags)
+
+
+@background.on_dreams_removed
+def _forget_removed_dreams(dream_ids: list[int], user_ids: set[int]) -> None:
+    # 삭제/보관된 꿈이 메모리 컨텍스트, 관련 꿈, 태그 통계, 중복 검사에 남지 않도록
+    for user_id in user_ids:
+        memory_index.invalidate(user_id)
+        moderation.recent_fingerprints.invalidate(user_id)
+    remove_dreams(dream_ids)
+    tag_stats.invalidate()
+
+
+def _after_prefilter(state: DreamState) -> list[str] | str:
+    if state["moderation"]["verdict"] != "ok":
+        return END
+    return ["load_memories", "embed_dream", "load_tags"]
+
+
+def build_dream_graph(
+    session_factory: Callable[[], Session] = SessionLocal,
+    model=None,
+    checkpointer=None,
+):
+    """Compile the dream pipeline with injected dependencies.
+
+    Pass a checkpointer (e.g. langgraph's SqliteSaver) together with a
+    `thread_id` in the invoke config to make runs resumable.
+    """
+    pipeline = DreamPipeline(session_factory=session_factory, model=model)
+
+    graph = StateGraph(DreamState)
+    for name in (
+        "prefilter",
+        "load_memories",
+        "embed_dream",
+        "load_tags",
+        "recall_memories",
+        "llm_infer",
+        "add_memory",
+        "post_process",
+    ):
+        # 노드별 지연을 Server-Timing / 지표 / trace span으로 기록
+        node = tracing.traced(f"dream_graph.{name}")(getattr(pipeline, name))
+        graph.add_node(name, metrics.timed_node(name, node))
+
+    graph.add_edge(START, "prefilter")
+    graph.add_conditional_edges(
+        "prefilter",
+        _after_prefilter,
+        ["load_memories", "embed_dream", "load_tags", END],
     )
-    # 태그 연결
-    dream.tags = [
-        tag_repo.get_or_create(tag.to_dbschema()) for tag in interpretation.tags
-    ]
-    dream = dream_repo.create(dream)
-    return {"saved_dream_id": dream.id, "interpretation": interpretation}
-
-
-# 그래프 컴파일
-graph = StateGraph(DreamState)
-graph.add_node("load_memories", node_load_memories)
-graph.add_node("llm_infer", node_llm_infer)
-graph.add_node("add_memory", node_add_memory)
-
-graph.add_edge(START, "load_memories")
-graph.add_edge("load_memories", "llm_infer")
-graph.add_edge("llm_infer", "add_memory")
-graph.add_edge("add_memory", END)
-
-dream_graph = graph.compile()
+    graph.add_edge(["load_memories", "embed_dream"], "recall_memories")
+    graph.add_edge(["recall_memories", "load_tags"], "llm_infer")
+    graph.add_edge("llm_infer", "add_memory")
+    graph.add_edge("add_memory", "post_process")
+    graph.add_edge("post_process", END)
+
+    return graph.compile(checkpointer=checkpointer)
 
 # prompt = PromptTemplate.from_template(
 #     input_variables=["user_dream_text"], template="""
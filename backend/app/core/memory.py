@@ -0,0 +1,206 @@
+"""
+사용자별 꿈 메모리 인덱스
+- 과거 꿈(요약 + 본문 + 태그)을 해시 임베딩으로 벡터화해 사용자별 NumPy 행렬로 보관
+- 새 꿈과의 코사인 유사도로 top-K를 고르고, 토큰 예산 안에서 memory_context를 구성
+- 최초 조회 시 DB에서 한 번 적재하고, 이후에는 저장 시점에 행을 추가(add)해 갱신
+- 삭제/보관된 꿈은 같은 프로세스에서는 invalidate로 비우고, 다른 프로세스에서 지운 꿈은
+  recall 때 후보를 live 여부로 걸러 제외(discard)
+"""
+
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+import numpy as np
+
+MEMORY_EMBED_DIM = int(os.getenv("MEMORY_EMBED_DIM", "512"))
+MEMORY_TOP_K = int(os.getenv("MEMORY_TOP_K", "5"))
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "300"))
+MEMORY_MIN_SCORE = float(os.getenv("MEMORY_MIN_SCORE", "0.05"))
+MEMORY_TAG_WEIGHT = float(os.getenv("MEMORY_TAG_WEIGHT", "0.5"))
+MEMORY_MAX_CANDIDATES = int(os.getenv("MEMORY_MAX_CANDIDATES", "500"))
+MEMORY_CACHE_USERS = int(os.getenv("MEMORY_CACHE_USERS", "1024"))
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word tokens plus character trigrams.
+
+    Trigrams keep Korean inflections ("떨어지는" / "떨어졌다") partially
+    overlapping without a morphological analyzer.
+    """
+    words = _WORD_RE.findall((text or "").lower())
+    features = list(words)
+    for w in words:
+        if len(w) > 3:
+            features.extend(w[i : i + 3] for i in range(len(w) - 2))
+    return features
+
+
+def embed(text: str, dim: int = MEMORY_EMBED_DIM) -> np.ndarray:
+    """Hashing-trick bag-of-features embedding, L2 normalized.
+
+    crc32 is used instead of hash() so vectors are stable across processes.
+    """
+    vec = np.zeros(dim, dtype=np.float32)
+    for feature in tokenize(text):
+        h = zlib.crc32(feature.encode("utf-8"))
+        vec[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    norm = float(np.linalg.norm(vec))
+    if norm > 0:
+        vec /= norm
+    return vec
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate: ~4 ASCII chars per token, 1 token per other char."""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+def _dream_vector(dream) -> np.ndarray:
+    text = " ".join(filter(None, [dream.summary, dream.content]))
+    vec = embed(text)
+    tag_names = " ".join(t.name for t in (dream.tags or []))
+    if tag_names:
+        vec = vec + MEMORY_TAG_WEIGHT * embed(tag_names)
+        norm = float(np.linalg.norm(vec))
+        if norm > 0:
+            vec /= norm
+    return vec
+
+
+def _memory_line(dream) -> str:
+    date_str = dream.created_at.strftime("%Y-%m-%d") if dream.created_at else ""
+    summary = dream.summary or (
+        dream.content[:120] + ("…" if len(dream.content) > 120 else "")
+    )
+    return f"- [{date_str}] {summary}"
+
+
+class UserMemory:
+    """Embedding matrix and prompt lines for one user's past dreams."""
+
+    def __init__(self, dim: int = MEMORY_EMBED_DIM):
+        self.ids: list[int] = []
+        self._seen: set[int] = set()
+        self.lines: list[str] = []
+        self._discarded: set[int] = set()
+        self._matrix = np.zeros((16, dim), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, dream) -> None:
+        vec = _dream_vector(dream)
+        with self._lock:
+            if dream.id in self._seen:
+                return
+            n = len(self.ids)
+            if n == self._matrix.shape[0]:
+                grown = np.zeros((n * 2, self._matrix.shape[1]), dtype=np.float32)
+                grown[:n] = self._matrix
+                self._matrix = grown
+            self._matrix[n] = vec
+            self.ids.append(dream.id)
+            self._seen.add(dream.id)
+            self.lines.append(_memory_line(dream))
+
+    def discard(self, dream_ids: Iterable[int]) -> None:
+        """Never recall these dreams again (deleted or archived elsewhere)."""
+        with self._lock:
+            self._discarded.update(dream_ids)
+
+    def recall(
+        self,
+        text: str,
+        top_k: int = MEMORY_TOP_K,
+        token_budget: int = MEMORY_TOKEN_BUDGET,
+        query: np.ndarray | None = None,
+        live: Callable[[list[int]], set[int]] | None = None,
+    ) -> str:
+        """Return the most similar memory lines that fit in the token budget.
+
+        `live` returns which of the candidate ids still exist; the rest are
+        discarded, so dreams deleted by another process stop showing up.
+        """
+        with self._lock:
+            n = len(self.ids)
+            if n == 0:
+                return ""
+            q = embed(text) if query is None else query
+            scores = self._matrix[:n] @ q
+            lines = list(self.lines)
+            ids = list(self.ids)
+            discarded = set(self._discarded)
+        candidates = [
+            i
+            for i in np.argsort(-scores)
+            if scores[i] >= MEMORY_MIN_SCORE and ids[i] not in discarded
+        ]
+        if live is not None and candidates:
+            alive = live([ids[i] for i in candidates])
+            self.discard(ids[i] for i in candidates if ids[i] not in alive)
+            candidates = [i for i in candidates if ids[i] in alive]
+        picked: list[str] = []
+        used = 0
+        for i in candidates:
+            if len(picked) >= top_k:
+                break
+            cost = estimate_tokens(lines[i])
+            if used + cost > token_budget:
+                continue
+            picked.append(lines[i])
+            used += cost
+        return "\n".join(picked)
+
+
+class MemoryIndex:
+    """Process-wide LRU cache of per-user memories."""
+
+    def __init__(self, max_users: int = MEMORY_CACHE_USERS):
+        self.max_users = max_users
+        self._users: "OrderedDict[int, UserMemory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, loader: Callable[[], Iterable]) -> UserMemory:
+        """Return the cached memory for a user, loading it via `loader` on a miss."""
+        with self._lock:
+            memory = self._users.get(user_id)
+            if memory is not None:
+                self._users.move_to_end(user_id)
+                return memory
+        memory = UserMemory()
+        for dream in loader():
+            memory.add(dream)
+        with self._lock:
+            memory = self._users.setdefault(user_id, memory)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return memory
+
+    def add(self, user_id: int, dream) -> None:
+        """Append a newly saved dream if the user's memory is already cached.
+
+        Uncached users pick the dream up from the DB on their next load.
+        """
+        with self._lock:
+            memory = self._users.get(user_id)
+        if memory is not None:
+            memory.add(dream)
+
+    def invalidate(self, user_id: int | None = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
+
+
+memory_index = MemoryIndex()
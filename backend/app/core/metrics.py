@@ -0,0 +1,361 @@
+"""
+요청 단위 계측 (DB 쿼리 / 그래프 노드 / LLM 토큰)
+- RequestStats: 요청 하나 동안의 쿼리 수, DB 시간, 가장 느린 문장, 구간(span) 시간, LLM 토큰
+  contextvar에 담아 두므로 스레드풀에서 도는 sync 라우트와 그래프 병렬 노드에서도 같은 객체에 기록
+- install_query_hooks: SQLAlchemy 엔진 이벤트로 모든 쿼리 시간을 측정
+- timed / timed_node: 임의 구간과 dream_graph 노드 시간 측정
+- record_llm_usage: 모델 응답(AIMessage.usage_metadata)의 토큰 수 기록
+- MetricsMiddleware: 요청마다 RequestStats를 만들고
+  - 응답에 Server-Timing 헤더 (db, 노드별 구간, app 전체)
+  - 프로세스 누적 지표(카운터/히스토그램) 갱신 -> render()가 Prometheus 텍스트 형식으로 출력 (/metrics)
+  - SLOW_REQUEST_MS를 넘은 요청은 가장 느린 문장 SLOW_REQUEST_TOP_STATEMENTS개와 함께 경고 로그
+
+누적 지표는 프로세스(워커)별이다. serve.py로 여러 워커를 띄우면 스크레이프마다
+다른 워커가 응답하므로 대시보드에서는 rate()/합계 기준으로 본다.
+"""
+
+import heapq
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("dreamscope.metrics")
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_REQUEST_TOP_STATEMENTS = int(os.getenv("SLOW_REQUEST_TOP_STATEMENTS", "5"))
+# Server-Timing 헤더를 응답에 붙일지 (내부 구조가 드러나므로 공개 배포에서는 끌 수 있음)
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+# --- 누적 지표 (Prometheus 텍스트 형식) ---
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, doc: str, labels: tuple[str, ...] = ()):
+        self.name, self.doc, self.label_names = name, doc, labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.doc}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_labels(self.label_names, labels)} {value:g}"
+
+
+class Histogram:
+    def __init__(self, name: str, doc: str, labels: tuple[str, ...] = (), buckets=HTTP_BUCKETS):
+        self.name, self.doc, self.label_names = name, doc, labels
+        self.buckets = tuple(buckets)
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += seconds
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(series[-2]) if series else 0
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.doc}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for labels, series in items:
+            for bound, count in zip(self.buckets, series):
+                le = _labels(self.label_names, labels, f'le="{bound:g}"')
+                yield f"{self.name}_bucket{le} {count:g}"
+            le = _labels(self.label_names, labels, 'le="+Inf"')
+            yield f"{self.name}_bucket{le} {series[-2]:g}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {series[-2]:g}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {series[-1]:.6f}"
+
+
+http_requests = Counter(
+    "dreamscope_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+)
+http_duration = Histogram(
+    "dreamscope_http_request_duration_seconds", "HTTP request latency.", ("method", "route")
+)
+http_db_queries = Histogram(
+    "dreamscope_http_request_db_queries", "DB statements executed per request.", ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+db_queries = Counter("dreamscope_db_queries_total", "DB statements executed.", ("operation",))
+db_duration = Histogram(
+    "dreamscope_db_query_duration_seconds", "DB statement latency.", ("operation",), buckets=DB_BUCKETS
+)
+graph_node_duration = Histogram(
+    "dreamscope_graph_node_duration_seconds", "dream_graph node latency.", ("node",)
+)
+llm_calls = Counter("dreamscope_llm_calls_total", "Chat model calls.", ("model",))
+llm_tokens = Counter("dreamscope_llm_tokens_total", "Chat model tokens.", ("model", "kind"))
+outbox_events = Counter(
+    "dreamscope_outbox_events_total", "Outbox events handled by the dispatcher.", ("topic", "result")
+)
+moderation_decisions = Counter(
+    "dreamscope_moderation_decisions_total", "Dream pre-filter verdicts.", ("verdict", "reason")
+)
+
+REGISTRY = [
+    http_requests,
+    http_duration,
+    http_db_queries,
+    db_queries,
+    db_duration,
+    graph_node_duration,
+    llm_calls,
+    llm_tokens,
+    outbox_events,
+    moderation_decisions,
+]
+
+
+def render() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# --- 요청 단위 기록 ---
+
+
+class RequestStats:
+    """Costs accumulated while serving one request (shared across its threads)."""
+
+    def __init__(self, top_statements: int = SLOW_REQUEST_TOP_STATEMENTS):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.spans: dict[str, float] = {}
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._top_n = top_statements
+        self._slowest: list[tuple[float, int, str]] = []  # 최소 힙
+        self._lock = threading.Lock()
+
+    def add_query(self, seconds: float, statement: str) -> None:
+        with self._lock:
+            self.queries += 1
+            self.db_seconds += seconds
+            if self._top_n <= 0:
+                return
+            item = (seconds, self.queries, statement)
+            if len(self._slowest) < self._top_n:
+                heapq.heappush(self._slowest, item)
+            elif seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def add_span(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def add_tokens(self, input_tokens: int, output_tokens: int) -> None:
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+
+    def slowest(self) -> list[tuple[float, str]]:
+        return [(s, stmt) for s, _, stmt in sorted(self._slowest, reverse=True)]
+
+    def server_timing(self, total_seconds: float) -> str:
+        parts = [f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries"']
+        parts += [f"{name};dur={s * 1000:.1f}" for name, s in self.spans.items()]
+        parts.append(f"app;dur={total_seconds * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("dreamscope_request_stats", default=None)
+
+
+def current() -> RequestStats | None:
+    return _current.get()
+
+
+@contextmanager
+def collect(stats: RequestStats | None = None):
+    """Record costs of the enclosed block into `stats` (used by the middleware and jobs)."""
+    stats = stats or RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def install_query_hooks(engine: Engine) -> None:
+    """Time every statement run through `engine`."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("dreamscope_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["dreamscope_query_start"].pop()
+        elapsed = time.perf_counter() - started
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        db_queries.inc(operation)
+        db_duration.observe(elapsed, operation)
+        stats = _current.get()
+        if stats is not None:
+            stats.add_query(elapsed, statement)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        # 실패한 문장은 after_cursor_execute가 불리지 않으므로 시작 시각만 정리
+        starts = context.connection.info.get("dreamscope_query_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+
+@contextmanager
+def timed(name: str):
+    """Time a block as a Server-Timing span of the current request."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _current.get()
+        if stats is not None:
+            stats.add_span(name, time.perf_counter() - started)
+
+
+def timed_node(name: str, fn: Callable) -> Callable:
+    """Wrap a dream_graph node so its latency is recorded per node."""
+
+    @wraps(fn)
+    def wrapper(state):
+        started = time.perf_counter()
+        try:
+            return fn(state)
+        finally:
+            elapsed = time.perf_counter() - started
+            graph_node_duration.observe(elapsed, name)
+            stats = _current.get()
+            if stats is not None:
+                stats.add_span(name, elapsed)
+
+    return wrapper
+
+
+def record_llm_usage(message, model_name: str = "") -> None:
+    """Count a chat model call and the provider-reported token usage, if any."""
+    model_name = model_name or "unknown"
+    llm_calls.inc(model_name)
+    usage = getattr(message, "usage_metadata", None) or {}
+    input_tokens = int(usage.get("input_tokens") or 0)
+    output_tokens = int(usage.get("output_tokens") or 0)
+    if input_tokens:
+        llm_tokens.inc(model_name, "input", amount=input_tokens)
+    if output_tokens:
+        llm_tokens.inc(model_name, "output", amount=output_tokens)
+    stats = _current.get()
+    if stats is not None:
+        stats.add_tokens(input_tokens, output_tokens)
+
+
+# --- ASGI 미들웨어 ---
+
+
+class MetricsMiddleware:
+    """Per-request stats, Server-Timing header, access metrics and slow-request log."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        stats = RequestStats()
+        status = 500
+        streaming = False
+
+        async def send_with_timing(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                streaming = any(
+                    k == b"content-type" and v.startswith(b"text/event-stream")
+                    for k, v in message.get("headers", [])
+                )
+                if SERVER_TIMING_ENABLED:
+                    timing = stats.server_timing(time.perf_counter() - started)
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timing.encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        with collect(stats):
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                self._finish(scope, stats, status, time.perf_counter() - started, streaming)
+
+    @staticmethod
+    def _finish(scope, stats: RequestStats, status: int, elapsed: float, streaming: bool) -> None:
+        # 라우팅 후 scope["route"]에 매칭된 라우트가 담김 -> 경로 파라미터 대신 템플릿으로 집계
+        route = getattr(scope.get("route"), "path", None) or "unmatched"
+        method = scope.get("method", "")
+        http_requests.inc(method, route, str(status))
+        http_duration.observe(elapsed, method, route)
+        http_db_queries.observe(stats.queries, method, route)
+        # SSE 스트림은 연결이 열려 있는 동안이 곧 요청 시간이므로 느린 요청으로 보지 않음
+        if streaming or elapsed * 1000 < SLOW_REQUEST_MS:
+            return
+        lines = [
+            f"{s * 1000:8.1f} ms  {' '.join(stmt.split())[:300]}" for s, stmt in stats.slowest()
+        ]
+        logger.warning(
+            "slow request %s %s -> %s in %.1f ms (%d queries, %.1f ms db, %d/%d llm tokens)%s",
+            method,
+            scope.get("path", ""),
+            status,
+            elapsed * 1000,
+            stats.queries,
+            stats.db_seconds * 1000,
+            stats.input_tokens,
+            stats.output_tokens,
+            "".join(f"\n  {line}" for line in lines),
+        )
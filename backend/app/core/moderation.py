@@ -0,0 +1,282 @@
+"""
+꿈 입력 사전 필터 (dream_graph의 첫 노드, LLM 호출 전)
+- 길이: MODERATION_MIN_CHARS ~ MODERATION_MAX_CHARS
+- 언어/형태: 글자 중 한글·라틴 문자 비율(MODERATION_MIN_SCRIPT_RATIO), 글자 자체의 비율(기호/숫자 도배),
+  한 문자가 대부분을 차지하는 반복 입력
+- 링크 도배: 본문의 http(s):// 개수가 MODERATION_MAX_LINKS를 넘으면 거절 (정규식 반복 대신 개수 세기)
+- 차단 목록: 키워드/정규식을 하나의 정규식(alternation)으로 컴파일해 한 번만 훑음
+  (MODERATION_BLOCKLIST_FILE, 한 줄에 하나, `re:`로 시작하면 정규식, 아니면 단어 그대로)
+  - 반복 안에 무제한 반복이 겹친 정규식(예: `(\S+.*){3,}`)은 역추적이 폭발하므로 컴파일 때 버림
+- 중복: 정규화한 본문의 문자 3-gram으로 64비트 SimHash를 만들고, 같은 사용자가 최근
+  MODERATION_DUPLICATE_WINDOW초 안에 올린 꿈과 해밍 거리가 MODERATION_SIMHASH_DISTANCE 이하이면 중복
+  - 사용자별 최근 지문은 프로세스 LRU (첫 조회 때 DB에서 적재, 저장 후 훅으로 추가, 삭제 시 invalidate)
+  - 다른 프로세스에서 지운 꿈이 남아 있을 수 있으므로 중복 후보는 alive로 한 번 더 확인
+
+모든 검사는 입력 길이에 비례하는 로컬 연산이라 거절은 LLM 없이 즉시 응답된다.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+import numpy as np
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+logger = logging.getLogger("dreamscope.moderation")
+
+MODERATION_ENABLED = os.getenv("MODERATION_ENABLED", "true").lower() == "true"
+MODERATION_MIN_CHARS = int(os.getenv("MODERATION_MIN_CHARS", "10"))
+MODERATION_MAX_CHARS = int(os.getenv("MODERATION_MAX_CHARS", "5000"))
+MODERATION_MIN_SCRIPT_RATIO = float(os.getenv("MODERATION_MIN_SCRIPT_RATIO", "0.6"))
+MODERATION_MIN_LETTER_RATIO = float(os.getenv("MODERATION_MIN_LETTER_RATIO", "0.4"))
+MODERATION_MAX_CHAR_SHARE = float(os.getenv("MODERATION_MAX_CHAR_SHARE", "0.5"))
+MODERATION_MAX_LINKS = int(os.getenv("MODERATION_MAX_LINKS", "2"))
+MODERATION_SIMHASH_DISTANCE = int(os.getenv("MODERATION_SIMHASH_DISTANCE", "3"))
+MODERATION_DUPLICATE_WINDOW = float(os.getenv("MODERATION_DUPLICATE_WINDOW", "86400"))
+MODERATION_RECENT = int(os.getenv("MODERATION_RECENT", "20"))
+MODERATION_CACHE_USERS = int(os.getenv("MODERATION_CACHE_USERS", "10000"))
+MODERATION_BLOCKLIST_FILE = os.getenv(
+    "MODERATION_BLOCKLIST_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "moderation_blocklist.txt"),
+)
+
+# 보이지 않는 문자로 차단어를 쪼개는 우회를 막기 위해 정규화 때 제거
+_INVISIBLE_RE = re.compile("[​-‏⁠﻿­]")
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+_LINK_RE = re.compile(r"https?://")
+
+
+def normalize(text: str) -> str:
+    """NFKC + casefold, invisible characters removed, whitespace collapsed."""
+    text = _INVISIBLE_RE.sub("", unicodedata.normalize("NFKC", text or "")).casefold()
+    return " ".join(text.split())
+
+
+def _is_allowed_script(ch: str) -> bool:
+    # 한글(음절/자모) 또는 라틴 문자
+    return ("가" <= ch <= "힣") or ("ᄀ" <= ch <= "ᇿ") or (
+        "㄰" <= ch <= "㆏"
+    ) or ch.isascii() or unicodedata.name(ch, "").startswith("LATIN")
+
+
+def check_shape(text: str) -> str | None:
+    """Length / language / junk checks; return a rejection reason or None."""
+    stripped = text.strip()
+    if len(stripped) < MODERATION_MIN_CHARS:
+        return "too_short"
+    if len(stripped) > MODERATION_MAX_CHARS:
+        return "too_long"
+    chars = [ch for ch in stripped if not ch.isspace()]
+    letters = [ch for ch in chars if ch.isalpha()]
+    if len(letters) < len(chars) * MODERATION_MIN_LETTER_RATIO:
+        return "not_text"
+    if sum(1 for ch in letters if _is_allowed_script(ch)) < len(letters) * MODERATION_MIN_SCRIPT_RATIO:
+        return "unsupported_language"
+    if Counter(chars).most_common(1)[0][1] > len(chars) * MODERATION_MAX_CHAR_SHARE:
+        return "repetitive"
+    return None
+
+
+def too_many_links(normalized: str) -> bool:
+    return len(_LINK_RE.findall(normalized)) > MODERATION_MAX_LINKS
+
+
+# --- 차단 목록 ---
+
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+
+
+def _max_star_height(items) -> int:
+    # 무제한 반복(+, *, {n,})이 몇 겹으로 중첩되는지; 소유/원자 그룹은 역추적하지 않으므로 0
+    height = 0
+    for op, av in items:
+        if op in _REPEATS:
+            inner = _max_star_height(av[2])
+            height = max(height, inner + (av[1] == sre_parse.MAXREPEAT or (inner and av[1] > 1)))
+        elif op is sre_parse.SUBPATTERN:
+            height = max(height, _max_star_height(av[3]))
+        elif op is sre_parse.BRANCH:
+            height = max([height] + [_max_star_height(b) for b in av[1]])
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            height = max(height, _max_star_height(av[1]))
+        elif op is sre_parse.GROUPREF_EXISTS:
+            height = max([height] + [_max_star_height(b) for b in av[1:] if b is not None])
+    return height
+
+
+def is_safe_pattern(pattern: str) -> bool:
+    """False for patterns with nested repeats, which can backtrack polynomially or worse."""
+    try:
+        return _max_star_height(sre_parse.parse(pattern)) <= 1
+    except re.error:
+        return False
+
+
+def compile_blocklist(lines: Iterable[str]) -> re.Pattern | None:
+    """One alternation regex for all entries (`re:` prefix = regex, otherwise a literal)."""
+    parts = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("re:"):
+            if not is_safe_pattern(line[3:]):
+                logger.warning("skipping unsafe or invalid blocklist pattern: %s", line)
+                continue
+            parts.append(f"(?:{line[3:]})")
+        else:
+            parts.append(re.escape(normalize(line)))
+    if not parts:
+        return None
+    # 긴 항목을 앞에 두어 겹치는 항목은 더 구체적인 쪽으로 맞춤
+    parts.sort(key=len, reverse=True)
+    return re.compile("|".join(parts))
+
+
+def load_blocklist(path: str = MODERATION_BLOCKLIST_FILE) -> re.Pattern | None:
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return compile_blocklist(f)
+
+
+_blocklist = load_blocklist()
+
+
+def set_blocklist(lines: Iterable[str]) -> None:
+    """Replace the blocklist, e.g. after an operator edits it."""
+    global _blocklist
+    _blocklist = compile_blocklist(lines)
+
+
+def blocked(normalized: str) -> bool:
+    return _blocklist is not None and _blocklist.search(normalized) is not None
+
+
+# --- 중복 (SimHash) ---
+
+_BITS = np.arange(64, dtype=np.uint64)
+
+
+def simhash(normalized: str) -> int:
+    """64-bit SimHash over character trigrams (language independent), weighted by count."""
+    text = _NON_WORD_RE.sub(" ", normalized).strip()
+    shingles = Counter(text[i : i + 3] for i in range(max(1, len(text) - 2)))
+    hashes = np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little")
+            for s in shingles
+        ),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    weights = np.fromiter(shingles.values(), dtype=np.float64, count=len(shingles))
+    bits = ((hashes[:, None] >> _BITS) & np.uint64(1)).astype(np.float64)
+    score = weights @ (bits * 2 - 1)
+    return int(sum(1 << int(i) for i in np.flatnonzero(score > 0)))
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class RecentFingerprints:
+    """Process-wide LRU of each user's recent (dream id, simhash, created) entries."""
+
+    def __init__(self, max_users: int = MODERATION_CACHE_USERS, per_user: int = MODERATION_RECENT):
+        self.max_users = max_users
+        self.per_user = per_user
+        self._users: "OrderedDict[int, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, loader: Callable[[], Iterable]) -> deque:
+        """Entries for a user, loading (dream_id, content, created_ts) rows on a miss."""
+        with self._lock:
+            entries = self._users.get(user_id)
+            if entries is not None:
+                self._users.move_to_end(user_id)
+                return entries
+        entries = deque(maxlen=self.per_user)
+        for dream_id, content, created in loader():
+            entries.appendleft((dream_id, simhash(normalize(content)), created))
+        with self._lock:
+            entries = self._users.setdefault(user_id, entries)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return entries
+
+    def add(self, user_id: int, dream_id: int, content: str, created: float) -> None:
+        """Record a saved dream if the user is cached (others load it from the DB later)."""
+        with self._lock:
+            entries = self._users.get(user_id)
+        if entries is not None:
+            entries.append((dream_id, simhash(normalize(content)), created))
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._users.pop(user_id, None)
+
+
+recent_fingerprints = RecentFingerprints()
+
+
+def find_duplicate(
+    fingerprint: int,
+    entries: Iterable,
+    now: float | None = None,
+    alive: Callable[[int], bool] | None = None,
+) -> int | None:
+    """Id of a recent entry within MODERATION_SIMHASH_DISTANCE bits, if any.
+
+    `alive` is asked only about matching entries, so deleted dreams are skipped.
+    """
+    now = time.time() if now is None else now
+    for dream_id, other, created in list(entries):
+        if now - created <= MODERATION_DUPLICATE_WINDOW and hamming(fingerprint, other) <= MODERATION_SIMHASH_DISTANCE:
+            if alive is None or alive(dream_id):
+                return dream_id
+    return None
+
+
+@dataclass
+class Verdict:
+    verdict: str  # ok | rejected | duplicate
+    reason: str | None = None
+    duplicate_of: int | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.verdict == "ok"
+
+
+def check(
+    text: str,
+    recent: Callable[[], Iterable] | None = None,
+    alive: Callable[[int], bool] | None = None,
+) -> Verdict:
+    """Run every local check; `recent` returns the user's recent fingerprint entries."""
+    reason = check_shape(text)
+    if reason is not None:
+        return Verdict("rejected", reason)
+    normalized = normalize(text)
+    if too_many_links(normalized):
+        return Verdict("rejected", "too_many_links")
+    if blocked(normalized):
+        return Verdict("rejected", "blocked")
+    if recent is not None:
+        duplicate_of = find_duplicate(simhash(normalized), recent(), alive=alive)
+        if duplicate_of is not None:
+            return Verdict("duplicate", "near_duplicate", duplicate_of)
+    return Verdict("ok")
@@ -0,0 +1,236 @@
+"""
+트랜잭션 아웃박스 디스패처 (대댓글 알림)
+- 쓰기 경로(CommentRepository.create)는 댓글과 같은 트랜잭션에 outbox_events 행만 남기고 끝남
+  -> 알림 전달이 느리거나 실패해도 댓글 작성은 영향을 받지 않고, 커밋된 댓글의 알림은 유실되지 않음
+- 디스패처는 대기 중인 이벤트를 OUTBOX_BATCH_SIZE개씩 가져와(claim: 토큰 + 임대 시각)
+  - 같은 사용자 · 같은 꿈에 달린 여러 대댓글을 알림 하나로 합치고 (coalesce)
+  - 등록된 Sink(앱 내 알림함, 웹훅)에 넘긴 뒤 같은 트랜잭션에서 dispatched_at을 기록
+  - 실패하면 되돌리고 임대가 끝난 뒤 다시 시도, OUTBOX_MAX_ATTEMPTS번 넘게 실패하면 last_error와 함께 포기
+- 실행 방식
+  - 기본: 각 워커의 스레드가 새 대댓글 커밋 직후 notify()로 깨어나 OUTBOX_BATCH_DELAY초 모은 뒤 처리,
+    그 외에는 OUTBOX_POLL_INTERVAL초마다 확인 (다른 워커가 남긴 이벤트도 처리)
+  - OUTBOX_DISPATCH_IN_WORKER=false면 웹 워커는 쌓기만 하고 python -m app.db.dispatch_outbox가 처리
+
+전달은 at-least-once: 임대가 끝난 배치는 다른 디스패처가 다시 가져갈 수 있으므로 웹훅 수신 측은 id로 중복을 걸러야 한다.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Protocol
+
+import requests
+from sqlalchemy.orm import Session
+
+from app.core import metrics, tracing
+from app.db.base import session_scope
+from app.db.models import OutboxEvent, User
+from app.db.repository import NotificationRepository, OutboxRepository
+
+logger = logging.getLogger("dreamscope.outbox")
+
+OUTBOX_DISPATCH_IN_WORKER = os.getenv("OUTBOX_DISPATCH_IN_WORKER", "true").lower() == "true"
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "200"))
+OUTBOX_BATCH_DELAY = float(os.getenv("OUTBOX_BATCH_DELAY", "1.0"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "10"))
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "60"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_WEBHOOK_URL = os.getenv("OUTBOX_WEBHOOK_URL")
+OUTBOX_WEBHOOK_TIMEOUT = float(os.getenv("OUTBOX_WEBHOOK_TIMEOUT", "5"))
+
+REPLY_TOPIC = "comment.replied"
+
+
+# --- 묶기 ---
+
+
+def coalesce(session: Session, events: list[OutboxEvent]) -> list[dict]:
+    """Fold reply events into one notification per (recipient, dream).
+
+    Returns dicts with user_id, kind, dream_id and payload
+    ({"count", "comment_ids", "actors", "preview"}); other topics are ignored.
+    """
+    groups: dict[tuple[int, int], list[dict]] = defaultdict(list)
+    for event in events:
+        if event.topic == REPLY_TOPIC:
+            p = event.payload
+            groups[(p["recipient_id"], p["dream_id"])].append(p)
+    if not groups:
+        return []
+    actor_ids = {p["actor_id"] for group in groups.values() for p in group}
+    users = session.query(User).filter(User.id.in_(actor_ids)).all()
+    names = {u.id: u.name() for u in users}
+
+    notes = []
+    for (recipient_id, dream_id), group in groups.items():
+        actors: dict[int, dict] = {}
+        for p in group:
+            actors.setdefault(p["actor_id"], {"id": p["actor_id"], "name": names.get(p["actor_id"])})
+        notes.append(
+            {
+                "user_id": recipient_id,
+                "kind": "reply",
+                "dream_id": dream_id,
+                "payload": {
+                    "count": len(group),
+                    "comment_ids": [p["comment_id"] for p in group],
+                    "actors": list(actors.values()),
+                    "preview": group[-1]["preview"],
+                },
+            }
+        )
+    return notes
+
+
+# --- 전달 대상 ---
+
+
+class Sink(Protocol):
+    def deliver(self, session: Session, notes: list[dict]) -> None:
+        """Deliver coalesced notifications; raise to retry the whole batch later."""
+        ...
+
+
+class InboxSink:
+    """In-app inbox (notifications table), written in the dispatcher's transaction."""
+
+    def deliver(self, session: Session, notes: list[dict]) -> None:
+        repo = NotificationRepository(session)
+        for note in notes:
+            repo.add_coalesced(note["user_id"], note["kind"], note["dream_id"], note["payload"])
+
+
+class WebhookSink:
+    """POSTs each batch as JSON to an external endpoint (e.g. a push/e-mail service)."""
+
+    def __init__(self, url: str, timeout: float = OUTBOX_WEBHOOK_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+
+    def deliver(self, session: Session, notes: list[dict]) -> None:
+        if not notes:
+            return
+        with tracing.client_span("POST", self.url) as span:
+            r = requests.post(self.url, json={"notifications": notes}, timeout=self.timeout)
+            span.set_attribute("http.response.status_code", r.status_code)
+        r.raise_for_status()
+
+
+_sinks: list[Sink] = [InboxSink()]
+if OUTBOX_WEBHOOK_URL:
+    _sinks.append(WebhookSink(OUTBOX_WEBHOOK_URL))
+
+
+def set_sinks(sinks: list[Sink]) -> None:
+    """Replace the delivery targets, e.g. to add a push-notification sink."""
+    global _sinks
+    _sinks = list(sinks)
+
+
+# --- 디스패치 ---
+
+
+def dispatch_once(
+    session: Session,
+    batch_size: int = OUTBOX_BATCH_SIZE,
+    sinks: list[Sink] | None = None,
+    lease_seconds: float = OUTBOX_LEASE_SECONDS,
+    max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+) -> int:
+    """Claim and deliver one batch; return the number of events taken (0 = nothing pending)."""
+    repo = OutboxRepository(session)
+    events = repo.claim(batch_size, lease_seconds)
+    if not events:
+        return 0
+    claimed = [(e.id, e.topic, e.attempts) for e in events]
+    ids = [i for i, _, _ in claimed]
+    try:
+        with tracing.start_span("outbox.dispatch", attributes={"outbox.batch_size": len(ids)}):
+            notes = coalesce(session, events)
+            for sink in _sinks if sinks is None else sinks:
+                sink.deliver(session, notes)
+            repo.mark_dispatched(ids)
+            session.commit()
+    except Exception as e:
+        session.rollback()
+        error = f"{type(e).__name__}: {e}"
+        dead = [i for i, _, attempts in claimed if attempts >= max_attempts]
+        retry = [i for i, _, attempts in claimed if attempts < max_attempts]
+        if retry:
+            repo.release(retry, error)
+        if dead:
+            repo.mark_dispatched(dead, error=error)
+        session.commit()
+        for _, topic, attempts in claimed:
+            metrics.outbox_events.inc(topic, "dead" if attempts >= max_attempts else "retry")
+        logger.warning(
+            "outbox batch of %d failed (%d will retry, %d dropped): %s",
+            len(ids), len(retry), len(dead), error,
+        )
+        return len(ids)
+    for _, topic, _ in claimed:
+        metrics.outbox_events.inc(topic, "dispatched")
+    return len(ids)
+
+
+def dispatch_pending(batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Drain everything currently claimable; return the number of events handled."""
+    total = 0
+    with session_scope() as db:
+        while True:
+            taken = dispatch_once(db, batch_size)
+            total += taken
+            if taken < batch_size:
+                return total
+
+
+class OutboxDispatcher:
+    """Per-worker thread that drains the outbox shortly after new events are committed."""
+
+    def __init__(
+        self,
+        batch_delay: float = OUTBOX_BATCH_DELAY,
+        poll_interval: float = OUTBOX_POLL_INTERVAL,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+    ):
+        self.batch_delay = batch_delay
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start this process's dispatcher thread (idempotent)."""
+        # serve.py가 fork하면 부모의 스레드는 자식에 없으므로 pid가 바뀌면 새로 시작
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._wake = threading.Event()
+            threading.Thread(target=self._worker, name="dreamscope-outbox", daemon=True).start()
+
+    def notify(self) -> None:
+        """Ask for a dispatch soon; call after committing a write that added events."""
+        if not OUTBOX_DISPATCH_IN_WORKER:
+            return
+        self.start()
+        self._wake.set()
+
+    def _worker(self) -> None:
+        wake = self._wake
+        while True:
+            if wake.wait(self.poll_interval):
+                # 잠깐 모아서 같은 사용자에게 가는 대댓글을 한 번에 묶음
+                time.sleep(self.batch_delay)
+                wake.clear()
+            try:
+                dispatch_pending(self.batch_size)
+            except Exception:
+                logger.exception("outbox dispatch failed")
+
+
+dispatcher = OutboxDispatcher()
@@ -0,0 +1,33 @@
+"""
+dream_graph 지연 생성 팩토리
+- langchain / langgraph / langchain_google_genai 임포트와 LLM 클라이언트, 그래프 컴파일을
+  첫 사용 시점까지 미룬다. 읽기 전용 워커는 이 비용을 전혀 지불하지 않는다.
+"""
+
+import threading
+
+_dream_graph = None
+_lock = threading.Lock()
+
+
+def get_dream_graph():
+    """Return the compiled dream graph, building it on first use."""
+    global _dream_graph
+    if _dream_graph is None:
+        with _lock:
+            if _dream_graph is None:
+                from app.core.llm import build_dream_graph
+
+                _dream_graph = build_dream_graph()
+    return _dream_graph
+
+
+def set_dream_graph(graph) -> None:
+    """Install a prebuilt graph (e.g. one compiled with a fake model)."""
+    global _dream_graph
+    with _lock:
+        _dream_graph = graph
+
+
+def is_loaded() -> bool:
+    return _dream_graph is not None
@@ -0,0 +1,389 @@
+"""
+채널 단위 pub/sub (댓글 실시간 스트림용)
+- 쓰기 라우트가 publish(channel, event)로 변경분(delta)을 발행하면
+  같은 채널을 구독 중인 SSE 연결들에 그대로 전달 (목록 전체를 다시 보내지 않음)
+- Hub: 워커 안의 fan-out
+  - 구독자마다 asyncio.Queue (이벤트 루프 스레드에서 소비, 발행은 스레드풀 라우트에서 call_soon_threadsafe)
+  - 큐가 PUBSUB_SUBSCRIBER_QUEUE를 넘는 느린 구독자는 resync를 보내고 끊음 -> 클라이언트가 목록을 다시 받음
+  - 채널마다 최근 PUBSUB_BACKLOG개 이벤트를 보관해 재접속(Last-Event-ID) 시 놓친 이벤트를 재전송
+    (보관 범위를 벗어난 id로 재접속하면 resync)
+- Transport: 워커/인스턴스 간 전달 방식
+  - 기본값 LocalTransport는 같은 프로세스의 Hub로 바로 전달 (단일 워커/개발용 대체 구현)
+  - PostgresTransport는 앱 DB의 LISTEN/NOTIFY로 모든 워커에 전달 (워커마다 수신 스레드 하나)
+    - NOTIFY 한도(약 8000바이트)를 넘는 이벤트는 id만 보내고, 받은 워커는 해당 채널을 resync
+    - 수신 연결이 끊겼다 붙으면 그 사이 이벤트를 알 수 없으므로 모든 채널을 resync
+  - start_transport(engine, workers): 워커 프로세스 시작 시 PUBSUB_TRANSPORT(auto/local/postgres)에 따라 선택
+    - auto: 워커가 여럿이고 DB가 Postgres이면 PostgresTransport
+    - 여러 워커인데 LocalTransport면 경고를 남기고, 다른 워커의 이벤트를 놓쳤을 수 있으므로
+      Last-Event-ID 재접속은 항상 resync
+  - 다른 브로커(예: Redis pub/sub)도 같은 인터페이스로 set_transport에 주입하고 수신 스레드에서 hub.deliver 호출
+
+이벤트 id는 발행 시점에 정해지므로 모든 워커의 backlog에서 같은 id를 가진다.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Protocol
+
+import orjson
+
+PUBSUB_BACKLOG = int(os.getenv("PUBSUB_BACKLOG", "100"))
+PUBSUB_SUBSCRIBER_QUEUE = int(os.getenv("PUBSUB_SUBSCRIBER_QUEUE", "256"))
+PUBSUB_MAX_SUBSCRIBERS = int(os.getenv("PUBSUB_MAX_SUBSCRIBERS", "2000"))
+PUBSUB_MAX_CHANNELS = int(os.getenv("PUBSUB_MAX_CHANNELS", "10000"))
+PUBSUB_TRANSPORT = os.getenv("PUBSUB_TRANSPORT", "auto")
+PUBSUB_PG_CHANNEL = os.getenv("PUBSUB_PG_CHANNEL", "dreamscope_events")
+
+# Postgres NOTIFY payload 한도(8000바이트)보다 조금 작게
+_NOTIFY_MAX_BYTES = 7900
+
+logger = logging.getLogger("dreamscope.pubsub")
+
+# 구독 종료 신호 (큐에 넣으면 소비 측 루프가 끝남)
+CLOSED = object()
+RESYNC = object()
+
+
+_sequence = itertools.count()
+
+
+def next_event_id() -> int:
+    # 워커가 달라도 거의 단조 증가하도록 시각(µs) 기반 + 같은 µs 안의 순번
+    return time.time_ns() // 1000 * 1000 + next(_sequence) % 1000
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscription:
+    def __init__(self, hub: "Hub", channel: str, loop: asyncio.AbstractEventLoop):
+        self.hub = hub
+        self.channel = channel
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.dropped = False
+
+    def _put(self, item: Any) -> None:
+        # 이벤트 루프 스레드에서 실행됨
+        if self.dropped:
+            return
+        if item is not CLOSED and self.queue.qsize() >= PUBSUB_SUBSCRIBER_QUEUE:
+            self.dropped = True
+            self.queue.put_nowait(RESYNC)
+            return
+        self.queue.put_nowait(item)
+
+    async def get(self) -> Any:
+        return await self.queue.get()
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+
+class _Backlog:
+    __slots__ = ("events", "floor")
+
+    def __init__(self, size: int, floor: int):
+        self.events: deque[tuple[int, dict]] = deque(maxlen=size)
+        self.floor = floor
+
+    @property
+    def newest(self) -> int:
+        return max(self.events[-1][0], self.floor) if self.events else self.floor
+
+    def append(self, event_id: int, event: dict) -> None:
+        if len(self.events) == self.events.maxlen:
+            self.floor = max(self.floor, self.events[0][0])
+        self.events.append((event_id, event))
+
+
+class Hub:
+    """Per-process fan-out from channels to async subscribers."""
+
+    def __init__(self, backlog: int = PUBSUB_BACKLOG, max_subscribers: int = PUBSUB_MAX_SUBSCRIBERS):
+        self.backlog = backlog
+        self.max_subscribers = max_subscribers
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._backlogs: OrderedDict[str, _Backlog] = OrderedDict()
+        # 이 id보다 오래된 이벤트는 (워커 시작 전이거나 버려져서) 없을 수 있음
+        self._floor = next_event_id()
+        self._count = 0
+        # 다른 워커의 이벤트가 이 Hub에 오지 않는 구성 (멀티 워커 + LocalTransport)
+        self.isolated = False
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return self._count
+
+    def subscribe(self, channel: str) -> Subscription:
+        """Register a subscriber; must be called from the event loop thread."""
+        sub = Subscription(self, channel, asyncio.get_running_loop())
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                raise TooManySubscribers(channel)
+            self._subscribers.setdefault(channel, set()).add(sub)
+            self._count += 1
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.channel)
+            if subs and sub in subs:
+                subs.discard(sub)
+                self._count -= 1
+                if not subs:
+                    del self._subscribers[sub.channel]
+
+    def latest(self, channel: str) -> int:
+        """Newest event id this worker can resume `channel` from."""
+        with self._lock:
+            backlog = self._backlogs.get(channel)
+            return backlog.newest if backlog is not None else self._floor
+
+    def since(self, channel: str, event_id: int) -> list[tuple[int, dict]] | None:
+        """Events after `event_id`, or None if some of them may no longer be kept."""
+        with self._lock:
+            if self.isolated:
+                return None
+            backlog = self._backlogs.get(channel)
+            floor = backlog.floor if backlog is not None else self._floor
+            if event_id < floor:
+                return None
+            return [(i, e) for i, e in (backlog.events if backlog else ()) if i > event_id]
+
+    def deliver(self, channel: str, event_id: int, event: dict) -> None:
+        """Hand an event to local subscribers (thread-safe; called by the transport)."""
+        with self._lock:
+            backlog = self._backlogs.get(channel)
+            if backlog is None:
+                backlog = self._backlogs[channel] = _Backlog(self.backlog, self._floor)
+                if len(self._backlogs) > PUBSUB_MAX_CHANNELS:
+                    # 가장 오래 조용했던 채널부터 버림; 그 채널의 재접속은 resync
+                    _, evicted = self._backlogs.popitem(last=False)
+                    self._floor = max(self._floor, evicted.newest)
+            else:
+                self._backlogs.move_to_end(channel)
+            backlog.append(event_id, event)
+            subs = list(self._subscribers.get(channel, ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._put, (event_id, event))
+            except RuntimeError:
+                # 루프가 이미 닫힘 (워커 종료 중)
+                self.unsubscribe(sub)
+
+    def gap(self, channel: str, event_id: int) -> None:
+        """Record an event that was published but could not be delivered; subscribers resync."""
+        with self._lock:
+            backlog = self._backlogs.get(channel)
+            if backlog is None:
+                backlog = self._backlogs[channel] = _Backlog(self.backlog, self._floor)
+            backlog.floor = max(backlog.floor, event_id)
+            subs = list(self._subscribers.get(channel, ()))
+        self._send_resync(subs)
+
+    def gap_all(self) -> None:
+        """Every channel may have missed events (e.g. the transport reconnected)."""
+        floor = next_event_id()
+        with self._lock:
+            self._floor = max(self._floor, floor)
+            for backlog in self._backlogs.values():
+                backlog.floor = max(backlog.floor, floor)
+            subs = [s for group in self._subscribers.values() for s in group]
+        self._send_resync(subs)
+
+    @staticmethod
+    def _send_resync(subs: list[Subscription]) -> None:
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._put, RESYNC)
+            except RuntimeError:
+                pass
+
+    def close_all(self) -> None:
+        """End every open stream, e.g. when the worker shuts down."""
+        with self._lock:
+            subs = [s for group in self._subscribers.values() for s in group]
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._put, CLOSED)
+            except RuntimeError:
+                pass
+
+
+class Transport(Protocol):
+    def publish(self, channel: str, event_id: int, event: dict) -> None:
+        """Deliver the event to the Hub of every worker (including this one)."""
+        ...
+
+
+class LocalTransport:
+    """Single-process stand-in for a shared broker."""
+
+    def __init__(self, hub: Hub):
+        self.hub = hub
+
+    def publish(self, channel: str, event_id: int, event: dict) -> None:
+        self.hub.deliver(channel, event_id, event)
+
+
+class PostgresTransport:
+    """Cross-worker fan-out over LISTEN/NOTIFY on the application database.
+
+    Publishing sends one NOTIFY; every worker (the publisher included)
+    receives it on its listener thread and hands it to its Hub.
+    """
+
+    def __init__(self, hub: Hub, engine, channel: str = PUBSUB_PG_CHANNEL):
+        self.hub = hub
+        self.engine = engine
+        self.channel = channel
+        self.conninfo = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def publish(self, channel: str, event_id: int, event: dict) -> None:
+        from sqlalchemy import text
+
+        payload = orjson.dumps({"c": channel, "i": event_id, "e": event})
+        if len(payload) > _NOTIFY_MAX_BYTES:
+            # 너무 큰 이벤트는 id만 보내고 받는 쪽에서 목록을 다시 받게 함
+            payload = orjson.dumps({"c": channel, "i": event_id})
+        with self.engine.begin() as conn:
+            conn.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self.channel, "payload": payload.decode()},
+            )
+
+    def _receive(self, payload: str) -> None:
+        message = orjson.loads(payload)
+        if "e" in message:
+            self.hub.deliver(message["c"], message["i"], message["e"])
+        else:
+            self.hub.gap(message["c"], message["i"])
+
+    def _listen(self) -> None:
+        import psycopg
+        from psycopg import sql
+
+        delay = 1.0
+        connected_before = False
+        while not self._stopped.is_set():
+            try:
+                with psycopg.connect(self.conninfo, autocommit=True) as conn:
+                    conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+                    if connected_before:
+                        # 끊긴 동안의 NOTIFY는 사라졌으므로 모든 구독자를 resync
+                        self.hub.gap_all()
+                    connected_before = True
+                    delay = 1.0
+                    while not self._stopped.is_set():
+                        for note in conn.notifies(timeout=1.0):
+                            self._receive(note.payload)
+            except Exception:
+                logger.warning("pubsub listener disconnected; retrying in %.0fs", delay, exc_info=True)
+                self._stopped.wait(delay)
+                delay = min(delay * 2, 30.0)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._listen, name="dreamscope-pubsub", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+hub = Hub()
+_transport: Transport = LocalTransport(hub)
+
+
+def set_transport(transport: Transport) -> None:
+    """Swap the cross-worker transport, e.g. for Redis pub/sub."""
+    global _transport
+    _transport = transport
+
+
+def start_transport(engine, workers: int) -> None:
+    """Pick the transport for this worker process (call after fork)."""
+    mode = PUBSUB_TRANSPORT
+    if mode == "auto":
+        mode = "postgres" if workers > 1 and engine.dialect.name == "postgresql" else "local"
+    if mode == "postgres":
+        transport = PostgresTransport(hub, engine)
+        transport.start()
+        set_transport(transport)
+    elif workers > 1:
+        hub.isolated = True
+        logger.warning(
+            "comment streams use LocalTransport with %d workers: events published on another "
+            "worker are not delivered live, and reconnects always resync "
+            "(use Postgres or PUBSUB_TRANSPORT=postgres)",
+            workers,
+        )
+
+
+def publish(channel: str, event: dict) -> int:
+    event_id = next_event_id()
+    _transport.publish(channel, event_id, event)
+    return event_id
+
+
+# --- SSE (text/event-stream) ---
+
+SSE_HEARTBEAT = float(os.getenv("SSE_HEARTBEAT", "15"))
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "3000"))
+
+
+def _resync(sub: Subscription) -> bytes:
+    # id를 함께 보내야 EventSource가 오래된 Last-Event-ID로 재접속해 resync를 반복하지 않음
+    return b"id: %d\nevent: resync\ndata: {}\n\n" % sub.hub.latest(sub.channel)
+
+
+def _sse(event_id: int, event: dict) -> bytes:
+    data = orjson.dumps(event)
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event["type"].encode(), data)
+
+
+async def sse_stream(sub: Subscription, last_event_id: int | None = None, heartbeat: float = SSE_HEARTBEAT):
+    """Yield SSE frames for `sub`: missed events first, then live deltas.
+
+    Ends with a `resync` event when the client must reload the full list
+    (backlog too short for Last-Event-ID, or the client fell behind). It
+    carries the channel's latest id, so the reconnect resumes from there.
+    """
+    try:
+        yield b"retry: %d\n\n" % SSE_RETRY_MS
+        sent = last_event_id or 0
+        if last_event_id is not None:
+            missed = sub.hub.since(sub.channel, last_event_id)
+            if missed is None:
+                yield _resync(sub)
+                return
+            for event_id, event in missed:
+                yield _sse(event_id, event)
+                sent = event_id
+        while True:
+            try:
+                item = await asyncio.wait_for(sub.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if item is CLOSED:
+                return
+            if item is RESYNC:
+                yield _resync(sub)
+                return
+            event_id, event = item
+            if event_id <= sent:
+                continue  # 구독 직후 backlog 재전송과 겹친 이벤트
+            yield _sse(event_id, event)
+            sent = event_id
+    finally:
+        sub.close()
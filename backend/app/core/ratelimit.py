@@ -0,0 +1,140 @@
+"""
+LLM 파이프라인 진입 제어 (admission control)
+- 사용자별 / 전역 토큰 버킷으로 요청 속도 제한
+- 동시에 실행되는 dream_graph 수를 세마포어로 제한
+- 허용되지 않으면 RateLimited(retry_after)를 던지고, 라우트에서 429 + Retry-After로 변환
+
+버킷 상태 저장소(BucketBackend)는 교체 가능하다. 기본값은 프로세스 메모리에 두는
+InMemoryBucketBackend이며, 여러 워커/인스턴스가 한도를 공유해야 하면 같은 인터페이스로
+공유 저장소(예: Redis) 구현을 set_backend로 주입한다.
+"""
+
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Protocol
+
+RATE_LIMIT_USER_PER_MIN = float(os.getenv("RATE_LIMIT_USER_PER_MIN", "6"))
+RATE_LIMIT_USER_BURST = float(os.getenv("RATE_LIMIT_USER_BURST", "3"))
+RATE_LIMIT_GLOBAL_PER_MIN = float(os.getenv("RATE_LIMIT_GLOBAL_PER_MIN", "120"))
+RATE_LIMIT_GLOBAL_BURST = float(os.getenv("RATE_LIMIT_GLOBAL_BURST", "20"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "2"))
+LLM_BUSY_RETRY_AFTER = float(os.getenv("LLM_BUSY_RETRY_AFTER", "5"))
+
+
+class RateLimited(Exception):
+    def __init__(self, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class BucketBackend(Protocol):
+    def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        """Consume `cost` tokens; return 0 on success or seconds until enough tokens exist."""
+        ...
+
+    def refund(self, key: str, capacity: float, cost: float = 1.0) -> None:
+        """Give back tokens taken by a request that was rejected further along."""
+        ...
+
+
+class InMemoryBucketBackend:
+    """Process-local token buckets; the stand-in for a shared backend."""
+
+    def __init__(self):
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+        return (cost - tokens) / rate if rate > 0 else float("inf")
+
+    def refund(self, key: str, capacity: float, cost: float = 1.0) -> None:
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated = self._buckets[key]
+                self._buckets[key] = (min(capacity, tokens + cost), updated)
+
+
+class RateLimiter:
+    """Per-user and global token buckets in front of the LLM pipeline."""
+
+    def __init__(self, backend: BucketBackend | None = None):
+        self.backend: BucketBackend = backend or InMemoryBucketBackend()
+
+    def check(self, user_id: int) -> None:
+        user_key = f"llm:user:{user_id}"
+        user_rate = RATE_LIMIT_USER_PER_MIN / 60.0
+        wait = self.backend.take(user_key, user_rate, RATE_LIMIT_USER_BURST)
+        if wait > 0:
+            raise RateLimited("Too many dream requests; please slow down", wait)
+
+        global_rate = RATE_LIMIT_GLOBAL_PER_MIN / 60.0
+        wait = self.backend.take("llm:global", global_rate, RATE_LIMIT_GLOBAL_BURST)
+        if wait > 0:
+            # 전역 한도에 걸린 요청은 사용자 토큰을 소모하지 않도록 되돌림
+            self.backend.refund(user_key, RATE_LIMIT_USER_BURST)
+            raise RateLimited("Dream service is busy; please retry shortly", wait)
+
+
+class ConcurrencyLimiter:
+    """Caps simultaneous dream_graph runs and tracks how many are in flight."""
+
+    def __init__(self, limit: int = LLM_MAX_CONCURRENCY):
+        self.limit = limit
+        self._slots = threading.BoundedSemaphore(limit)
+        self._in_flight = 0
+        self._lock = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self, timeout: float = LLM_QUEUE_TIMEOUT) -> None:
+        if not self._slots.acquire(timeout=timeout):
+            raise RateLimited("Dream service is at capacity", LLM_BUSY_RETRY_AFTER)
+        with self._lock:
+            self._in_flight += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._lock.notify_all()
+        self._slots.release()
+
+    def wait_idle(self, timeout: float) -> bool:
+        """Block until no dream_graph run is in flight; False on timeout."""
+        with self._lock:
+            return self._lock.wait_for(lambda: self._in_flight == 0, timeout)
+
+    @contextmanager
+    def slot(self, timeout: float = LLM_QUEUE_TIMEOUT):
+        self.acquire(timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+rate_limiter = RateLimiter()
+llm_concurrency = ConcurrencyLimiter()
+
+
+def set_backend(backend: BucketBackend) -> None:
+    """Swap the bucket store, e.g. for a shared one across workers."""
+    rate_limiter.backend = backend
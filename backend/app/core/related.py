@@ -0,0 +1,358 @@
+"""
+비슷한 꿈 추천 (GET /dreams/{id}/related)
+- 태그 -> dream id 역색인(posting list)과 꿈별 태그 목록(CSR)을 메모리에 보관
+- 후보: 대상 꿈의 태그별 posting(태그당 최근 RELATED_MAX_POSTINGS개)을 모아 IDF 가중 Jaccard로 점수화
+- 상위 RELATED_RERANK개는 요약/본문 해시 임베딩(memory.embed) 코사인 유사도와 섞어 재정렬
+- 결과는 꿈별 LRU로 캐시하고, 같은 태그를 가진 새 꿈이 들어오면 해당 캐시만 무효화
+
+태그 하나에 달린 꿈이 아무리 많아도 posting은 최근 일부만 읽으므로 조회 비용은 태그 수 x 상한에 비례한다.
+다른 워커가 저장한 꿈은 tag_stats와 같은 방식(id 워터마크 아래 겹침 구간부터 조회)으로 따라잡는다.
+삭제/보관된 꿈은 같은 프로세스에서는 remove_dreams로 바로 빼고, 다른 프로세스에서 지운 꿈은
+tag_stats처럼 TAG_STATS_REBUILD_INTERVAL마다 백그라운드 재적재로 posting/IDF에서 빠진다.
+"""
+
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+import numpy as np
+
+from app.core import background
+from app.core.memory import embed
+from app.core.tag_stats import TAG_STATS_REBUILD_INTERVAL, TAG_STATS_SYNC_OVERLAP, DreamTags
+
+RELATED_MAX_POSTINGS = int(os.getenv("RELATED_MAX_POSTINGS", "20000"))
+RELATED_RERANK = int(os.getenv("RELATED_RERANK", "50"))
+RELATED_EMBED_WEIGHT = float(os.getenv("RELATED_EMBED_WEIGHT", "0.3"))
+RELATED_CACHE_SIZE = int(os.getenv("RELATED_CACHE_SIZE", "10000"))
+RELATED_SYNC_INTERVAL = float(os.getenv("RELATED_SYNC_INTERVAL", "30"))
+
+
+def _grow(arr: np.ndarray, size: int, fill: int = 0) -> np.ndarray:
+    if size <= len(arr):
+        return arr
+    grown = np.full(max(size, len(arr) * 2), fill, dtype=arr.dtype)
+    grown[: len(arr)] = arr
+    return grown
+
+
+class RelatedIndex:
+    """Tag inverted index plus per-dream tag lists for similarity lookups."""
+
+    def __init__(
+        self,
+        sync_interval: float = RELATED_SYNC_INTERVAL,
+        rebuild_interval: float = TAG_STATS_REBUILD_INTERVAL,
+    ):
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self._tag_ids: dict[str, int] = {}
+        self._tag_names: list[str] = []
+        self._postings: list[array] = []
+        self._df = np.zeros(64, dtype=np.int64)
+        # 꿈별 태그 목록 (CSR): dream id -> row, row의 태그는 _flat[_offsets[row]:_offsets[row + 1]]
+        self._row_of = np.full(1024, -1, dtype=np.int32)
+        self._offsets = np.zeros(1024, dtype=np.int64)
+        self._flat = np.zeros(4096, dtype=np.int32)
+        self._rows = 0
+        # 제거된 꿈의 행은 비워 두고 IDF의 문서 수에서만 뺌
+        self._removed = 0
+        self._watermark = 0
+        self._loaded = False
+        self._loaded_at = 0.0
+        self._synced_at = 0.0
+        self._rebuilding = False
+        self._lock = threading.RLock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def __len__(self) -> int:
+        return self._rows - self._removed
+
+    def _tag(self, name: str) -> int:
+        t = self._tag_ids.get(name)
+        if t is None:
+            t = self._tag_ids[name] = len(self._postings)
+            self._tag_names.append(name)
+            self._postings.append(array("i"))
+            self._df = _grow(self._df, t + 1)
+        return t
+
+    def _row(self, dream_id: int) -> int:
+        return int(self._row_of[dream_id]) if dream_id < len(self._row_of) else -1
+
+    def _tags_of_row(self, row: int) -> np.ndarray:
+        return self._flat[self._offsets[row] : self._offsets[row + 1]]
+
+    def _add(self, dream_id: int, tag_names: Iterable[str]) -> list[int] | None:
+        if self._row(dream_id) >= 0:
+            return None
+        tags = sorted({self._tag(n) for n in tag_names})
+        row = self._rows
+        start = int(self._offsets[row])
+        self._row_of = _grow(self._row_of, dream_id + 1, fill=-1)
+        self._offsets = _grow(self._offsets, row + 2)
+        self._flat = _grow(self._flat, start + len(tags))
+        self._row_of[dream_id] = row
+        self._flat[start : start + len(tags)] = tags
+        self._offsets[row + 1] = start + len(tags)
+        self._rows += 1
+        for t in tags:
+            self._postings[t].append(dream_id)
+            self._df[t] += 1
+        return tags
+
+    def load(self, rows: Iterable[DreamTags]) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            for dream_id, _, names in rows:
+                self._add(dream_id, names)
+                self._watermark = max(self._watermark, dream_id)
+            self._loaded = True
+            self._loaded_at = self._synced_at = time.monotonic()
+
+    def add(self, dream_id: int, tag_names: Iterable[str]) -> list[str]:
+        """Index a new dream; return its tag names (empty if already indexed).
+
+        The watermark is left alone: lower ids saved by other workers may
+        still be missing, and only sync() reads them.
+        """
+        names = list(tag_names)
+        with self._lock:
+            if not self._loaded or self._add(dream_id, names) is None:
+                return []
+        return names
+
+    def sync(self, loader: Callable[[int], Iterable[DreamTags]]) -> list[list[str]]:
+        """Index dreams not seen yet; return the tag lists that were added.
+
+        Like TagStats.sync, re-reads an overlap window below the watermark so
+        ids that commit out of order are not skipped.
+        """
+        with self._lock:
+            after = max(0, self._watermark - TAG_STATS_SYNC_OVERLAP)
+        rows = list(loader(after))
+        added = []
+        with self._lock:
+            for dream_id, _, names in rows:
+                # 이 워커가 훅으로 이미 넣은 꿈은 건너뜀
+                if self._row(dream_id) < 0:
+                    self._add(dream_id, names)
+                    added.append(names)
+                self._watermark = max(self._watermark, dream_id)
+            self._synced_at = time.monotonic()
+        return added
+
+    def remove(self, dream_ids: Iterable[int]) -> list[str]:
+        """Drop deleted/archived dreams from the postings; return the tag names they had."""
+        with self._lock:
+            gone = {i for i in dream_ids if self._row(i) >= 0}
+            tags = set()
+            for dream_id in gone:
+                tags.update(int(t) for t in self._tags_of_row(self._row(dream_id)))
+                self._row_of[dream_id] = -1
+            for t in tags:
+                self._postings[t] = array("i", (i for i in self._postings[t] if i not in gone))
+                self._df[t] = len(self._postings[t])
+            self._removed += len(gone)
+            return [self._tag_names[t] for t in sorted(tags)]
+
+    def needs_sync(self) -> bool:
+        return time.monotonic() - self._synced_at >= self.sync_interval
+
+    def needs_rebuild(self) -> bool:
+        return time.monotonic() - self._loaded_at >= self.rebuild_interval
+
+    def rebuild(
+        self,
+        load_all: Callable[[], Iterable[DreamTags]],
+        on_swap: Callable[[], None] | None = None,
+    ) -> None:
+        """Reload from the DB and swap in the result (drops dreams removed by other processes)."""
+        try:
+            fresh = RelatedIndex(self.sync_interval, self.rebuild_interval)
+            fresh.load(load_all())
+            with self._lock:
+                state = {k: v for k, v in vars(fresh).items() if k not in ("_lock", "_rebuilding")}
+                vars(self).update(state)
+            if on_swap is not None:
+                on_swap()
+        finally:
+            self._rebuilding = False
+
+    def start_rebuild(
+        self,
+        load_all: Callable[[], Iterable[DreamTags]],
+        on_swap: Callable[[], None] | None = None,
+    ) -> None:
+        """Rebuild in the background unless one is running; lookups keep using this index."""
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        background.submit(self.rebuild, load_all, on_swap)
+
+    def tags_of(self, dream_id: int) -> list[str]:
+        with self._lock:
+            row = self._row(dream_id)
+            if row < 0:
+                return []
+            return [self._tag_names[t] for t in self._tags_of_row(row)]
+
+    def candidates(self, dream_id: int, limit: int) -> list[tuple[int, float]]:
+        """Top dreams by IDF-weighted Jaccard over tags, best first."""
+        with self._lock:
+            row = self._row(dream_id)
+            if row < 0:
+                return []
+            tags = self._tags_of_row(row)
+            if len(tags) == 0:
+                return []
+            n_tags = len(self._postings)
+            idf = np.log1p((self._rows - self._removed) / np.maximum(self._df[:n_tags], 1))
+            ids = []
+            weights = []
+            for t in tags:
+                posting = np.array(self._postings[t][-RELATED_MAX_POSTINGS:], dtype=np.int64)
+                ids.append(posting)
+                weights.append(np.full(len(posting), idf[t]))
+            ids = np.concatenate(ids)
+            uniq, inverse = np.unique(ids, return_inverse=True)
+            inter = np.bincount(inverse, weights=np.concatenate(weights))
+            keep = uniq != dream_id
+            uniq, inter = uniq[keep], inter[keep]
+            if len(uniq) == 0:
+                return []
+
+            # 후보별 태그 가중치 합 (CSR 구간을 한 번에 모아 reduceat)
+            rows = self._row_of[uniq]
+            starts = self._offsets[rows]
+            lengths = self._offsets[rows + 1] - starts
+            seg = np.cumsum(lengths) - lengths
+            pos = np.arange(lengths.sum()) - np.repeat(seg, lengths) + np.repeat(starts, lengths)
+            other_weight = np.add.reduceat(idf[self._flat[pos]], seg)
+            own_weight = idf[tags].sum()
+
+        scores = inter / np.maximum(own_weight + other_weight - inter, 1e-9)
+        k = min(limit, len(uniq))
+        top = np.argpartition(-scores, k - 1)[:k]
+        # 동점이면 최신(큰 id) 우선
+        top = top[np.lexsort((-uniq[top], -scores[top]))]
+        return [(int(uniq[i]), float(scores[i])) for i in top]
+
+
+class RelatedCache:
+    """Per-dream LRU of ranked results, invalidated by tag."""
+
+    def __init__(self, max_size: int = RELATED_CACHE_SIZE):
+        self.max_size = max_size
+        self._items: "OrderedDict[int, tuple[list[str], list[tuple[int, float]]]]" = OrderedDict()
+        self._by_tag: dict[str, set[int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, dream_id: int) -> list[tuple[int, float]] | None:
+        with self._lock:
+            item = self._items.get(dream_id)
+            if item is None:
+                return None
+            self._items.move_to_end(dream_id)
+            return item[1]
+
+    def put(self, dream_id: int, tags: list[str], result: list[tuple[int, float]]) -> None:
+        with self._lock:
+            self._items[dream_id] = (tags, result)
+            self._items.move_to_end(dream_id)
+            for name in tags:
+                self._by_tag.setdefault(name, set()).add(dream_id)
+            while len(self._items) > self.max_size:
+                evicted, (evicted_tags, _) = self._items.popitem(last=False)
+                self._forget(evicted, evicted_tags)
+
+    def _forget(self, dream_id: int, tags: list[str]) -> None:
+        for name in tags:
+            ids = self._by_tag.get(name)
+            if ids is not None:
+                ids.discard(dream_id)
+                if not ids:
+                    del self._by_tag[name]
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        """Drop cached results for every dream sharing one of `tags`."""
+        with self._lock:
+            for name in set(tags):
+                for dream_id in self._by_tag.pop(name, set()):
+                    item = self._items.pop(dream_id, None)
+                    if item is not None:
+                        self._forget(dream_id, item[0])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._by_tag.clear()
+
+
+related_index = RelatedIndex()
+related_cache = RelatedCache()
+
+
+def index_dream(dream_id: int, tag_names: Iterable[str]) -> None:
+    """Add a saved dream and invalidate cached results that share its tags."""
+    related_cache.invalidate_tags(related_index.add(dream_id, tag_names))
+
+
+def remove_dreams(dream_ids: Iterable[int]) -> None:
+    """Forget deleted/archived dreams and the cached results that could list them."""
+    related_cache.invalidate_tags(related_index.remove(dream_ids))
+
+
+def ensure_fresh(
+    load_all: Callable[[], Iterable[DreamTags]],
+    load_since: Callable[[int], Iterable[DreamTags]],
+) -> None:
+    """`load_all` must open its own session: rebuilds run after the request ends."""
+    if not related_index.loaded:
+        related_index.load(load_all())
+        return
+    if related_index.needs_rebuild():
+        related_index.start_rebuild(load_all, related_cache.clear)
+    if related_index.needs_sync():
+        for names in related_index.sync(load_since):
+            related_cache.invalidate_tags(names)
+
+
+def related_dreams(
+    dream_id: int,
+    limit: int,
+    load_texts: Callable[[list[int]], dict[int, str]],
+) -> list[tuple[int, float]]:
+    """Ranked (dream_id, score) list, served from cache when possible.
+
+    `load_texts` returns the summary/content text for the given ids; the
+    top RELATED_RERANK tag candidates are blended with embedding similarity.
+    """
+    cached = related_cache.get(dream_id)
+    if cached is not None:
+        return cached[:limit]
+
+    candidates = related_index.candidates(dream_id, max(limit, RELATED_RERANK))
+    if candidates and RELATED_EMBED_WEIGHT > 0:
+        texts = load_texts([dream_id] + [i for i, _ in candidates])
+        target = texts.get(dream_id)
+        if target:
+            query = embed(target)
+            blended = []
+            for i, jaccard in candidates:
+                text = texts.get(i)
+                cosine = max(0.0, float(embed(text) @ query)) if text else 0.0
+                score = (1 - RELATED_EMBED_WEIGHT) * jaccard + RELATED_EMBED_WEIGHT * cosine
+                blended.append((i, round(score, 4)))
+            candidates = sorted(blended, key=lambda x: (-x[1], -x[0]))
+    result = [(i, round(s, 4)) for i, s in candidates]
+    related_cache.put(dream_id, related_index.tags_of(dream_id), result)
+    return result[:limit]
@@ -0,0 +1,96 @@
+"""
+태그 이름 정규화
+- normalize: 저장/표시용 이름 (NFKC, 소문자, 공백 정리)
+- match_key: 같은 태그를 찾기 위한 키 (구분자 통일 + 가벼운 영어 어간 추출)
+  "Falling" / "falling" / "fall" / "falls" -> "fall", "driving" / "drives" -> "drive"
+  (복수형과 -ing/-ed 활용만 되돌림; "plane" / "plan", "scared" / "scar"는 다른 키)
+- closest_key: 정확한 키가 없을 때 기존 키 중 철자가 거의 같은 것(오타, 변형)을 찾음
+
+태그는 프롬프트에서 영어로 생성하도록 지시하므로 어간 규칙은 영어만 다룬다.
+"""
+
+import difflib
+import os
+import re
+import unicodedata
+from typing import Iterable
+
+TAG_FUZZY_CUTOFF = float(os.getenv("TAG_FUZZY_CUTOFF", "0.92"))
+# 이보다 짧은 키는 오타 매칭에서 제외 ("car" / "cat" 같은 오병합 방지)
+TAG_FUZZY_MIN_LEN = int(os.getenv("TAG_FUZZY_MIN_LEN", "5"))
+# 새 태그 하나당 오타 비교 후보 상한 (TagRepository.resolve)
+TAG_FUZZY_MAX_CANDIDATES = int(os.getenv("TAG_FUZZY_MAX_CANDIDATES", "500"))
+
+_SPACE_RE = re.compile(r"\s+")
+_SEPARATOR_RE = re.compile(r"[\s_\-]+")
+_VOWELS = set("aeiouy")
+
+
+def normalize(name: str) -> str:
+    return _SPACE_RE.sub(" ", unicodedata.normalize("NFKC", name or "")).strip().lower()
+
+
+def _measure(word: str) -> int:
+    # Porter의 m: 모음열 -> 자음열 전환 횟수
+    forms = "".join(
+        "v" if ch in _VOWELS - {"y"} or (ch == "y" and i > 0 and word[i - 1] not in _VOWELS) else "c"
+        for i, ch in enumerate(word)
+    )
+    return len(re.findall(r"v+c+", forms))
+
+
+def _ends_cvc(word: str) -> bool:
+    # hop, car, driv처럼 자음-모음-자음으로 끝나면 e가 떨어진 형태 (hoping -> hope)
+    if len(word) < 3:
+        return False
+    a, b, c = word[-3:]
+    return a not in _VOWELS and b in _VOWELS and c not in _VOWELS and c not in "wxy"
+
+
+def _stem(word: str) -> str:
+    """Fold plural and -ing/-ed forms back to the base word; other endings are kept.
+
+    Only inflections are undone (hoping/hoped -> hope, planned -> plan), so
+    distinct words such as plane/plan or scared/scar keep distinct keys.
+    """
+    if len(word) <= 3 or not word.isascii():
+        return word
+    if word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith(("xes", "zes", "ches", "shes")):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    for suffix in ("ing", "ed"):
+        if not word.endswith(suffix):
+            continue
+        base = word[: -len(suffix)]
+        # -eed는 활용이 아닌 경우가 많아 그대로 둠 (speed, bleed)
+        if suffix == "ed" and base.endswith("e"):
+            break
+        if len(base) >= 3 and _VOWELS & set(base):
+            if base.endswith(("at", "bl", "iz")):
+                return base + "e"
+            # running -> run (ll/ss/zz는 유지: falling -> fall)
+            if base[-1] == base[-2] and base[-1] not in "lsz":
+                return base[:-1]
+            if _measure(base) == 1 and _ends_cvc(base):
+                return base + "e"
+            return base
+    return word
+
+
+def match_key(name: str) -> str:
+    words = _SEPARATOR_RE.split(normalize(name))
+    return " ".join(_stem(w) for w in words if w)
+
+
+def closest_key(key: str, keys: Iterable[str], cutoff: float = TAG_FUZZY_CUTOFF) -> str | None:
+    """Nearest existing key by edit similarity, or None below `cutoff`."""
+    if len(key) < TAG_FUZZY_MIN_LEN:
+        return None
+    candidates = [k for k in keys if len(k) >= TAG_FUZZY_MIN_LEN and abs(len(k) - len(key)) <= 2]
+    matches = difflib.get_close_matches(key, candidates, n=1, cutoff=cutoff)
+    return matches[0] if matches else None
@@ -0,0 +1,246 @@
+"""
+태그 통계 (인기 / 급상승 / 함께 쓰인 태그)
+- 태그별 꿈 개수, 기간별(24h / 7d) 감쇠 점수, 태그 동시 출현(co-occurrence) 희소 행렬을 메모리에 보관
+- 최초 조회 시 dream_tags를 한 번 스트리밍해 적재하고, 이후에는 꿈 저장 시점에 증분 반영(add)
+- 다른 워커가 저장한 꿈은 sync 주기마다 id 워터마크 근처 이후 행만 읽어 따라잡음 (GROUP BY 재계산 없음)
+  - Postgres에서는 id가 커밋 순서와 다를 수 있으므로 워터마크 아래 TAG_STATS_SYNC_OVERLAP개 id를 다시 읽고,
+    이미 반영한 id(_applied)는 건너뜀
+- 삭제/보관된 꿈과 병합으로 사라진 태그는 증분으로 빼지 않고, TAG_STATS_REBUILD_INTERVAL마다
+  (또는 invalidate() 후 다음 조회 때) 백그라운드에서 새로 적재해 교체
+  - 워커당 한 번에 하나만 다시 적재하고, 그동안 요청은 기존 통계(와 sync)로 바로 응답
+  - load_all은 요청이 끝난 뒤에도 읽을 수 있도록 자체 세션을 여는 함수여야 함
+
+감쇠 점수는 반감기(half-life)가 기간 길이인 지수 감쇠로, 조회 시점 기준으로 한 번에 계산한다.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from itertools import combinations
+from typing import Callable, Iterable
+
+import numpy as np
+
+from app.core import background
+
+TAG_STATS_SYNC_INTERVAL = float(os.getenv("TAG_STATS_SYNC_INTERVAL", "30"))
+TAG_STATS_SYNC_OVERLAP = int(os.getenv("TAG_STATS_SYNC_OVERLAP", "1000"))
+TAG_STATS_REBUILD_INTERVAL = float(os.getenv("TAG_STATS_REBUILD_INTERVAL", "3600"))
+
+# 기간 이름 -> 반감기(초)
+TREND_WINDOWS = {"24h": 24 * 60 * 60, "7d": 7 * 24 * 60 * 60}
+
+# (dream_id, created_at, [tag names])
+DreamTags = tuple[int, datetime | None, list[str]]
+
+
+def _epoch(at: datetime | None) -> float:
+    if at is None:
+        return time.time()
+    if at.tzinfo is None:
+        # DB에는 utcnow()로 저장된 naive datetime
+        at = at.replace(tzinfo=timezone.utc)
+    return at.timestamp()
+
+
+class TagStats:
+    """Incrementally maintained tag counts, trend scores and co-occurrence."""
+
+    def __init__(
+        self,
+        sync_interval: float = TAG_STATS_SYNC_INTERVAL,
+        overlap: int = TAG_STATS_SYNC_OVERLAP,
+        rebuild_interval: float = TAG_STATS_REBUILD_INTERVAL,
+    ):
+        self.sync_interval = sync_interval
+        self.overlap = overlap
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.RLock()
+        self._ids: dict[str, int] = {}
+        self.names: list[str] = []
+        self._counts = np.zeros(64, dtype=np.int64)
+        # 기간별 감쇠 점수, _scored_at 시점 기준 값
+        self._scores = {w: np.zeros(64, dtype=np.float64) for w in TREND_WINDOWS}
+        self._scored_at = time.time()
+        # 희소 대칭 행렬 (dict-of-keys): tag index -> {other index: count}
+        self._pairs: dict[int, dict[int, int]] = {}
+        # DB에서 읽은 마지막 dream id, 워터마크 - overlap 이후로 반영된 id (훅/sync 중복 방지)
+        self._watermark = 0
+        self._applied: set[int] = set()
+        self._loaded = False
+        self._loaded_at = 0.0
+        self._synced_at = 0.0
+        self._rebuilding = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def _index(self, name: str) -> int:
+        i = self._ids.get(name)
+        if i is None:
+            i = self._ids[name] = len(self.names)
+            self.names.append(name)
+            if i == len(self._counts):
+                self._counts = np.concatenate([self._counts, np.zeros_like(self._counts)])
+                for w, scores in self._scores.items():
+                    self._scores[w] = np.concatenate([scores, np.zeros_like(scores)])
+        return i
+
+    def _decay_to(self, now: float) -> None:
+        dt = now - self._scored_at
+        if dt <= 0:
+            return
+        for w, half_life in TREND_WINDOWS.items():
+            self._scores[w] *= 0.5 ** (dt / half_life)
+        self._scored_at = now
+
+    def _apply(self, at: datetime | None, tag_names: Iterable[str]) -> None:
+        idx = sorted({self._index(n) for n in tag_names})
+        if not idx:
+            return
+        self._counts[idx] += 1
+        age = self._scored_at - _epoch(at)
+        for w, half_life in TREND_WINDOWS.items():
+            self._scores[w][idx] += 0.5 ** (age / half_life)
+        for a, b in combinations(idx, 2):
+            row = self._pairs.setdefault(a, {})
+            row[b] = row.get(b, 0) + 1
+            row = self._pairs.setdefault(b, {})
+            row[a] = row.get(a, 0) + 1
+
+    def load(self, rows: Iterable[DreamTags]) -> None:
+        """Build the stats from rows streamed from the DB, ordered by dream id."""
+        with self._lock:
+            if self._loaded:
+                return
+            self._scored_at = time.time()
+            for dream_id, at, names in rows:
+                self._apply(at, names)
+                self._applied.add(dream_id)
+                self._watermark = max(self._watermark, dream_id)
+            self._prune_applied()
+            self._loaded = True
+            self._loaded_at = self._synced_at = time.monotonic()
+
+    def _prune_applied(self) -> None:
+        floor = self._watermark - self.overlap
+        self._applied = {i for i in self._applied if i > floor}
+
+    def _seen(self, dream_id: int) -> bool:
+        # 겹침 구간보다 오래된 id는 적재/sync 때 이미 반영된 것으로 봄
+        return dream_id <= self._watermark - self.overlap or dream_id in self._applied
+
+    def add(self, dream_id: int, at: datetime | None, tag_names: Iterable[str]) -> None:
+        """Count a newly saved dream once (no-op until the stats are loaded)."""
+        with self._lock:
+            if not self._loaded or self._seen(dream_id):
+                return
+            self._applied.add(dream_id)
+            self._decay_to(time.time())
+            self._apply(at, tag_names)
+
+    def sync(self, loader: Callable[[int], Iterable[DreamTags]]) -> None:
+        """Catch up on dreams saved by other processes.
+
+        Re-reads `overlap` ids below the watermark so a lower id committed
+        after a higher one is still counted; ids already applied are skipped.
+        """
+        with self._lock:
+            after = max(0, self._watermark - self.overlap)
+        rows = list(loader(after))
+        with self._lock:
+            self._decay_to(time.time())
+            for dream_id, at, names in rows:
+                if not self._seen(dream_id):
+                    self._apply(at, names)
+                    self._applied.add(dream_id)
+            if rows:
+                self._watermark = max(self._watermark, max(r[0] for r in rows))
+                self._prune_applied()
+            self._synced_at = time.monotonic()
+
+    def rebuild(self, load_all: Callable[[], Iterable[DreamTags]]) -> None:
+        """Reload from the DB and swap in the result (drops deleted dreams and merged tags)."""
+        try:
+            fresh = TagStats(self.sync_interval, self.overlap, self.rebuild_interval)
+            fresh.load(load_all())
+            with self._lock:
+                state = {k: v for k, v in vars(fresh).items() if k not in ("_lock", "_rebuilding")}
+                vars(self).update(state)
+        finally:
+            self._rebuilding = False
+
+    def _start_rebuild(self, load_all: Callable[[], Iterable[DreamTags]]) -> None:
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        background.submit(self.rebuild, load_all)
+
+    def invalidate(self) -> None:
+        """Rebuild on the next ensure_fresh (after deletes or tag merges)."""
+        with self._lock:
+            self._loaded_at = float("-inf")
+
+    def ensure_fresh(
+        self,
+        load_all: Callable[[], Iterable[DreamTags]],
+        load_since: Callable[[int], Iterable[DreamTags]],
+    ) -> None:
+        """Load on first use; later rebuild in the background and serve the current stats."""
+        if not self._loaded:
+            self.load(load_all())
+            return
+        if time.monotonic() - self._loaded_at >= self.rebuild_interval:
+            self._start_rebuild(load_all)
+        if time.monotonic() - self._synced_at >= self.sync_interval:
+            self.sync(load_since)
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            i = self._ids.get(name)
+            return int(self._counts[i]) if i is not None else 0
+
+    def trending(self, window: str = "24h", limit: int = 10) -> list[tuple[str, float, int]]:
+        """Top tags as (name, score, dream_count); window "all" ranks by count."""
+        with self._lock:
+            n = len(self.names)
+            if n == 0:
+                return []
+            if window == "all":
+                scores = self._counts[:n].astype(np.float64)
+            else:
+                factor = 0.5 ** (max(0.0, time.time() - self._scored_at) / TREND_WINDOWS[window])
+                scores = self._scores[window][:n] * factor
+            counts = self._counts[:n].copy()
+            names = self.names
+        k = min(limit, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            (names[i], round(float(scores[i]), 4), int(counts[i]))
+            for i in top
+            if scores[i] > 0
+        ]
+
+    def related(self, name: str, limit: int = 10) -> list[tuple[str, int, float]]:
+        """Tags co-occurring with `name` as (name, co_count, jaccard)."""
+        with self._lock:
+            i = self._ids.get(name)
+            row = self._pairs.get(i) if i is not None else None
+            if not row:
+                return []
+            others = np.fromiter(row.keys(), dtype=np.int64, count=len(row))
+            co = np.fromiter(row.values(), dtype=np.float64, count=len(row))
+            union = self._counts[others] + self._counts[i] - co
+            names = self.names
+        jaccard = co / np.maximum(union, 1)
+        order = np.lexsort((-co, -jaccard))[:limit]
+        return [
+            (names[others[j]], int(co[j]), round(float(jaccard[j]), 4)) for j in order
+        ]
+
+
+tag_stats = TagStats()
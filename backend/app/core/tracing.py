@@ -0,0 +1,570 @@
+"""
+분산 트레이싱 (OpenTelemetry 호환)
+- span: 요청 / dream_graph 노드 / 저장소 메서드 / 외부 HTTP(Google OAuth, LLM) 호출 단위의 구간
+  - trace_id 32자리, span_id 16자리 hex, 종류(SERVER/CLIENT/INTERNAL), 속성, 이벤트, 상태
+  - 현재 span은 contextvar에 두므로 sync 라우트 스레드와 그래프 병렬 노드로 그대로 이어짐
+  - background.submit은 제출 시점의 span을 부모로 물려받아 응답 이후 작업도 같은 trace에 남음
+- 전파: W3C traceparent 헤더 (들어오는 요청에서 extract, 나가는 요청에 inject)
+- 샘플링: 루트 span에서 OTEL_TRACES_SAMPLER_ARG 비율로 결정, 이후에는 부모를 따름
+- 내보내기(TRACING_EXPORTER)
+  - none(기본): span을 만들지 않음 (호출 비용은 플래그 확인 한 번)
+  - memory: 프로세스 메모리에 보관 (테스트용, InMemorySpanExporter)
+  - file: OTLP/JSON 형식을 한 줄에 한 배치씩 TRACING_FILE에 추가
+  - otlp: OTLP/HTTP(JSON)로 OTEL_EXPORTER_OTLP_ENDPOINT/v1/traces에 전송 (OpenTelemetry Collector 등)
+  file/otlp는 백그라운드 스레드가 모아서 내보냄 (BatchSpanProcessor)
+
+opentelemetry-sdk를 의존성에 넣지 않고 같은 데이터 모델과 전송 형식만 따른다.
+"""
+
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Iterable, Mapping, Protocol
+
+from app.core import metrics
+
+logger = logging.getLogger("dreamscope.tracing")
+
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "dreamscope")
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318")
+OTEL_TRACES_SAMPLER_ARG = float(os.getenv("OTEL_TRACES_SAMPLER_ARG", "1.0"))
+OTEL_BSP_SCHEDULE_DELAY = float(os.getenv("OTEL_BSP_SCHEDULE_DELAY", "5000")) / 1000
+OTEL_BSP_MAX_QUEUE_SIZE = int(os.getenv("OTEL_BSP_MAX_QUEUE_SIZE", "2048"))
+OTEL_BSP_MAX_EXPORT_BATCH_SIZE = int(os.getenv("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", "512"))
+
+# OTLP SpanKind / StatusCode 값
+KINDS = {"INTERNAL": 1, "SERVER": 2, "CLIENT": 3, "PRODUCER": 4, "CONSUMER": 5}
+STATUS_CODES = {"UNSET": 0, "OK": 1, "ERROR": 2}
+
+
+class SpanContext:
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool = True):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+class Span:
+    def __init__(
+        self,
+        name: str,
+        context: SpanContext,
+        parent_id: str | None = None,
+        kind: str = "INTERNAL",
+        attributes: Mapping[str, Any] | None = None,
+    ):
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes: dict[str, Any] = dict(attributes or {})
+        self.events: list[tuple[int, str, dict]] = []
+        self.status = "UNSET"
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+
+    @property
+    def recording(self) -> bool:
+        return self.context.sampled
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: Mapping[str, Any] | None = None) -> None:
+        self.events.append((time.time_ns(), name, dict(attributes or {})))
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.add_event(
+            "exception",
+            {"exception.type": type(exc).__name__, "exception.message": str(exc)},
+        )
+        self.set_status("ERROR", str(exc))
+
+    def set_status(self, status: str, message: str = "") -> None:
+        self.status = status
+        self.status_message = message
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            if self.recording:
+                _processor.on_end(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+class _NoopSpan:
+    """Returned while tracing is off; accepts the Span API and does nothing."""
+
+    recording = False
+    context = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def add_event(self, name, attributes=None):
+        pass
+
+    def record_exception(self, exc):
+        pass
+
+    def set_status(self, status, message=""):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current: ContextVar[Span | None] = ContextVar("dreamscope_span", default=None)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+def extract(headers: Mapping[str, str]) -> SpanContext | None:
+    """Parse a W3C traceparent header (keys compared case-insensitively)."""
+    value = None
+    for key, v in headers.items():
+        if key.lower() == "traceparent":
+            value = v
+            break
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    trace_id, span_id, flags = parts[1].lower(), parts[2].lower(), parts[3]
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    try:
+        sampled = bool(int(flags, 16) & 1)
+    except ValueError:
+        return None
+    return SpanContext(trace_id, span_id, sampled)
+
+
+def inject(headers: dict[str, str]) -> dict[str, str]:
+    """Add traceparent for the current span to outgoing request headers."""
+    span = _current.get()
+    if span is not None:
+        headers["traceparent"] = span.context.traceparent
+    return headers
+
+
+@contextmanager
+def start_span(
+    name: str,
+    kind: str = "INTERNAL",
+    attributes: Mapping[str, Any] | None = None,
+    parent: "Span | SpanContext | None" = None,
+):
+    """Open a span as a child of `parent` (default: the current span) and make it current."""
+    if not _enabled:
+        yield NOOP_SPAN
+        return
+    if parent is None:
+        parent = _current.get()
+    parent_ctx = parent.context if isinstance(parent, Span) else parent
+    if parent_ctx is None:
+        context = SpanContext(_new_id(128), _new_id(64), random.random() < OTEL_TRACES_SAMPLER_ARG)
+        parent_id = None
+    else:
+        context = SpanContext(parent_ctx.trace_id, _new_id(64), parent_ctx.sampled)
+        parent_id = parent_ctx.span_id
+    span = Span(name, context, parent_id, kind, attributes)
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        if getattr(e, "status_code", 500) < 500:
+            # 4xx HTTPException은 정상 흐름으로 보고 이벤트만 남김
+            span.add_event("exception", {"exception.type": type(e).__name__})
+        else:
+            span.record_exception(e)
+        raise
+    finally:
+        _current.reset(token)
+        span.end()
+
+
+def traced(name: str, kind: str = "INTERNAL", attributes: Mapping[str, Any] | None = None):
+    """Decorator form of start_span."""
+
+    def decorate(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with start_span(name, kind, attributes):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def trace_methods(cls=None, *, prefix: str | None = None, system: str = "sqlalchemy"):
+    """Class decorator: one span per public method call (used on the repositories)."""
+
+    def decorate(cls):
+        label = prefix or cls.__name__
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or not inspect.isfunction(value):
+                continue
+            if inspect.isgeneratorfunction(value):
+                continue  # span이 첫 next() 전에 끝나버리므로 제외
+            setattr(cls, attr, traced(f"{label}.{attr}", attributes={"db.system": system})(value))
+        return cls
+
+    return decorate(cls) if cls is not None else decorate
+
+
+@contextmanager
+def client_span(method: str, url: str, **attributes):
+    """CLIENT span for an outbound HTTP call; set `http.response.status_code` on it."""
+    host = url.split("://", 1)[-1].split("/", 1)[0]
+    with start_span(
+        f"{method} {host}",
+        kind="CLIENT",
+        attributes={"http.request.method": method, "url.full": url.split("?", 1)[0], **attributes},
+    ) as span:
+        yield span
+
+
+# --- 내보내기 ---
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: list[Span]) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Mapping[str, Any]) -> list[dict]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()]
+
+
+def to_otlp(spans: Iterable[Span]) -> dict:
+    """OTLP/JSON ExportTraceServiceRequest body for `spans`."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": _otlp_attributes(
+                        {"service.name": OTEL_SERVICE_NAME, "process.pid": os.getpid()}
+                    )
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "dreamscope"},
+                        "spans": [
+                            {
+                                "traceId": s.context.trace_id,
+                                "spanId": s.context.span_id,
+                                **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                                "name": s.name,
+                                "kind": KINDS.get(s.kind, 1),
+                                "startTimeUnixNano": str(s.start_ns),
+                                "endTimeUnixNano": str(s.end_ns),
+                                "attributes": _otlp_attributes(s.attributes),
+                                "events": [
+                                    {
+                                        "timeUnixNano": str(t),
+                                        "name": name,
+                                        "attributes": _otlp_attributes(attrs),
+                                    }
+                                    for t, name, attrs in s.events
+                                ],
+                                "status": {
+                                    "code": STATUS_CODES[s.status],
+                                    **({"message": s.status_message} if s.status_message else {}),
+                                },
+                            }
+                            for s in spans
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class InMemorySpanExporter:
+    """Keeps finished spans in a list; for tests and local inspection."""
+
+    def __init__(self):
+        self._spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        with self._lock:
+            self._spans.extend(spans)
+
+    def get_finished_spans(self) -> list[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileSpanExporter:
+    """Appends one OTLP/JSON request per batch as a line of `path`."""
+
+    def __init__(self, path: str = TRACING_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        line = json.dumps(to_otlp(spans), separators=(",", ":"))
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def shutdown(self) -> None:
+        pass
+
+
+class OTLPHttpSpanExporter:
+    """POSTs OTLP/JSON to a collector's /v1/traces endpoint."""
+
+    def __init__(self, endpoint: str = OTEL_EXPORTER_OTLP_ENDPOINT, timeout: float = 10.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.timeout = timeout
+
+    def export(self, spans: list[Span]) -> None:
+        import requests
+
+        # 내보내기 요청 자체는 추적하지 않음 (start_span을 쓰지 않는 직접 호출)
+        resp = requests.post(
+            self.url,
+            data=json.dumps(to_otlp(spans), separators=(",", ":")),
+            headers={"Content-Type": "application/json"},
+            timeout=self.timeout,
+        )
+        if resp.status_code >= 400:
+            logger.warning("OTLP export failed: %s %s", resp.status_code, resp.text[:200])
+
+    def shutdown(self) -> None:
+        pass
+
+
+class SimpleSpanProcessor:
+    """Exports each span synchronously when it ends."""
+
+    def __init__(self, exporter: SpanExporter | None):
+        self.exporter = exporter
+
+    def on_end(self, span: Span) -> None:
+        if self.exporter is None:
+            return
+        try:
+            self.exporter.export([span])
+        except Exception:
+            logger.exception("span export failed")
+
+    def force_flush(self, timeout: float = 5.0) -> bool:
+        return True
+
+    def shutdown(self) -> None:
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+class BatchSpanProcessor:
+    """Queues finished spans and exports them from a daemon thread."""
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        schedule_delay: float = OTEL_BSP_SCHEDULE_DELAY,
+        max_queue_size: int = OTEL_BSP_MAX_QUEUE_SIZE,
+        max_batch_size: int = OTEL_BSP_MAX_EXPORT_BATCH_SIZE,
+    ):
+        self.exporter = exporter
+        self.schedule_delay = schedule_delay
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.dropped = 0
+        self._pid = None
+        self._start()
+
+    def _start(self) -> None:
+        # serve.py가 fork하면 부모의 스레드는 자식에 없으므로 pid가 바뀌면 새로 시작
+        self._pid = os.getpid()
+        self._queue: queue.Queue[Span] = queue.Queue(self.max_queue_size)
+        self._flush = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        threading.Thread(target=self._worker, name="dreamscope-spans", daemon=True).start()
+
+    def on_end(self, span: Span) -> None:
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+            return
+        self._idle.clear()
+        if self._queue.qsize() >= self.max_batch_size:
+            self._flush.set()
+
+    def _drain(self) -> None:
+        while True:
+            batch: list[Span] = []
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            try:
+                self.exporter.export(batch)
+            except Exception:
+                logger.exception("span export failed (%d spans dropped)", len(batch))
+
+    def _worker(self) -> None:
+        while True:
+            self._flush.wait(self.schedule_delay)
+            self._flush.clear()
+            self._drain()
+            if self._queue.empty():
+                self._idle.set()
+
+    def force_flush(self, timeout: float = 5.0) -> bool:
+        if self._pid != os.getpid() or self._queue.empty():
+            return True
+        self._idle.clear()
+        self._flush.set()
+        return self._idle.wait(timeout)
+
+    def shutdown(self) -> None:
+        self.force_flush()
+        self.exporter.shutdown()
+
+
+_processor: SimpleSpanProcessor | BatchSpanProcessor = SimpleSpanProcessor(None)
+_enabled = False
+
+
+def configure(exporter: SpanExporter | None, batch: bool = False) -> None:
+    """Install `exporter` (None turns tracing off); batch=True exports from a thread."""
+    global _processor, _enabled
+    _processor.shutdown()
+    if exporter is None:
+        _processor, _enabled = SimpleSpanProcessor(None), False
+        return
+    _processor = BatchSpanProcessor(exporter) if batch else SimpleSpanProcessor(exporter)
+    _enabled = True
+
+
+def force_flush(timeout: float = 5.0) -> bool:
+    return _processor.force_flush(timeout)
+
+
+def _configure_from_env() -> None:
+    if TRACING_EXPORTER == "memory":
+        configure(InMemorySpanExporter())
+    elif TRACING_EXPORTER == "file":
+        configure(FileSpanExporter(TRACING_FILE), batch=True)
+    elif TRACING_EXPORTER == "otlp":
+        configure(OTLPHttpSpanExporter(OTEL_EXPORTER_OTLP_ENDPOINT), batch=True)
+    elif TRACING_EXPORTER not in ("", "none"):
+        logger.warning("unknown TRACING_EXPORTER %r; tracing disabled", TRACING_EXPORTER)
+
+
+_configure_from_env()
+
+
+def exporter() -> SpanExporter | None:
+    return _processor.exporter
+
+
+# --- ASGI 미들웨어 ---
+
+
+class TracingMiddleware:
+    """SERVER span per HTTP request, continuing an incoming traceparent."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _enabled:
+            await self.app(scope, receive, send)
+            return
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        method = scope.get("method", "")
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with start_span(
+            method,
+            kind="SERVER",
+            attributes={"http.request.method": method, "url.path": scope.get("path", "")},
+            parent=extract(headers),
+        ) as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                # 라우팅이 끝난 뒤에야 경로 템플릿을 알 수 있으므로 이름은 마지막에 정함
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.name = f"{method} {route}"
+                    span.set_attribute("http.route", route)
+                span.set_attribute("http.response.status_code", status)
+                if status >= 500:
+                    span.set_status("ERROR")
+                stats = metrics.current()
+                if stats is not None:
+                    span.set_attribute("db.query_count", stats.queries)
+                    span.set_attribute("db.duration_ms", round(stats.db_seconds * 1000, 3))
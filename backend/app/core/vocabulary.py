@@ -0,0 +1,50 @@
+import os
+import threading
+import time
+from typing import Callable, Iterable
+
+# 프롬프트에 넣는 기존 태그 목록 캐시 (매 요청마다 tags 전체를 읽지 않도록)
+TAG_VOCABULARY_TTL = float(os.getenv("TAG_VOCABULARY_TTL", "300"))
+
+
+class TagVocabulary:
+    """Newline-joined tag names for the prompt, cached with a TTL."""
+
+    def __init__(self, ttl: float = TAG_VOCABULARY_TTL):
+        self.ttl = ttl
+        self._text: str | None = None
+        self._names: set[str] = set()
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, loader: Callable[[], Iterable[str]]) -> str:
+        with self._lock:
+            if self._text is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return self._text
+        return self.refresh(loader)
+
+    def refresh(self, loader: Callable[[], Iterable[str]]) -> str:
+        names = list(loader())
+        text = "\n".join(names)
+        with self._lock:
+            self._text = text
+            self._names = set(names)
+            self._loaded_at = time.monotonic()
+        return text
+
+    def add(self, names: Iterable[str]) -> None:
+        """Append newly saved tag names to the cached list (no DB read, TTL unchanged)."""
+        with self._lock:
+            if self._text is None:
+                return
+            new = [n for n in dict.fromkeys(names) if n not in self._names]
+            if new:
+                self._names.update(new)
+                self._text = "\n".join([self._text, *new]) if self._text else "\n".join(new)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._text = None
+
+
+tag_vocabulary = TagVocabulary()
@@ -0,0 +1,150 @@
+"""
+오래된 꿈 보관(archive) + 삭제 행 정리 작업
+- ARCHIVE_AFTER_DAYS보다 오래된 꿈을 배치 단위로 dream_archive로 옮김
+  - 꿈마다 피드 카드 + 댓글 목록을 API 응답 형태(JSON)로 만들어 zlib으로 압축해 한 행에 저장
+  - 같은 트랜잭션에서 dreams / dream_tags / dream_cards / comments 행을 벌크 DELETE
+  - GET /dreams/{id}, GET /dreams/{id}/comments는 핫 테이블에 없으면 dream_archive에서 읽음 (피드/검색에는 안 나옴)
+- soft delete된 꿈/댓글 중 SOFT_DELETE_RETENTION_DAYS가 지난 행은 완전히 지움
+- 보관한 꿈은 background.dispatch_dreams_removed로 이 프로세스의 캐시에서 뺌
+  (서버 워커의 캐시는 조회 시 live 필터와 주기적 재적재로 따라잡음)
+
+    cd backend && python -m app.db.archive                      # 한 번 실행
+    cd backend && python -m app.db.archive --interval 86400     # 주기 실행
+    cd backend && python -m app.db.archive --after-days 0       # 보관 없이 삭제 행 정리만
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.api.serializers import card_dict, comment_dicts
+from app.core import background
+from app.db.base import session_scope
+from app.db.models import Dream
+from app.db.repository import (
+    ArchiveRepository,
+    CommentRepository,
+    DreamCardRepository,
+    DreamRepository,
+    live,
+)
+
+logger = logging.getLogger("dreamscope.archive")
+
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+SOFT_DELETE_RETENTION_DAYS = float(os.getenv("SOFT_DELETE_RETENTION_DAYS", "30"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+
+
+def archive_dreams(session: Session, before: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move live dreams created before `before` into dream_archive; return how many moved."""
+    archive_repo = ArchiveRepository(session)
+    card_repo = DreamCardRepository(session)
+    comment_repo = CommentRepository(session)
+    dream_repo = DreamRepository(session)
+    moved = 0
+    while True:
+        # 옮긴 행은 지워지므로 매번 처음부터 (ix_dreams_created_at_id 부분 인덱스 범위 스캔)
+        rows = (
+            session.query(Dream.id, Dream.user_id, Dream.created_at)
+            .filter(Dream.created_at < before, live(Dream))
+            .order_by(Dream.created_at)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return moved
+        ids = [r.id for r in rows]
+        cards = card_repo.get_many(ids)
+        comments = comment_repo.get_rows_for_dreams(ids)
+        for r in rows:
+            card = cards.get(r.id)
+            if card is None:
+                # 카드가 빠진 꿈 (수동 SQL 등)은 원본에서 만듦
+                dream = session.get(Dream, r.id)
+                card = card_repo.build(dream, dream.user)
+            archive_repo.add(
+                r.id,
+                r.user_id,
+                r.created_at,
+                {"dream": card_dict(card), "comments": comment_dicts(comments.get(r.id, []))},
+            )
+        dream_repo.purge(ids)
+        session.commit()
+        background.dispatch_dreams_removed(ids, {r.user_id for r in rows})
+        moved += len(ids)
+
+
+def purge_deleted(session: Session, before: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> tuple[int, int]:
+    """Hard-delete dreams and comments soft-deleted before `before`; return (dreams, comments)."""
+    dream_repo = DreamRepository(session)
+    dreams = 0
+    while True:
+        ids = [
+            i for (i,) in session.query(Dream.id).filter(Dream.deleted_at < before).limit(batch_size)
+        ]
+        if not ids:
+            break
+        dream_repo.purge(ids)
+        session.commit()
+        dreams += len(ids)
+    comments = CommentRepository(session).purge_deleted(before, batch_size)
+    return dreams, comments
+
+
+def run_once(
+    after_days: float = ARCHIVE_AFTER_DAYS,
+    retention_days: float = SOFT_DELETE_RETENTION_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> int:
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    moved = 0
+    with session_scope() as db:
+        if after_days > 0:
+            moved = archive_dreams(db, now - timedelta(days=after_days), batch_size)
+        dreams, comments = purge_deleted(db, now - timedelta(days=retention_days), batch_size)
+    logger.info(
+        "archived %d dream(s); purged %d deleted dream(s) and %d comment(s) in %.2fs",
+        moved, dreams, comments, time.perf_counter() - started,
+    )
+    return moved
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Archive old dreams and purge soft-deleted rows")
+    parser.add_argument(
+        "--after-days",
+        type=float,
+        default=ARCHIVE_AFTER_DAYS,
+        help="archive dreams older than N days (0 = do not archive)",
+    )
+    parser.add_argument("--retention-days", type=float, default=SOFT_DELETE_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=float(os.getenv("ARCHIVE_INTERVAL", "0")),
+        help="repeat every N seconds (0 = run once)",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    while True:
+        try:
+            run_once(args.after_days, args.retention_days, args.batch_size)
+        except Exception:
+            if not args.interval:
+                raise
+            logger.exception("archive run failed")
+        if not args.interval:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
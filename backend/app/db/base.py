@@ -1,9 +1,12 @@
+from contextlib import contextmanager
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
 from dotenv import load_dotenv
 import os
 
+from app.core import metrics
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./dreamscope.db")
@@ -16,9 +19,20 @@ else:
     _connect_args = {"sslmode": os.getenv("DB_SSLMODE", "require")}
 
 engine = create_engine(DATABASE_URL, connect_args=_connect_args)
+metrics.install_query_hooks(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
 class Base(DeclarativeBase):
     pass
+
+
+@contextmanager
+def session_scope(factory=SessionLocal):
+    """Short-lived session for work that runs outside a request (graph branches, jobs)."""
+    session = factory()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,72 @@
+"""
+아웃박스 디스패치 작업
+- 웹 워커 대신(OUTBOX_DISPATCH_IN_WORKER=false) 또는 함께 outbox_events를 처리하는 별도 프로세스
+- 여러 개를 띄워도 배치마다 claim하므로 같은 이벤트를 동시에 처리하지 않음
+- --purge-days가 있으면 처리가 끝난 지 N일 지난 행을 지움
+
+    cd backend && python -m app.db.dispatch_outbox              # 쌓인 것 한 번 처리
+    cd backend && python -m app.db.dispatch_outbox --interval 2  # 주기 실행
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from app.core.outbox import OUTBOX_BATCH_SIZE, dispatch_pending
+from app.db.base import session_scope
+from app.db.repository import OutboxRepository
+
+logger = logging.getLogger("dreamscope.outbox")
+
+
+def run_once(batch_size: int = OUTBOX_BATCH_SIZE, purge_days: float = 0) -> int:
+    started = time.perf_counter()
+    handled = dispatch_pending(batch_size)
+    purged = 0
+    with session_scope() as db:
+        repo = OutboxRepository(db)
+        if purge_days:
+            purged = repo.purge_dispatched(datetime.utcnow() - timedelta(days=purge_days))
+        pending = repo.pending_count()
+    if handled or purged:
+        logger.info(
+            "outbox: %d event(s) handled, %d purged, %d pending in %.2fs",
+            handled, purged, pending, time.perf_counter() - started,
+        )
+    return handled
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Deliver pending outbox events")
+    parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE)
+    parser.add_argument(
+        "--purge-days",
+        type=float,
+        default=float(os.getenv("OUTBOX_PURGE_DAYS", "7")),
+        help="delete events dispatched more than N days ago (0 = keep)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=float(os.getenv("OUTBOX_DISPATCH_INTERVAL", "0")),
+        help="repeat every N seconds (0 = run once)",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    while True:
+        try:
+            run_once(args.batch_size, args.purge_days)
+        except Exception:
+            if not args.interval:
+                raise
+            logger.exception("outbox dispatch failed")
+        if not args.interval:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+핫 쿼리 실행 계획 점검
+- Repository 메서드가 실제로 만드는 SQL을 캡처해 EXPLAIN(SQLite: EXPLAIN QUERY PLAN)으로 실행
+- 각 쿼리가 기대한 인덱스를 사용하는지 확인하고, 하나라도 아니면 종료 코드 1
+
+    cd backend && alembic upgrade head && python -m app.db.explain
+"""
+
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.db.base import SessionLocal, engine
+from app.db.models import Comment, Dream
+from app.db.repository import (
+    CommentRepository,
+    DreamCardRepository,
+    DreamRepository,
+    TagRepository,
+    live,
+)
+
+
+@dataclass
+class HotQuery:
+    name: str
+    run: Callable[[Session], object]
+    # 실행 계획에 이 중 하나라도 나오면 통과
+    expected_indexes: tuple[str, ...]
+
+
+HOT_QUERIES: list[HotQuery] = [
+    HotQuery(
+        "feed page",
+        lambda db: DreamRepository(db).search_advanced_page(None, page=2, limit=10),
+        ("ix_dreams_created_at_id",),
+    ),
+    HotQuery(
+        "feed page filtered by tag",
+        lambda db: DreamRepository(db).search_advanced_page(["falling"], page=1, limit=10),
+        ("ix_dream_tags_tag_id_dream_id", "ix_tags_name"),
+    ),
+    HotQuery(
+        "card feed page",
+        lambda db: DreamCardRepository(db).get_page(None, page=2, limit=10),
+        ("ix_dream_cards_created_at_dream_id",),
+    ),
+    HotQuery(
+        "card feed page filtered by tag",
+        lambda db: DreamCardRepository(db).get_page(["falling"], page=1, limit=10),
+        ("ix_dream_tags_tag_id_dream_id", "ix_tags_name"),
+    ),
+    HotQuery(
+        "card feed page matching all tags",
+        lambda db: DreamCardRepository(db).get_page(
+            ["falling", "family"], page=1, limit=10, match="all"
+        ),
+        ("ix_dream_tags_tag_id_dream_id",),
+    ),
+    HotQuery(
+        "card feed page excluding a tag",
+        lambda db: DreamCardRepository(db).get_page(
+            None, page=1, limit=10, exclude=["falling"]
+        ),
+        ("ix_dream_cards_created_at_dream_id",),
+    ),
+    HotQuery(
+        "feed count matching all tags",
+        lambda db: DreamRepository(db).count_advanced(["falling", "family"], match="all"),
+        ("ix_dream_tags_tag_id_dream_id",),
+    ),
+    HotQuery(
+        "most discussed feed page",
+        lambda db: DreamCardRepository(db).get_page(None, page=1, limit=10, sort="discussed"),
+        ("ix_dream_cards_comment_count_created_at",),
+    ),
+    HotQuery(
+        "recently active feed page",
+        lambda db: DreamCardRepository(db).get_page(None, page=1, limit=10, sort="active"),
+        ("ix_dream_cards_last_activity_at",),
+    ),
+    HotQuery(
+        "user memories",
+        lambda db: DreamRepository(db).get_recent_for_user(user_id=1, limit=5),
+        ("ix_dreams_user_id_created_at_id",),
+    ),
+    HotQuery(
+        "user dream history page",
+        lambda db: DreamRepository(db).get_recent_for_user(
+            user_id=1, limit=20, before=(datetime(2030, 1, 1), 1)
+        ),
+        ("ix_dreams_user_id_created_at_id",),
+    ),
+    HotQuery(
+        "dream comments",
+        lambda db: CommentRepository(db).get_for_dream(dream_id=1),
+        ("ix_comments_dream_id_created_at",),
+    ),
+    HotQuery(
+        "comment replies",
+        lambda db: db.query(Comment).filter(Comment.parent_id == 1, live(Comment)).all(),
+        ("ix_comments_parent_id",),
+    ),
+    HotQuery(
+        "fuzzy tag candidates",
+        lambda db: TagRepository(db)._fuzzy_candidates("nightmare"),
+        ("ix_tags_match_key",),
+    ),
+    HotQuery(
+        "search posting lists",
+        lambda db: DreamCardRepository(db).search_rows("떨어지는 falling", limit=50),
+        ("sqlite_autoindex_dream_search_terms_1", "dream_search_terms_pkey"),
+    ),
+    HotQuery(
+        "archive candidates",
+        lambda db: db.query(Dream.id)
+        .filter(Dream.created_at < datetime(2020, 1, 1), live(Dream))
+        .order_by(Dream.created_at)
+        .limit(500)
+        .all(),
+        ("ix_dreams_created_at_id",),
+    ),
+    HotQuery(
+        "expired soft-deleted dreams",
+        lambda db: db.query(Dream.id).filter(Dream.deleted_at < datetime(2020, 1, 1)).limit(500).all(),
+        ("ix_dreams_deleted_at",),
+    ),
+]
+
+
+def _capture(run: Callable[[Session], object]) -> list[tuple[str, object]]:
+    statements: list[tuple[str, object]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with SessionLocal() as db:
+            run(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def _explain(statement: str, parameters) -> str:
+    with engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            return "\n".join(str(r[-1]) for r in rows)
+        # 빈 테이블에서는 Postgres가 순차 스캔을 고르므로 인덱스 사용 가능 여부만 확인
+        conn.execute(text("SET enable_seqscan = off"))
+        rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        return "\n".join(str(r[0]) for r in rows)
+
+
+def check() -> bool:
+    ok = True
+    for query in HOT_QUERIES:
+        plans = [_explain(s, p) for s, p in _capture(query.run)]
+        plan = "\n".join(plans)
+        used = [name for name in query.expected_indexes if name in plan]
+        status = "ok" if used else "MISSING INDEX"
+        ok = ok and bool(used)
+        print(f"[{status}] {query.name}")
+        for line in plan.splitlines():
+            print(f"    {line}")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check() else 1)
@@ -0,0 +1,238 @@
+"""
+중복 태그 병합 작업
+- 모든 태그의 match_key를 다시 계산하고, 같은 키(선택적으로 철자가 거의 같은 키)를 가진 태그를 하나로 병합
+- 대표 태그는 꿈이 가장 많이 달린 태그(동률이면 먼저 만들어진 태그)
+- 병합된 태그 이름은 tag_aliases에 남겨 이후 같은 이름이 들어오면 대표 태그로 연결
+- dream_tags를 대표 태그로 옮기고, 영향을 받은 꿈의 피드 카드(dream_cards.tags)와 검색 색인을 다시 씀
+- 그룹마다 커밋하므로 중간에 멈춰도 다시 실행하면 이어서 처리
+- --dry-run은 아무것도 커밋하지 않음 (이름 정규화/키 재계산도 트랜잭션 안에서만 보고 롤백)
+
+    cd backend && python -m app.db.merge_tags --dry-run
+    cd backend && python -m app.db.merge_tags --fuzzy --alias teeth=tooth
+
+실행 중인 서버의 태그 목록 캐시는 TTL 후, 태그 통계는 TAG_STATS_REBUILD_INTERVAL 안의 재적재로 반영된다.
+(같은 프로세스에서 merge()를 호출하면 태그 통계를 바로 invalidate)
+"""
+
+import argparse
+import logging
+import sys
+from collections import defaultdict
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.tag_normalize import closest_key, match_key, normalize
+from app.core.tag_stats import tag_stats
+from app.db.base import session_scope
+from app.db.models import Dream, DreamCard, Tag, TagAlias, dream_tags
+from app.db.repository import SearchIndexRepository, TagRepository, live
+
+logger = logging.getLogger("dreamscope.merge_tags")
+
+
+def _usage(session: Session) -> dict[int, int]:
+    return dict(
+        session.execute(
+            select(dream_tags.c.tag_id, func.count()).group_by(dream_tags.c.tag_id)
+        ).all()
+    )
+
+
+def _normalize_name(session: Session, tag: Tag) -> bool:
+    """Rename `tag` to its normalized form unless another tag holds it."""
+    normalized = normalize(tag.name)
+    if normalized == tag.name or TagRepository(session).get_by_name(normalized) is not None:
+        return False
+    old = tag.name
+    tag.name = normalized
+    session.flush()
+    TagRepository(session).add_alias(old, tag)
+    return True
+
+
+def _dreams_with(session: Session, tag_ids: list[int]) -> list[int]:
+    return [
+        d
+        for (d,) in session.execute(
+            select(dream_tags.c.dream_id).where(dream_tags.c.tag_id.in_(tag_ids)).distinct()
+        )
+    ]
+
+
+def rekey(session: Session, commit: bool = True) -> int:
+    """Normalize names and recompute match_key for every tag; return how many changed.
+
+    With `commit=False` the changes are only flushed, so a dry run can see
+    them and roll them back.
+    """
+    changed = 0
+    renamed = []
+    for tag in session.query(Tag).order_by(Tag.id).all():
+        key = match_key(tag.name)
+        if _normalize_name(session, tag):
+            renamed.append(tag.id)
+        if tag.match_key != key or tag.id in renamed:
+            tag.match_key = key
+            changed += 1
+    if renamed:
+        _refresh_cards(session, _dreams_with(session, renamed))
+    if commit:
+        session.commit()
+    else:
+        session.flush()
+    return changed
+
+
+def find_duplicates(session: Session, fuzzy: bool = False) -> list[list[Tag]]:
+    """Groups of tags that resolve to the same name, canonical tag first."""
+    usage = _usage(session)
+    by_key: dict[str, list[Tag]] = defaultdict(list)
+    for tag in session.query(Tag).order_by(Tag.id):
+        by_key[tag.match_key or match_key(tag.name)].append(tag)
+
+    def rank(tag: Tag):
+        return (-usage.get(tag.id, 0), tag.name != normalize(tag.name), tag.id)
+
+    groups = {key: sorted(tags, key=rank) for key, tags in by_key.items()}
+    if fuzzy:
+        # 사용량이 많은 키부터 대표로 두고, 철자가 거의 같은 키를 흡수
+        ordered = sorted(groups, key=lambda k: rank(groups[k][0]))
+        kept: list[str] = []
+        for key in ordered:
+            target = closest_key(key, kept)
+            if target is None:
+                kept.append(key)
+            else:
+                groups[target].extend(groups.pop(key))
+        groups = {key: sorted(tags, key=rank) for key, tags in groups.items()}
+    return [tags for tags in groups.values() if len(tags) > 1]
+
+
+def _refresh_cards(session: Session, dream_ids: list[int]) -> None:
+    tags_by_dream: dict[int, list[dict]] = defaultdict(list)
+    for dream_id, name, description in session.execute(
+        select(dream_tags.c.dream_id, Tag.name, Tag.description)
+        .join(Tag, Tag.id == dream_tags.c.tag_id)
+        .where(dream_tags.c.dream_id.in_(dream_ids))
+    ):
+        tags_by_dream[dream_id].append({"name": name, "description": description})
+    for dream_id in dream_ids:
+        session.execute(
+            update(DreamCard)
+            .where(DreamCard.dream_id == dream_id)
+            .values(tags=tags_by_dream.get(dream_id, []))
+        )
+    # 태그는 검색 가중치가 가장 높으므로 색인도 같은 트랜잭션에서 다시 만듦
+    search_repo = SearchIndexRepository(session)
+    dreams = (
+        session.query(Dream)
+        .options(selectinload(Dream.tags))
+        .filter(Dream.id.in_(dream_ids), live(Dream))
+        .populate_existing()
+        .all()
+    )
+    search_repo.remove(dream_ids)
+    search_repo.insert([p for dream in dreams for p in search_repo.postings(dream)])
+
+
+def merge(session: Session, canonical: Tag, duplicates: list[Tag]) -> int:
+    """Fold `duplicates` into `canonical`; return the number of dreams touched."""
+    dup_ids = [t.id for t in duplicates]
+    affected = _dreams_with(session, dup_ids)
+    if affected:
+        already = {
+            d
+            for (d,) in session.execute(
+                select(dream_tags.c.dream_id).where(
+                    dream_tags.c.tag_id == canonical.id,
+                    dream_tags.c.dream_id.in_(affected),
+                )
+            )
+        }
+        missing = [d for d in affected if d not in already]
+        if missing:
+            session.execute(
+                insert(dream_tags),
+                [{"dream_id": d, "tag_id": canonical.id} for d in missing],
+            )
+        session.execute(delete(dream_tags).where(dream_tags.c.tag_id.in_(dup_ids)))
+
+    session.execute(
+        update(TagAlias).where(TagAlias.tag_id.in_(dup_ids)).values(tag_id=canonical.id)
+    )
+    names = [t.name for t in duplicates]
+    if not canonical.description:
+        canonical.description = next((t.description for t in duplicates if t.description), None)
+    for dup in duplicates:
+        session.expunge(dup)
+    session.execute(delete(Tag).where(Tag.id.in_(dup_ids)))
+    repo = TagRepository(session)
+    for name in names:
+        repo.add_alias(name, canonical)
+    # 중복이 빠지면 대표 태그가 정규화된 이름을 쓸 수 있게 됨 ("Falling" -> "falling")
+    if _normalize_name(session, canonical):
+        affected = _dreams_with(session, [canonical.id])
+    if affected:
+        _refresh_cards(session, affected)
+    session.commit()
+    # 같은 프로세스의 태그 통계는 다음 조회 때 다시 적재 (사라진 태그가 남지 않도록)
+    tag_stats.invalidate()
+    return len(affected)
+
+
+def add_manual_alias(session: Session, alias: str, target: str) -> str:
+    """Make `alias` resolve to the tag `target`, merging an existing `alias` tag."""
+    repo = TagRepository(session)
+    canonical = repo.resolve(target)
+    if canonical is None:
+        raise ValueError(f"unknown target tag: {target!r}")
+    existing = repo.get_by_name(normalize(alias))
+    if existing is not None and existing.id != canonical.id:
+        merge(session, canonical, [existing])
+        return f"merged tag {existing.name!r} into {canonical.name!r}"
+    repo.add_alias(alias, canonical)
+    session.commit()
+    return f"alias {normalize(alias)!r} -> {canonical.name!r}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Merge duplicate tags")
+    parser.add_argument("--fuzzy", action="store_true", help="also merge near-identical spellings")
+    parser.add_argument("--dry-run", action="store_true", help="only print the groups")
+    parser.add_argument(
+        "--alias",
+        action="append",
+        default=[],
+        metavar="ALIAS=TAG",
+        help="register a synonym (merges ALIAS if it already exists as a tag)",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+    with session_scope() as db:
+        # --dry-run은 rekey 결과로 그룹만 보여주고 마지막에 되돌림
+        logger.info("recomputed %d match key(s)", rekey(db, commit=not args.dry_run))
+        groups = find_duplicates(db, fuzzy=args.fuzzy)
+        for canonical, *duplicates in groups:
+            names = ", ".join(t.name for t in duplicates)
+            if args.dry_run:
+                logger.info("would merge [%s] into %r", names, canonical.name)
+                continue
+            touched = merge(db, canonical, duplicates)
+            logger.info("merged [%s] into %r (%d dream(s))", names, canonical.name, touched)
+        for spec in args.alias:
+            alias, sep, target = spec.partition("=")
+            if not sep:
+                parser.error(f"--alias expects ALIAS=TAG, got {spec!r}")
+            if args.dry_run:
+                logger.info("would alias %r -> %r", alias, target)
+                continue
+            logger.info(add_manual_alias(db, alias, target))
+        if args.dry_run:
+            db.rollback()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    ForeignKey,
+    Index,
+    JSON,
+    LargeBinary,
+    Table,
+    Text,
+    text,
+)
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 from datetime import datetime
@@ -9,6 +21,8 @@ dream_tags = Table(
     Base.metadata,
     Column("dream_id", Integer, ForeignKey("dreams.id"), primary_key=True),
     Column("tag_id", Integer, ForeignKey("tags.id"), primary_key=True),
+    # PK(dream_id, tag_id)의 역방향: 태그 -> 꿈 조회/필터
+    Index("ix_dream_tags_tag_id_dream_id", "tag_id", "dream_id"),
 )
 
 
@@ -16,6 +30,8 @@ class Tag(Base):
     __tablename__ = "tags"
     id = Column(Integer, primary_key=True)
     name = Column(String(64), unique=True, index=True)
+    # app.core.tag_normalize.match_key(name): 변형/대소문자가 달라도 같은 태그를 찾는 키
+    match_key = Column(String(64), index=True)
     description = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
     dreams = relationship(
@@ -25,8 +41,34 @@ class Tag(Base):
     )
 
 
+class TagAlias(Base):
+    """Alternative (normalized) name that resolves to a canonical tag."""
+
+    __tablename__ = "tag_aliases"
+    alias = Column(String(64), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    tag = relationship("Tag")
+
+
+# 삭제되지 않은 행만 담는 부분 인덱스 조건 (조회 쿼리에도 같은 조건(repository.live)이 있어야 사용됨)
+LIVE = text("deleted_at IS NULL")
+DELETED = text("deleted_at IS NOT NULL")
+
+
+def partial_index(name: str, *columns: str, where=LIVE) -> Index:
+    return Index(name, *columns, sqlite_where=where, postgresql_where=where)
+
+
 class Dream(Base):
     __tablename__ = "dreams"
+    __table_args__ = (
+        partial_index("ix_dreams_created_at_id", "created_at", "id"),
+        # 사용자별 기록 (키셋 페이지네이션: created_at, id)
+        partial_index("ix_dreams_user_id_created_at_id", "user_id", "created_at", "id"),
+        # 보관 기간이 지난 삭제 행 정리 (app.db.archive)
+        partial_index("ix_dreams_deleted_at", "deleted_at", where=DELETED),
+    )
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     content = Column(String)
@@ -34,6 +76,12 @@ class Dream(Base):
     analysis = Column(String)
     # embedding = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # 댓글 작성/삭제 시 같은 트랜잭션에서 갱신하는 카운터 (python -m app.db.reconcile로 보정)
+    comment_count = Column(Integer, nullable=False, default=0)  # 대댓글 포함
+    reply_count = Column(Integer, nullable=False, default=0)
+    last_activity_at = Column(DateTime, default=datetime.utcnow)
+    # soft delete: 값이 있으면 삭제된 꿈 (피드 카드는 바로 지우고, 행은 app.db.archive가 나중에 정리)
+    deleted_at = Column(DateTime, nullable=True)
     comments = relationship(
         "Comment", back_populates="dream", cascade="all, delete-orphan"
     )
@@ -41,14 +89,64 @@ class Dream(Base):
     user = relationship("User", back_populates="dreams")
 
 
+class DreamCard(Base):
+    """Denormalized feed read model: one prerendered card per dream.
+
+    Maintained on write by the repositories so feed pages are a single
+    index-ordered scan of this table with no joins.
+    """
+
+    __tablename__ = "dream_cards"
+    __table_args__ = (
+        Index("ix_dream_cards_created_at_dream_id", "created_at", "dream_id"),
+        # sort=discussed / sort=active
+        Index("ix_dream_cards_comment_count_created_at", "comment_count", "created_at"),
+        Index("ix_dream_cards_last_activity_at", "last_activity_at"),
+    )
+    dream_id = Column(Integer, ForeignKey("dreams.id"), primary_key=True)
+    user_id = Column(Integer, nullable=True)
+    content = Column(String)
+    summary = Column(String, nullable=True)
+    analysis = Column(String)
+    created_at = Column(DateTime)
+    author_name = Column(String)
+    author_avatar_url = Column(String(255))
+    # [{"name": ..., "description": ...}, ...]
+    tags = Column(JSON, default=list)
+    comment_count = Column(Integer, nullable=False, default=0)
+    reply_count = Column(Integer, nullable=False, default=0)
+    last_activity_at = Column(DateTime)
+
+
+class DreamSearchTerm(Base):
+    """Inverted index for search: one row per (analyzed term, dream) posting.
+
+    Terms come from app.core.analysis; `weight` is the field-boosted term
+    frequency. The primary key (term, dream_id) makes each posting list an
+    index range scan on every database.
+    """
+
+    __tablename__ = "dream_search_terms"
+    __table_args__ = (Index("ix_dream_search_terms_dream_id", "dream_id"),)
+    term = Column(String(64), primary_key=True)
+    dream_id = Column(Integer, ForeignKey("dreams.id"), primary_key=True)
+    weight = Column(Integer, nullable=False, default=1)
+
+
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        partial_index("ix_comments_dream_id_created_at", "dream_id", "created_at"),
+        partial_index("ix_comments_parent_id", "parent_id"),
+        partial_index("ix_comments_deleted_at", "deleted_at", where=DELETED),
+    )
     id = Column(Integer, primary_key=True)
     dream_id = Column(Integer, ForeignKey("dreams.id"), nullable=False)
     parent_id = Column(ForeignKey("comments.id"), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     content = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
+    deleted_at = Column(DateTime, nullable=True)
     dream = relationship("Dream", back_populates="comments")
     parent = relationship(
         "Comment",
@@ -62,6 +160,77 @@ class Comment(Base):
     )
 
 
+class DreamArchive(Base):
+    """Cold copy of an archived dream, fetchable by id after the hot rows are gone.
+
+    `data` is zlib-compressed JSON: {"dream": <Dream schema>, "comments": [<Comment schema>]}.
+    """
+
+    __tablename__ = "dream_archive"
+    dream_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=True, index=True)
+    created_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+    data = Column(LargeBinary, nullable=False)
+
+
+class OutboxEvent(Base):
+    """Side effects recorded in the same transaction as the write that caused them.
+
+    A dispatcher (app.core.outbox) claims pending rows in batches, delivers
+    them and stamps dispatched_at, so the write path never waits on delivery.
+    """
+
+    __tablename__ = "outbox_events"
+    __table_args__ = (Index("ix_outbox_events_dispatched_at_id", "dispatched_at", "id"),)
+    id = Column(Integer, primary_key=True)
+    topic = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # 배치를 가져간 디스패처와 임대 만료 시각 (만료되면 다른 디스패처가 다시 가져감)
+    claim_token = Column(String(32), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    dispatched_at = Column(DateTime, nullable=True)
+
+
+class IdempotencyRecord(Base):
+    """Idempotency-Key reservation / stored result shared by every worker.
+
+    A row without completed_at is a reservation held by the worker running
+    the request until expires_at; once completed it holds the JSON result
+    until expires_at (IDEMPOTENCY_TTL).
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
+    key = Column(String(512), primary_key=True)
+    fingerprint = Column(String(64), nullable=False, default="")
+    result = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class Notification(Base):
+    """In-app inbox entry; unread entries for the same dream are coalesced."""
+
+    __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_id_updated_at_id", "user_id", "updated_at", "id"),
+    )
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    kind = Column(String(32), nullable=False)
+    dream_id = Column(Integer, nullable=True)
+    # {"count": n, "comment_ids": [...], "actors": [{"id", "name"}], "preview": "..."}
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    read_at = Column(DateTime, nullable=True)
+
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True)
@@ -0,0 +1,140 @@
+"""
+댓글 카운터 보정 작업
+- dreams / dream_cards의 comment_count, reply_count, last_activity_at을 comments 테이블(삭제되지 않은 행) 기준으로 다시 계산
+- 값이 다른 행만 갱신하고, id 범위 배치마다 커밋해 긴 트랜잭션을 피함
+- 평소에는 CommentRepository가 쓰기 트랜잭션에서 갱신하므로, 이 작업은 드리프트(수동 SQL, 장애 등) 보정용
+
+    cd backend && python -m app.db.reconcile              # 한 번 실행
+    cd backend && python -m app.db.reconcile --interval 3600  # 주기 실행
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.db.base import session_scope
+from app.db.models import Comment, Dream, DreamCard
+from app.db.repository import live
+
+logger = logging.getLogger("dreamscope.reconcile")
+
+RECONCILE_BATCH_SIZE = int(os.getenv("RECONCILE_BATCH_SIZE", "1000"))
+
+
+def reconcile_counters(session: Session, batch_size: int = RECONCILE_BATCH_SIZE) -> int:
+    """Fix drifted counters; return the number of dreams that were corrected."""
+    fixed = 0
+    last_id = 0
+    while True:
+        rows = (
+            session.query(
+                Dream.id,
+                Dream.created_at,
+                Dream.comment_count,
+                Dream.reply_count,
+                Dream.last_activity_at,
+            )
+            .filter(Dream.id > last_id, live(Dream))
+            .order_by(Dream.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        ids = [r.id for r in rows]
+        actual = {
+            dream_id: (comments, replies, latest)
+            for dream_id, comments, replies, latest in session.query(
+                Comment.dream_id,
+                func.count(Comment.id),
+                func.count(Comment.parent_id),
+                func.max(Comment.created_at),
+            )
+            .filter(Comment.dream_id.in_(ids), live(Comment))
+            .group_by(Comment.dream_id)
+        }
+        cards = {
+            c.dream_id: (c.comment_count, c.reply_count, c.last_activity_at)
+            for c in session.query(
+                DreamCard.dream_id,
+                DreamCard.comment_count,
+                DreamCard.reply_count,
+                DreamCard.last_activity_at,
+            ).filter(DreamCard.dream_id.in_(ids))
+        }
+
+        dream_updates = []
+        card_updates = []
+        for r in rows:
+            comments, replies, latest = actual.get(r.id, (0, 0, None))
+            expected = (comments, replies, latest or r.created_at)
+            if (r.comment_count, r.reply_count, r.last_activity_at) != expected:
+                dream_updates.append(
+                    {
+                        "id": r.id,
+                        "comment_count": expected[0],
+                        "reply_count": expected[1],
+                        "last_activity_at": expected[2],
+                    }
+                )
+            if r.id in cards and cards[r.id] != expected:
+                card_updates.append(
+                    {
+                        "dream_id": r.id,
+                        "comment_count": expected[0],
+                        "reply_count": expected[1],
+                        "last_activity_at": expected[2],
+                    }
+                )
+        # bulk UPDATE ... WHERE pk = ? (executemany)
+        if dream_updates:
+            session.execute(update(Dream), dream_updates)
+        if card_updates:
+            session.execute(update(DreamCard), card_updates)
+        session.commit()
+        fixed += len({u["id"] for u in dream_updates} | {u["dream_id"] for u in card_updates})
+        last_id = ids[-1]
+    return fixed
+
+
+def run_once(batch_size: int = RECONCILE_BATCH_SIZE) -> int:
+    started = time.perf_counter()
+    with session_scope() as db:
+        fixed = reconcile_counters(db, batch_size)
+    logger.info(
+        "reconciled counters: %d dream(s) fixed in %.2fs",
+        fixed, time.perf_counter() - started,
+    )
+    return fixed
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Recompute dream comment counters")
+    parser.add_argument("--batch-size", type=int, default=RECONCILE_BATCH_SIZE)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=float(os.getenv("RECONCILE_INTERVAL", "0")),
+        help="repeat every N seconds (0 = run once)",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    while True:
+        try:
+            run_once(args.batch_size)
+        except Exception:
+            if not args.interval:
+                raise
+            logger.exception("counter reconciliation failed")
+        if not args.interval:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
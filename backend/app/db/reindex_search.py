@@ -0,0 +1,61 @@
+"""
+검색 색인(dream_search_terms) 재구축
+- 분석기(app.core.analysis)를 바꾸거나 색인이 어긋났을 때 살아 있는 꿈 전체를 다시 분석해 채움
+- 한 트랜잭션에서 지우고 다시 넣으므로 실행 중에도 검색은 이전 색인을 봄 (커밋 시점에 바뀜)
+
+    cd backend && python -m app.db.reindex_search
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+from sqlalchemy.orm import selectinload
+
+from app.db.base import session_scope
+from app.db.models import Dream
+from app.db.repository import SearchIndexRepository, live
+
+logger = logging.getLogger("dreamscope.reindex_search")
+
+REINDEX_BATCH_SIZE = int(os.getenv("REINDEX_BATCH_SIZE", "500"))
+
+
+def run_once(batch_size: int = REINDEX_BATCH_SIZE) -> int:
+    """Rebuild the search index for all live dreams; return how many were indexed."""
+    started = time.perf_counter()
+    total = 0
+    with session_scope() as db:
+        repo = SearchIndexRepository(db)
+        repo.clear()
+        query = (
+            db.query(Dream)
+            .options(selectinload(Dream.tags))
+            .filter(live(Dream))
+            .order_by(Dream.id)
+        )
+        postings = []
+        for dream in query.yield_per(batch_size):
+            postings.extend(repo.postings(dream))
+            total += 1
+            if total % batch_size == 0:
+                repo.insert(postings)
+                postings = []
+        repo.insert(postings)
+        db.commit()
+    logger.info("indexed %d dream(s) in %.2fs", total, time.perf_counter() - started)
+    return total
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the dream search index")
+    parser.add_argument("--batch-size", type=int, default=REINDEX_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    run_once(args.batch_size)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,88 @@
-from app.db.models import User, Dream, Comment, Tag
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from collections import Counter, defaultdict
+from itertools import groupby
+
+import math
+
+import orjson
+
+from app.core import background
+from app.core.analysis import analyze
+from app.core.tag_normalize import (
+    TAG_FUZZY_MAX_CANDIDATES,
+    TAG_FUZZY_MIN_LEN,
+    closest_key,
+    match_key,
+    normalize,
+)
+from app.core.tracing import trace_methods
+from app.db.models import (
+    User,
+    Dream,
+    DreamArchive,
+    DreamCard,
+    DreamSearchTerm,
+    Comment,
+    Notification,
+    OutboxEvent,
+    Tag,
+    TagAlias,
+    dream_tags,
+)
 from sqlalchemy.orm import Session, joinedload, selectinload
-from sqlalchemy import or_
+from sqlalchemy import case, delete, exists, func, insert, or_, select, tuple_, update
+
+
+def live(model):
+    """WHERE clause for rows that are not soft-deleted (what the partial indexes cover)."""
+    return model.deleted_at.is_(None)
+
+
+def tag_filters(
+    dream_id_column,
+    tags: list[str] | None,
+    match: str = "any",
+    exclude: list[str] | None = None,
+) -> list:
+    """WHERE clauses restricting `dream_id_column` by tag names.
 
+    - any: EXISTS over dream_tags (PK dream_id, tag_id)
+    - all: dream_id IN (GROUP BY dream_id HAVING COUNT(*) = n) driven by
+      ix_dream_tags_tag_id_dream_id, so only the postings of the given tags are read
+    - exclude: NOT EXISTS over dream_tags
+    """
+    clauses = []
+    if tags:
+        tag_ids = select(Tag.id).where(Tag.name.in_(tags))
+        if match == "all":
+            clauses.append(
+                dream_id_column.in_(
+                    select(dream_tags.c.dream_id)
+                    .where(dream_tags.c.tag_id.in_(tag_ids))
+                    .group_by(dream_tags.c.dream_id)
+                    .having(func.count() == len(set(tags)))
+                )
+            )
+        else:
+            clauses.append(
+                exists().where(
+                    dream_tags.c.dream_id == dream_id_column,
+                    dream_tags.c.tag_id.in_(tag_ids),
+                )
+            )
+    if exclude:
+        clauses.append(
+            ~exists().where(
+                dream_tags.c.dream_id == dream_id_column,
+                dream_tags.c.tag_id.in_(select(Tag.id).where(Tag.name.in_(exclude))),
+            )
+        )
+    return clauses
 
+
+@trace_methods
 class UserRepository:
     def __init__(self, session: Session):
         self.session = session
@@ -28,46 +108,155 @@ class UserRepository:
         self.session.commit()
 
 
+@trace_methods
 class DreamRepository:
     def __init__(self, session: Session):
         self.session = session
 
     def create(self, dream: Dream):
+        if dream.last_activity_at is None:
+            dream.last_activity_at = dream.created_at
         self.session.add(dream)
+        self.session.flush()
+        # 피드 카드도 같은 트랜잭션에서 생성
+        DreamCardRepository(self.session).upsert_for(dream)
         self.session.commit()
         return dream
 
     def delete(self, dream: Dream):
-        self.session.delete(dream)
+        """Soft-delete the dream and its comments with bulk UPDATEs; the feed card goes now."""
+        now = datetime.utcnow()
+        self.session.execute(
+            update(Dream).where(Dream.id == dream.id).values(deleted_at=now)
+        )
+        self.session.execute(
+            update(Comment)
+            .where(Comment.dream_id == dream.id, live(Comment))
+            .values(deleted_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        DreamCardRepository(self.session).delete_for(dream.id)
         self.session.commit()
+        # 메모리/관련 꿈/태그 통계/중복 검사 캐시에서 빠지도록
+        background.dispatch_dreams_removed([dream.id], {dream.user_id})
+
+    def purge(self, dream_ids: list[int]) -> None:
+        """Hard-delete dreams and everything hanging off them in bulk (no commit).
+
+        One DELETE per table instead of ORM cascade, so child comments are
+        never loaded.
+        """
+        if not dream_ids:
+            return
+        self.session.execute(
+            delete(Comment)
+            .where(Comment.dream_id.in_(dream_ids))
+            .execution_options(synchronize_session=False)
+        )
+        self.session.execute(delete(dream_tags).where(dream_tags.c.dream_id.in_(dream_ids)))
+        DreamCardRepository(self.session).delete_for_many(dream_ids)
+        self.session.execute(
+            delete(Dream).where(Dream.id.in_(dream_ids)).execution_options(synchronize_session=False)
+        )
 
     def get_all(self):
-        return self.session.query(Dream).order_by(Dream.created_at.desc()).all()
+        return self.session.query(Dream).filter(live(Dream)).order_by(Dream.created_at.desc()).all()
 
     def get(self, dream_id: int):
-        return self.session.query(Dream).filter(Dream.id == dream_id).first()
+        return self.session.query(Dream).filter(Dream.id == dream_id, live(Dream)).first()
 
-    def get_recent_for_user(self, user_id: int, limit: int = 5):
-        """Return the most recent dreams for a given user, newest first."""
-        return (
+    def live_ids(self, dream_ids: list[int]) -> set[int]:
+        """Which of `dream_ids` are still live (cached entries may outlive a delete elsewhere)."""
+        if not dream_ids:
+            return set()
+        return set(
+            self.session.scalars(select(Dream.id).where(Dream.id.in_(dream_ids), live(Dream)))
+        )
+
+    def get_recent_for_user(
+        self,
+        user_id: int,
+        limit: int = 5,
+        before: tuple[datetime, int] | None = None,
+    ):
+        """Return the most recent dreams for a given user, newest first.
+
+        `before` is the (created_at, id) of the last dream already seen, for
+        keyset pagination over ix_dreams_user_id_created_at_id.
+        """
+        query = (
             self.session.query(Dream)
-            .filter(Dream.user_id == user_id)
-            .order_by(Dream.created_at.desc())
+            .options(selectinload(Dream.tags))
+            .filter(Dream.user_id == user_id, live(Dream))
+        )
+        if before is not None:
+            query = query.filter(tuple_(Dream.created_at, Dream.id) < before)
+        return (
+            query.order_by(Dream.created_at.desc(), Dream.id.desc())
             .limit(max(1, limit))
             .all()
         )
 
+    def iter_export_for_user(self, user_id: int, batch_size: int = 500):
+        """Yield (dream row, tag names, comment rows) for all of a user's dreams, oldest first.
+
+        Dreams are streamed with a server-side cursor (yield_per); tags and
+        comments are loaded per batch, so memory stays bounded by batch_size.
+        """
+        result = self.session.execute(
+            select(
+                Dream.id,
+                Dream.content,
+                Dream.summary,
+                Dream.analysis,
+                Dream.created_at,
+                Dream.comment_count,
+                Dream.reply_count,
+                Dream.last_activity_at,
+            )
+            .where(Dream.user_id == user_id, live(Dream))
+            .order_by(Dream.created_at, Dream.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for rows in result.partitions():
+            ids = [r.id for r in rows]
+            tags = defaultdict(list)
+            for dream_id, name in self.session.execute(
+                select(dream_tags.c.dream_id, Tag.name)
+                .join(Tag, Tag.id == dream_tags.c.tag_id)
+                .where(dream_tags.c.dream_id.in_(ids))
+                .order_by(dream_tags.c.dream_id, Tag.name)
+            ):
+                tags[dream_id].append(name)
+            comments = defaultdict(list)
+            for c in self.session.execute(
+                select(
+                    Comment.id,
+                    Comment.dream_id,
+                    Comment.parent_id,
+                    Comment.user_id,
+                    Comment.content,
+                    Comment.created_at,
+                )
+                .where(Comment.dream_id.in_(ids), live(Comment))
+                .order_by(Comment.dream_id, Comment.created_at, Comment.id)
+            ):
+                comments[c.dream_id].append(c)
+            for r in rows:
+                yield r, tags[r.id], comments[r.id]
+
     def search_like(self, q: str):
         pattern = f"%{q}%"
         return (
             self.session.query(Dream)
             .outerjoin(Dream.tags)
             .filter(
+                live(Dream),
                 or_(
                     Dream.content.ilike(pattern),
                     Dream.summary.ilike(pattern),
                     Tag.name.ilike(pattern),
-                )
+                ),
             )
             .distinct()
             .order_by(Dream.created_at.desc())
@@ -75,7 +264,7 @@ class DreamRepository:
         )
 
     def count_all(self) -> int:
-        return self.session.query(Dream).count()
+        return self.session.query(Dream).filter(live(Dream)).count()
 
     def count_like(self, q: str) -> int:
         pattern = f"%{q}%"
@@ -83,11 +272,12 @@ class DreamRepository:
             self.session.query(Dream.id)
             .outerjoin(Dream.tags)
             .filter(
+                live(Dream),
                 or_(
                     Dream.content.ilike(pattern),
                     Dream.summary.ilike(pattern),
                     Tag.name.ilike(pattern),
-                )
+                ),
             )
             .distinct()
             .count()
@@ -97,6 +287,7 @@ class DreamRepository:
         offset = max(0, (page - 1) * max(1, limit))
         return (
             self.session.query(Dream)
+            .filter(live(Dream))
             .order_by(Dream.created_at.desc())
             .offset(offset)
             .limit(limit)
@@ -110,11 +301,12 @@ class DreamRepository:
             self.session.query(Dream)
             .outerjoin(Dream.tags)
             .filter(
+                live(Dream),
                 or_(
                     Dream.content.ilike(pattern),
                     Dream.summary.ilike(pattern),
                     Tag.name.ilike(pattern),
-                )
+                ),
             )
             .distinct()
             .order_by(Dream.created_at.desc())
@@ -123,33 +315,43 @@ class DreamRepository:
             .all()
         )
 
-    def count_advanced(self, tags: list[str] | None) -> int:
-        """Count dreams with optional tag filter.
+    def count_advanced(
+        self,
+        tags: list[str] | None,
+        match: str = "any",
+        exclude: list[str] | None = None,
+    ) -> int:
+        """Count dreams matching the same tag filter as the feed (see tag_filters).
 
-        Uses EXISTS via relationship any() to avoid JOIN/DISTINCT explosion.
-        Falls back to simple count when no tags are provided.
+        Falls back to simple count when no filter is given.
         """
-        if not tags:
+        if not tags and not exclude:
             return self.count_all()
         return (
             self.session.query(Dream.id)
-            .filter(Dream.tags.any(Tag.name.in_(tags)))
+            .filter(live(Dream), *tag_filters(Dream.id, tags, match, exclude))
             .count()
         )
 
-    def search_advanced_page(self, tags: list[str] | None, page: int, limit: int):
+    def search_advanced_page(
+        self,
+        tags: list[str] | None,
+        page: int,
+        limit: int,
+        match: str = "any",
+        exclude: list[str] | None = None,
+    ):
         """Page through dreams with optional tag filter, newest first.
 
-        - Avoids JOIN/DISTINCT by using EXISTS filter when tags are present.
+        - Avoids JOIN/DISTINCT by using EXISTS / GROUP BY subqueries (tag_filters).
         - Eager-loads related user and tags to prevent N+1 in serializers.
         """
         offset = max(0, (page - 1) * max(1, limit))
         query = (
             self.session.query(Dream)
             .options(selectinload(Dream.tags), joinedload(Dream.user))
+            .filter(live(Dream), *tag_filters(Dream.id, tags, match, exclude))
         )
-        if tags:
-            query = query.filter(Dream.tags.any(Tag.name.in_(tags)))
         return (
             query.order_by(Dream.created_at.desc())
             .offset(offset)
@@ -158,6 +360,227 @@ class DreamRepository:
         )
 
 
+@trace_methods
+class DreamCardRepository:
+    """Read model for the feed (see DreamCard). Write helpers do not commit."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    @staticmethod
+    def build(dream: Dream, user: User | None) -> DreamCard:
+        return DreamCard(
+            dream_id=dream.id,
+            user_id=dream.user_id,
+            content=dream.content,
+            summary=dream.summary,
+            analysis=dream.analysis,
+            created_at=dream.created_at,
+            author_name=user.name() if user else "",
+            author_avatar_url=(user.picture if user else None) or "",
+            tags=[{"name": t.name, "description": t.description} for t in dream.tags],
+            comment_count=dream.comment_count or 0,
+            reply_count=dream.reply_count or 0,
+            last_activity_at=dream.last_activity_at or dream.created_at,
+        )
+
+    def get(self, dream_id: int):
+        return self.session.get(DreamCard, dream_id)
+
+    def get_many(self, dream_ids: list[int]) -> dict[int, DreamCard]:
+        if not dream_ids:
+            return {}
+        cards = self.session.query(DreamCard).filter(DreamCard.dream_id.in_(dream_ids))
+        return {c.dream_id: c for c in cards}
+
+    # sort 파라미터 -> ORDER BY (각각 dream_cards 인덱스로 정렬)
+    SORTS = {
+        "recent": (DreamCard.created_at.desc(),),
+        "discussed": (DreamCard.comment_count.desc(), DreamCard.created_at.desc()),
+        "active": (DreamCard.last_activity_at.desc(),),
+    }
+
+    def get_page(
+        self,
+        tags: list[str] | None,
+        page: int,
+        limit: int,
+        sort: str = "recent",
+        match: str = "any",
+        exclude: list[str] | None = None,
+    ):
+        """Feed page in `sort` order, filtered by tags (see tag_filters)."""
+        return self._page(
+            self.session.query(DreamCard), tags, page, limit, sort, match, exclude
+        )
+
+    def get_page_rows(
+        self,
+        tags: list[str] | None,
+        page: int,
+        limit: int,
+        sort: str = "recent",
+        match: str = "any",
+        exclude: list[str] | None = None,
+    ):
+        """Same as get_page but returns plain column rows (no ORM identity map)."""
+        return self._page(
+            self.session.query(*DreamCard.__table__.columns),
+            tags, page, limit, sort, match, exclude,
+        )
+
+    def _page(self, query, tags, page, limit, sort, match, exclude):
+        offset = max(0, (page - 1) * max(1, limit))
+        query = query.filter(*tag_filters(DreamCard.dream_id, tags, match, exclude))
+        return (
+            query.order_by(*self.SORTS[sort])
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+
+    def search_rows(self, q: str, limit: int, min_match: float = 0.5, max_df_ratio: float = 0.5):
+        """Cards ranked by analyzed-term relevance (see SearchIndexRepository.rank)."""
+        ranked = SearchIndexRepository(self.session).rank(q, limit, min_match, max_df_ratio)
+        if not ranked:
+            return []
+        rows = {
+            r.dream_id: r
+            for r in self.session.query(*DreamCard.__table__.columns).filter(
+                DreamCard.dream_id.in_([i for i, _ in ranked])
+            )
+        }
+        return [rows[i] for i, _ in ranked if i in rows]
+
+    def upsert_for(self, dream: Dream) -> DreamCard:
+        # 검색 색인도 카드와 같은 트랜잭션에서 갱신
+        SearchIndexRepository(self.session).index(dream)
+        return self.session.merge(self.build(dream, dream.user))
+
+    def delete_for(self, dream_id: int) -> None:
+        self.delete_for_many([dream_id])
+
+    def delete_for_many(self, dream_ids: list[int]) -> None:
+        SearchIndexRepository(self.session).remove(dream_ids)
+        self.session.query(DreamCard).filter(DreamCard.dream_id.in_(dream_ids)).delete(
+            synchronize_session=False
+        )
+
+    def rebuild_all(self, batch_size: int = 500) -> int:
+        """Recreate every card and the search index from the normalized tables (repair/backfill)."""
+        self.session.query(DreamCard).delete(synchronize_session=False)
+        search_repo = SearchIndexRepository(self.session)
+        search_repo.clear()
+        total = 0
+        query = (
+            self.session.query(Dream)
+            .options(selectinload(Dream.tags), joinedload(Dream.user))
+            .filter(live(Dream))
+            .order_by(Dream.id)
+        )
+        postings = []
+        for dream in query.yield_per(batch_size):
+            self.session.add(self.build(dream, dream.user))
+            postings.extend(search_repo.postings(dream))
+            total += 1
+            if len(postings) >= batch_size * 20:
+                search_repo.insert(postings)
+                postings = []
+        search_repo.insert(postings)
+        self.session.commit()
+        return total
+
+
+@trace_methods
+class SearchIndexRepository:
+    """Inverted index over dream text (dream_search_terms). Write helpers do not commit.
+
+    The same analyzer (app.core.analysis) runs on dreams at index time and on
+    the query at search time, so "떨어지는" finds "떨어졌다" and "falling" finds
+    "falls" without scanning dream text.
+    """
+
+    # 필드별 가중치: 태그 > 요약 > 본문
+    FIELD_WEIGHTS = (("tags", 3), ("summary", 2), ("content", 1))
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    @classmethod
+    def postings(cls, dream: Dream) -> list[dict]:
+        """dream_search_terms rows for a dream (weight = field-boosted term frequency)."""
+        fields = {
+            "tags": " ".join(t.name for t in dream.tags),
+            "summary": dream.summary or "",
+            "content": dream.content or "",
+        }
+        weights: Counter[str] = Counter()
+        for field, boost in cls.FIELD_WEIGHTS:
+            for term in analyze(fields[field]):
+                weights[term] += boost
+        return [{"term": t, "dream_id": dream.id, "weight": w} for t, w in weights.items()]
+
+    def insert(self, postings: list[dict]) -> None:
+        if postings:
+            self.session.execute(insert(DreamSearchTerm), postings)
+
+    def index(self, dream: Dream) -> None:
+        self.remove([dream.id])
+        self.insert(self.postings(dream))
+
+    def remove(self, dream_ids: list[int]) -> None:
+        if dream_ids:
+            self.session.execute(delete(DreamSearchTerm).where(DreamSearchTerm.dream_id.in_(dream_ids)))
+
+    def clear(self) -> None:
+        self.session.execute(delete(DreamSearchTerm))
+
+    def document_frequencies(self, terms: list[str]) -> dict[str, int]:
+        return dict(
+            self.session.query(DreamSearchTerm.term, func.count())
+            .filter(DreamSearchTerm.term.in_(terms))
+            .group_by(DreamSearchTerm.term)
+            .all()
+        )
+
+    def rank(
+        self, q: str, limit: int, min_match: float = 0.5, max_df_ratio: float = 0.5
+    ) -> list[tuple[int, float]]:
+        """Top (dream_id, score) for a query, scored by sum(weight * idf) over matched terms.
+
+        - Only the posting lists of the query terms are read (PK range scans).
+        - Terms in more than `max_df_ratio` of dreams are dropped unless nothing
+          rarer is left: they barely change the ranking but are the longest lists.
+        - A dream must match at least `min_match` of the remaining terms.
+        """
+        terms = sorted(set(analyze(q)))
+        if not terms:
+            return []
+        df = self.document_frequencies(terms)
+        if not df:
+            return []
+        total = max(self.session.query(func.count()).select_from(DreamCard).scalar() or 0, 1)
+        common = max(1.0, total * max_df_ratio)
+        kept = [t for t in df if df[t] <= common] or [min(df, key=df.get)]
+        # BM25 idf (항상 양수)
+        idf = {t: math.log(1 + (total - df[t] + 0.5) / (df[t] + 0.5)) for t in kept}
+        score = func.sum(DreamSearchTerm.weight * case(idf, value=DreamSearchTerm.term, else_=0.0))
+        # 색인에 없는 질의어는 분모에 남기고, 흔해서 뺀 질의어는 분모에서도 뺌
+        considered = len(kept) + len(terms) - len(df)
+        needed = min(max(1, math.ceil(considered * min_match)), len(kept))
+        rows = (
+            self.session.query(DreamSearchTerm.dream_id, score.label("score"))
+            .filter(DreamSearchTerm.term.in_(kept))
+            .group_by(DreamSearchTerm.dream_id)
+            .having(func.count() >= needed)
+            .order_by(score.desc(), DreamSearchTerm.dream_id.desc())
+            .limit(limit)
+            .all()
+        )
+        return [(dream_id, float(s)) for dream_id, s in rows]
+
+
+@trace_methods
 class TagRepository:
     def __init__(self, session: Session):
         self.session = session
@@ -178,6 +601,9 @@ class TagRepository:
     def get_all(self) -> list[Tag]:
         return self.session.query(Tag).all()
 
+    def get_names(self) -> list[str]:
+        return [name for (name,) in self.session.query(Tag.name)]
+
     def get_for_dream(self, dream_id: int) -> list[Tag]:
         """Return all tags associated with a given dream id."""
         return (
@@ -188,40 +614,253 @@ class TagRepository:
             .all()
         )
 
+    def iter_dream_tags(self, after_id: int = 0, batch_size: int = 1000):
+        """Stream (dream_id, created_at, [tag names]) for dreams with id > after_id."""
+        rows = (
+            self.session.query(Dream.id, Dream.created_at, Tag.name)
+            .join(dream_tags, dream_tags.c.dream_id == Dream.id)
+            .join(Tag, Tag.id == dream_tags.c.tag_id)
+            .filter(Dream.id > after_id, live(Dream))
+            .order_by(Dream.id)
+            .yield_per(batch_size)
+        )
+        for (dream_id, created_at), group in groupby(rows, key=lambda r: (r[0], r[1])):
+            yield dream_id, created_at, [r[2] for r in group]
+
+    def resolve(self, name: str, fuzzy: bool = False):
+        """Find the canonical tag for a raw name.
+
+        Tries the normalized name, then the alias table, then the match key
+        (case/inflection variants), and with `fuzzy` the nearest key by
+        spelling. Returns None if nothing matches.
+        """
+        normalized = normalize(name)
+        if not normalized:
+            return None
+        existing = self.get_by_name(normalized)
+        if existing:
+            return existing
+        alias = self.session.get(TagAlias, normalized)
+        if alias is not None:
+            return alias.tag
+        key = match_key(normalized)
+        existing = (
+            self.session.query(Tag).filter(Tag.match_key == key).order_by(Tag.id).first()
+        )
+        if existing or not fuzzy or len(key) < TAG_FUZZY_MIN_LEN:
+            return existing
+        nearest = closest_key(key, self._fuzzy_candidates(key))
+        if nearest is None:
+            return None
+        return (
+            self.session.query(Tag).filter(Tag.match_key == nearest).order_by(Tag.id).first()
+        )
+
+    def _fuzzy_candidates(self, key: str) -> list[str]:
+        """Keys worth comparing with `key`: same first character, length within 2.
+
+        A range scan on ix_tags_match_key bounded by TAG_FUZZY_MAX_CANDIDATES,
+        so a new tag never reads the whole vocabulary (typos in the first
+        character are left to merge_tags --fuzzy).
+        """
+        first = key[0]
+        return [
+            k
+            for (k,) in self.session.query(Tag.match_key)
+            .filter(
+                Tag.match_key >= first,
+                Tag.match_key < chr(ord(first) + 1),
+                func.length(Tag.match_key).between(len(key) - 2, len(key) + 2),
+            )
+            .limit(TAG_FUZZY_MAX_CANDIDATES)
+        ]
+
+    def resolve_names(self, names: list[str]) -> list[str]:
+        """Map user-supplied names (filters) to canonical tag names, dropping unknowns."""
+        resolved = {t.name for t in (self.resolve(n) for n in names) if t is not None}
+        return sorted(resolved)
+
+    def add_alias(self, alias: str, tag: Tag) -> None:
+        alias = normalize(alias)
+        if alias and alias != tag.name and self.session.get(TagAlias, alias) is None:
+            self.session.add(TagAlias(alias=alias, tag_id=tag.id))
+
     def get_or_create(self, tag: Tag):
-        existing = self.get_by_name(tag.name)
+        """Return the canonical tag for `tag.name`, creating it only if none matches.
+
+        A variant that resolved to an existing tag is recorded as an alias so
+        the next lookup is an exact hit.
+        """
+        existing = self.resolve(tag.name, fuzzy=True)
         if existing:
+            if normalize(tag.name) != existing.name:
+                self.add_alias(tag.name, existing)
+                self.session.commit()
             return existing
+        tag.name = normalize(tag.name)
+        tag.match_key = match_key(tag.name)
         return self.add(tag)
 
 
+@trace_methods
 class CommentRepository:
     def __init__(self, session: Session):
         self.session = session
 
     def create(self, comment: Comment):
         self.session.add(comment)
+        self.session.flush()
+        self._apply_counters(
+            comment.dream_id,
+            comments=1,
+            replies=1 if comment.parent_id is not None else 0,
+            last_activity_at=comment.created_at,
+        )
+        if comment.parent_id is not None:
+            self._enqueue_reply_notification(comment)
         self.session.commit()
         return comment
 
+    def _enqueue_reply_notification(self, reply: Comment) -> None:
+        """Outbox row telling the parent's author about `reply` (same transaction)."""
+        recipient_id = self.session.execute(
+            select(Comment.user_id).where(Comment.id == reply.parent_id)
+        ).scalar()
+        if recipient_id is None or recipient_id == reply.user_id:
+            return
+        OutboxRepository(self.session).add(
+            "comment.replied",
+            {
+                "recipient_id": recipient_id,
+                "actor_id": reply.user_id,
+                "dream_id": reply.dream_id,
+                "parent_id": reply.parent_id,
+                "comment_id": reply.id,
+                "preview": (reply.content or "")[:140],
+            },
+        )
+
     def delete(self, comment: Comment):
-        self.session.delete(comment)
+        """Soft-delete the comment and its whole reply subtree in one UPDATE."""
+        subtree = (
+            select(Comment.id).where(Comment.id == comment.id).cte("subtree", recursive=True)
+        )
+        subtree = subtree.union_all(
+            select(Comment.id).where(Comment.parent_id == subtree.c.id, live(Comment))
+        )
+        # id를 먼저 읽음 (sqlite3는 WITH로 시작하는 UPDATE의 rowcount를 돌려주지 않음)
+        ids = list(self.session.execute(select(subtree.c.id)).scalars())
+        self.session.execute(
+            update(Comment)
+            .where(Comment.id.in_(ids))
+            .values(deleted_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        removed = len(ids)
+        # 대댓글까지 함께 지워지므로 하위 트리 크기만큼 차감
+        replies = removed if comment.parent_id is not None else removed - 1
+        self._apply_counters(comment.dream_id, comments=-removed, replies=-replies)
         self.session.commit()
 
+    def purge_deleted(self, before: datetime, batch_size: int = 1000) -> int:
+        """Hard-delete comments soft-deleted before `before`; return how many went."""
+        total = 0
+        while True:
+            # 부모를 지울 때 자식도 같이 soft-delete되므로, 오래된 삭제 행 집합은 하위 트리를 포함함
+            # 답글은 부모보다 id가 크므로 id 역순으로 지우면 배치가 나뉘어도 자식이 먼저 지워짐 (FK 위반 없음)
+            ids = (
+                select(Comment.id)
+                .where(Comment.deleted_at < before)
+                .order_by(Comment.id.desc())
+                .limit(batch_size)
+            )
+            removed = self.session.execute(
+                delete(Comment)
+                .where(Comment.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            self.session.commit()
+            total += removed
+            if removed < batch_size:
+                return total
+
+    def _apply_counters(
+        self, dream_id: int, comments: int, replies: int, last_activity_at=None
+    ) -> None:
+        """Shift the counters on the dream row and its feed card (no commit).
+
+        Increments are SQL expressions so concurrent writers do not lose
+        updates. Without `last_activity_at` (deletes) it is recomputed from
+        the remaining comments.
+        """
+        latest = (
+            select(func.max(Comment.created_at))
+            .where(Comment.dream_id == dream_id, live(Comment))
+            .scalar_subquery()
+        )
+        for model, key in ((Dream, Dream.id), (DreamCard, DreamCard.dream_id)):
+            values = {
+                model.comment_count: model.comment_count + comments,
+                model.reply_count: model.reply_count + replies,
+                model.last_activity_at: (
+                    last_activity_at
+                    if last_activity_at is not None
+                    else func.coalesce(latest, model.created_at)
+                ),
+            }
+            self.session.query(model).filter(key == dream_id).update(
+                values, synchronize_session=False
+            )
+
     def get_all(self):
-        return self.session.query(Comment).order_by(Comment.created_at.asc()).all()
+        return (
+            self.session.query(Comment).filter(live(Comment)).order_by(Comment.created_at.asc()).all()
+        )
 
     def get(self, comment_id: int):
-        return self.session.query(Comment).filter(Comment.id == comment_id).first()
+        return self.session.query(Comment).filter(Comment.id == comment_id, live(Comment)).first()
 
     def get_for_dream(self, dream_id: int):
         return (
             self.session.query(Comment)
-            .filter(Comment.dream_id == dream_id)
+            .filter(Comment.dream_id == dream_id, live(Comment))
+            .order_by(Comment.created_at.asc())
+            .all()
+        )
+
+    def _rows(self):
+        return self.session.query(
+            Comment.id,
+            Comment.dream_id,
+            Comment.content,
+            Comment.created_at,
+            Comment.parent_id,
+            Comment.user_id,
+            User.given_name,
+            User.family_name,
+            User.picture,
+        ).outerjoin(User, User.id == Comment.user_id)
+
+    def get_rows_for_dream(self, dream_id: int):
+        """Comments with their author columns in one query, oldest first."""
+        return (
+            self._rows()
+            .filter(Comment.dream_id == dream_id, live(Comment))
             .order_by(Comment.created_at.asc())
             .all()
         )
 
+    def get_rows_for_dreams(self, dream_ids: list[int]) -> dict[int, list]:
+        """get_rows_for_dream for many dreams at once, keyed by dream id."""
+        grouped = defaultdict(list)
+        for row in (
+            self._rows()
+            .filter(Comment.dream_id.in_(dream_ids), live(Comment))
+            .order_by(Comment.dream_id, Comment.created_at.asc())
+        ):
+            grouped[row.dream_id].append(row)
+        return grouped
+
     def update(self, comment_id: int, comment: Comment):
         self.session.query(Comment).filter(Comment.id == comment_id).update(comment)
         self.session.commit()
@@ -233,3 +872,189 @@ class CommentRepository:
         )
         self.session.commit()
         return self.get(comment_id)
+
+
+@trace_methods
+class ArchiveRepository:
+    """Cold storage for dreams moved out of the hot tables (see DreamArchive)."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, dream_id: int, user_id: int | None, created_at: datetime, document: dict) -> None:
+        """Store `document` compressed (no commit)."""
+        self.session.add(
+            DreamArchive(
+                dream_id=dream_id,
+                user_id=user_id,
+                created_at=created_at,
+                archived_at=datetime.utcnow(),
+                data=zlib.compress(orjson.dumps(document), 6),
+            )
+        )
+
+    def get(self, dream_id: int) -> dict | None:
+        data = self.session.execute(
+            select(DreamArchive.data).where(DreamArchive.dream_id == dream_id)
+        ).scalar()
+        return orjson.loads(zlib.decompress(data)) if data is not None else None
+
+
+@trace_methods
+class OutboxRepository:
+    """Pending side effects; add() joins the caller's transaction (no commit)."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, topic: str, payload: dict) -> OutboxEvent:
+        event = OutboxEvent(topic=topic, payload=payload, created_at=datetime.utcnow())
+        self.session.add(event)
+        return event
+
+    def claim(self, batch_size: int, lease_seconds: float) -> list[OutboxEvent]:
+        """Take up to `batch_size` pending events for this caller and commit the claim.
+
+        One UPDATE stamps a random token and a lease; rows whose lease
+        expired (crashed dispatcher) can be claimed again, so delivery is
+        at-least-once and safe with several dispatchers.
+        """
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        claimable = (OutboxEvent.dispatched_at.is_(None)) & (
+            OutboxEvent.locked_until.is_(None) | (OutboxEvent.locked_until < now)
+        )
+        pending = (
+            select(OutboxEvent.id).where(claimable).order_by(OutboxEvent.id).limit(batch_size)
+        )
+        self.session.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(pending), claimable)
+            .values(
+                claim_token=token,
+                locked_until=now + timedelta(seconds=lease_seconds),
+                attempts=OutboxEvent.attempts + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        self.session.commit()
+        return (
+            self.session.query(OutboxEvent)
+            .filter(OutboxEvent.claim_token == token)
+            .order_by(OutboxEvent.id)
+            .all()
+        )
+
+    def mark_dispatched(self, ids: list[int], error: str | None = None) -> None:
+        self.session.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(ids))
+            .values(dispatched_at=datetime.utcnow(), locked_until=None, last_error=error)
+            .execution_options(synchronize_session=False)
+        )
+
+    def release(self, ids: list[int], error: str) -> None:
+        """Give failed events back for a later retry (after the lease would have ended)."""
+        self.session.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(ids))
+            .values(claim_token=None, last_error=error[:2000])
+            .execution_options(synchronize_session=False)
+        )
+
+    def pending_count(self) -> int:
+        return (
+            self.session.query(func.count(OutboxEvent.id))
+            .filter(OutboxEvent.dispatched_at.is_(None))
+            .scalar()
+        )
+
+    def purge_dispatched(self, older_than: datetime) -> int:
+        result = self.session.query(OutboxEvent).filter(
+            OutboxEvent.dispatched_at < older_than
+        ).delete(synchronize_session=False)
+        self.session.commit()
+        return result
+
+
+@trace_methods
+class NotificationRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add_coalesced(self, user_id: int, kind: str, dream_id: int | None, payload: dict) -> Notification:
+        """Merge into the user's unread entry of the same kind and dream, or insert (no commit).
+
+        payload: {"count", "comment_ids", "actors", "preview"}; counts add up,
+        ids/actors are appended (actors de-duplicated), preview is replaced.
+        """
+        now = datetime.utcnow()
+        existing = (
+            self.session.query(Notification)
+            .filter(
+                Notification.user_id == user_id,
+                Notification.kind == kind,
+                Notification.dream_id == dream_id,
+                Notification.read_at.is_(None),
+            )
+            .order_by(Notification.id.desc())
+            .first()
+        )
+        if existing is None:
+            note = Notification(
+                user_id=user_id,
+                kind=kind,
+                dream_id=dream_id,
+                payload=payload,
+                created_at=now,
+                updated_at=now,
+            )
+            self.session.add(note)
+            return note
+        merged = dict(existing.payload)
+        merged["count"] = merged.get("count", 0) + payload.get("count", 0)
+        merged["comment_ids"] = merged.get("comment_ids", []) + payload.get("comment_ids", [])
+        seen = {a["id"] for a in merged.get("actors", [])}
+        merged["actors"] = merged.get("actors", []) + [
+            a for a in payload.get("actors", []) if a["id"] not in seen
+        ]
+        merged["preview"] = payload.get("preview", merged.get("preview"))
+        existing.payload = merged
+        existing.updated_at = now
+        return existing
+
+    def get_page(
+        self,
+        user_id: int,
+        limit: int,
+        after: tuple[datetime, int] | None = None,
+        unread_only: bool = False,
+    ) -> list[Notification]:
+        """Newest-updated first; `after` is the (updated_at, id) of the last item seen."""
+        query = self.session.query(Notification).filter(Notification.user_id == user_id)
+        if unread_only:
+            query = query.filter(Notification.read_at.is_(None))
+        if after is not None:
+            query = query.filter(tuple_(Notification.updated_at, Notification.id) < after)
+        return (
+            query.order_by(Notification.updated_at.desc(), Notification.id.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def unread_count(self, user_id: int) -> int:
+        return (
+            self.session.query(func.count(Notification.id))
+            .filter(Notification.user_id == user_id, Notification.read_at.is_(None))
+            .scalar()
+        )
+
+    def mark_read(self, user_id: int, ids: list[int] | None = None) -> int:
+        query = self.session.query(Notification).filter(
+            Notification.user_id == user_id, Notification.read_at.is_(None)
+        )
+        if ids is not None:
+            query = query.filter(Notification.id.in_(ids))
+        updated = query.update({"read_at": datetime.utcnow()}, synchronize_session=False)
+        self.session.commit()
+        return updated
@@ -0,0 +1,369 @@
+"""
+전체 데이터 내보내기 / 가져오기 (백업, SQLite <-> Postgres 이전, 분석용 추출)
+- 대상 테이블: users, tags, tag_aliases, dreams, dream_tags, comments, dream_archive (dream_cards, dream_search_terms는 가져온 뒤 다시 만듦)
+- 내보내기: 테이블마다 PK 순서로 서버 측 커서(stream_results)에서 --chunk-rows개씩 읽어
+  <dir>/<table>/part-NNNNN.ndjson.gz (또는 .parquet) 파일 하나로 기록 -> 메모리는 청크 하나 크기
+  모든 파일을 쓴 뒤 manifest.json(열 목록, 파일별 행 수와 PK 범위, 스키마 revision)을 마지막에 씀
+- 가져오기: 대상 DB는 `alembic upgrade head`가 끝난 빈 스키마
+  - 테이블을 채우는 동안 보조 인덱스(UNIQUE 제외)를 지웠다가 끝난 뒤 한 번에 다시 만듦
+  - 파일마다 한 트랜잭션에서 multi-row INSERT(executemany)로 적재, 끝난 파일은 상태 파일에 기록
+  - 중단 후 --resume으로 다시 실행하면 끝난 파일은 건너뛰고, 하다 만 파일은 그 PK 범위를 지운 뒤 다시 적재
+  - Postgres는 적재 후 id 시퀀스를 최댓값으로 맞춤
+- Parquet(--format parquet)은 pyarrow가 설치된 경우에만 사용 가능
+
+    cd backend && python -m app.db.transfer export dump/
+    cd backend && python -m app.db.transfer import dump/ --database-url postgresql://localhost/dreamscope
+    cd backend && python -m app.db.transfer import dump/ --database-url postgresql://localhost/dreamscope --resume
+"""
+
+import argparse
+import base64
+import gzip
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import orjson
+from sqlalchemy import DateTime, LargeBinary, create_engine, delete, event, func, inspect, select, text, tuple_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import base
+from app.db.models import Comment, Dream, DreamArchive, Tag, TagAlias, User, dream_tags
+from app.db.repository import DreamCardRepository
+
+logger = logging.getLogger("dreamscope.transfer")
+
+TRANSFER_CHUNK_ROWS = int(os.getenv("TRANSFER_CHUNK_ROWS", "50000"))
+TRANSFER_INSERT_BATCH = int(os.getenv("TRANSFER_INSERT_BATCH", "5000"))
+TRANSFER_GZIP_LEVEL = int(os.getenv("TRANSFER_GZIP_LEVEL", "3"))
+
+# 외래 키 순서 (comments.parent_id는 id 순서로 적재하므로 부모가 먼저 들어감)
+TABLES = [
+    User.__table__,
+    Tag.__table__,
+    TagAlias.__table__,
+    Dream.__table__,
+    dream_tags,
+    Comment.__table__,
+    DreamArchive.__table__,
+]
+MANIFEST = "manifest.json"
+STATE = ".import-state.json"
+EXTENSIONS = {"ndjson": ".ndjson.gz", "parquet": ".parquet"}
+
+
+def get_engine(database_url: str | None) -> Engine:
+    if not database_url or database_url == base.DATABASE_URL:
+        return base.engine
+    return create_engine(database_url)
+
+
+def _revision(engine: Engine) -> str | None:
+    if not inspect(engine).has_table("alembic_version"):
+        return None
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+@contextmanager
+def _snapshot(engine: Engine):
+    """One read-only transaction for the whole export, so every table sees the same data."""
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(
+            isolation_level="REPEATABLE READ", postgresql_readonly=True
+        ) as conn:
+            with conn.begin():
+                yield conn
+        return
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            # pysqlite는 SELECT만으로는 트랜잭션을 열지 않으므로 직접 BEGIN (읽기 스냅샷 고정)
+            conn.exec_driver_sql("BEGIN")
+            try:
+                yield conn
+            finally:
+                conn.exec_driver_sql("ROLLBACK")
+            return
+        with conn.begin():
+            yield conn
+
+
+def _write_json(path: str, data: dict) -> None:
+    # 쓰다가 죽어도 이전 내용이 남도록 임시 파일 -> rename
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    os.replace(tmp, path)
+
+
+def _read_json(path: str) -> dict:
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+# --- 파일 형식 ---
+
+
+def _binary_columns(table) -> list[str]:
+    # NDJSON에는 bytes를 base64 문자열로 넣음
+    return [str(c.name) for c in table.columns if isinstance(c.type, LargeBinary)]
+
+
+def _write_part(path: str, fmt: str, rows: list[dict], binary: list[str] = ()) -> None:
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pq.write_table(pa.Table.from_pylist(rows), path, compression="zstd")
+        return
+    with gzip.open(path, "wb", compresslevel=TRANSFER_GZIP_LEVEL) as f:
+        for row in rows:
+            for name in binary:
+                row[name] = base64.b64encode(row[name]).decode()
+            f.write(orjson.dumps(row))
+            f.write(b"\n")
+
+
+def _read_part(path: str, fmt: str, batch_size: int):
+    """Yield lists of row dicts of at most `batch_size` rows."""
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield batch.to_pylist()
+        return
+    batch = []
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            batch.append(orjson.loads(line))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def _require_format(fmt: str) -> None:
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise SystemExit("--format parquet needs pyarrow (pip install pyarrow)")
+
+
+# --- 내보내기 ---
+
+
+def export(engine: Engine, directory: str, fmt: str = "ndjson", chunk_rows: int = TRANSFER_CHUNK_ROWS) -> dict:
+    """Dump every table into `directory`; return the manifest."""
+    _require_format(fmt)
+    os.makedirs(directory, exist_ok=True)
+    manifest = {
+        "format": fmt,
+        "revision": _revision(engine),
+        "created_at": datetime.utcnow().isoformat(),
+        "tables": {},
+    }
+    # 운영 중인 DB에서도 댓글/dream_tags가 덤프에 없는 꿈을 가리키지 않도록 모든 테이블을 한 스냅샷에서 읽음
+    with _snapshot(engine) as conn:
+        for table in TABLES:
+            _export_table(conn, table, directory, fmt, chunk_rows, manifest)
+    _write_json(os.path.join(directory, MANIFEST), manifest)
+    return manifest
+
+
+def _export_table(conn, table, directory: str, fmt: str, chunk_rows: int, manifest: dict) -> None:
+    started = time.perf_counter()
+    os.makedirs(os.path.join(directory, table.name), exist_ok=True)
+    # Table()로 정의한 dream_tags의 이름은 quoted_name(str 하위 클래스)이라 orjson 키로 못 씀
+    columns = [str(c.name) for c in table.columns]
+    pk = list(table.primary_key.columns)
+    parts = []
+    result = conn.execution_options(stream_results=True, yield_per=chunk_rows).execute(
+        select(table).order_by(*pk)
+    )
+    for rows in result.partitions():
+        name = f"part-{len(parts):05d}{EXTENSIONS[fmt]}"
+        records = [dict(zip(columns, r)) for r in rows]
+        _write_part(os.path.join(directory, table.name, name), fmt, records, _binary_columns(table))
+        parts.append(
+            {
+                "file": name,
+                "rows": len(records),
+                # PK 범위 (가져오기를 재시도할 때 이 파일의 행만 지우는 데 씀)
+                "first": [records[0][c.name] for c in pk],
+                "last": [records[-1][c.name] for c in pk],
+            }
+        )
+    manifest["tables"][str(table.name)] = {"columns": columns, "parts": parts}
+    logger.info(
+        "exported %s: %d row(s) in %d file(s), %.1fs",
+        table.name, sum(p["rows"] for p in parts), len(parts), time.perf_counter() - started,
+    )
+
+
+# --- 가져오기 ---
+
+
+def _converters(table) -> dict:
+    # NDJSON에는 datetime이 ISO 문자열, bytes가 base64로 들어 있음 (Parquet은 타입 그대로)
+    converters = {}
+    for c in table.columns:
+        if isinstance(c.type, DateTime):
+            converters[c.name] = datetime.fromisoformat
+        elif isinstance(c.type, LargeBinary):
+            converters[c.name] = base64.b64decode
+    return converters
+
+
+def _deferred_indexes(table) -> list:
+    # UNIQUE 인덱스는 적재 중에도 중복을 막도록 남겨둠
+    return [i for i in table.indexes if not i.unique]
+
+
+def _reset_sequence(conn, table) -> None:
+    if conn.dialect.name != "postgresql" or "id" not in table.columns:
+        return
+    conn.execute(
+        text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+        )
+    )
+
+
+def import_(
+    engine: Engine,
+    directory: str,
+    resume: bool = False,
+    batch_size: int = TRANSFER_INSERT_BATCH,
+    rebuild_cards: bool = True,
+) -> dict:
+    """Load a dump made by export(); return {table: rows inserted}."""
+    manifest_path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(manifest_path):
+        raise SystemExit(f"{manifest_path} not found (incomplete or missing export)")
+    manifest = _read_json(manifest_path)
+    fmt = manifest["format"]
+    _require_format(fmt)
+    revision = _revision(engine)
+    if revision is None:
+        raise SystemExit("target has no schema; run `alembic upgrade head` first")
+    if manifest["revision"] and manifest["revision"] != revision:
+        logger.warning("dump is from revision %s, target is at %s", manifest["revision"], revision)
+
+    state_path = os.path.join(directory, STATE)
+    state = {"done": {}}
+    if resume and os.path.exists(state_path):
+        state = _read_json(state_path)
+    elif not resume:
+        with engine.connect() as conn:
+            for table in TABLES:
+                if conn.execute(select(func.count()).select_from(table)).scalar():
+                    raise SystemExit(
+                        f"target table {table.name} is not empty (use --resume to continue an import)"
+                    )
+
+    if engine.dialect.name == "sqlite":
+        # 중단돼도 --resume으로 다시 적재할 수 있으므로 fsync를 줄임
+        @event.listens_for(engine, "connect")
+        def _pragma(dbapi_conn, record):
+            dbapi_conn.execute("PRAGMA synchronous = OFF")
+
+        engine.dispose()
+
+    inserted = {}
+    for table in TABLES:
+        table_name = str(table.name)
+        info = manifest["tables"].get(table_name)
+        if info is None:
+            continue
+        done = set(state["done"].get(table_name, []))
+        todo = [p for p in info["parts"] if p["file"] not in done]
+        inserted[table_name] = 0
+        if not todo:
+            continue
+        started = time.perf_counter()
+        deferred = _deferred_indexes(table)
+        with engine.begin() as conn:
+            for index in deferred:
+                index.drop(conn, checkfirst=True)
+
+        convert = _converters(table)
+        key = tuple_(*table.primary_key.columns)
+        for part in todo:
+            path = os.path.join(directory, table_name, part["file"])
+            with engine.begin() as conn:
+                # 하다 만 파일이면 이미 들어간 행을 지우고 처음부터 (재실행해도 결과가 같음)
+                conn.execute(
+                    delete(table).where(key >= tuple_(*part["first"]), key <= tuple_(*part["last"]))
+                )
+                for rows in _read_part(path, fmt, batch_size):
+                    for row in rows:
+                        for name, fn in convert.items():
+                            if isinstance(row.get(name), str):
+                                row[name] = fn(row[name])
+                    conn.execute(table.insert(), rows)
+            inserted[table_name] += part["rows"]
+            state["done"].setdefault(table_name, []).append(part["file"])
+            _write_json(state_path, state)
+
+        with engine.begin() as conn:
+            for index in deferred:
+                index.create(conn, checkfirst=True)
+            _reset_sequence(conn, table)
+        logger.info(
+            "imported %s: %d row(s) in %.1fs",
+            table_name, inserted[table_name], time.perf_counter() - started,
+        )
+
+    if rebuild_cards:
+        started = time.perf_counter()
+        with base.session_scope(sessionmaker(bind=engine)) as db:
+            cards = DreamCardRepository(db).rebuild_all()
+        logger.info("rebuilt %d dream card(s) in %.1fs", cards, time.perf_counter() - started)
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    return inserted
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Export or import the whole dataset")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="dump tables into a directory")
+    exp.add_argument("directory")
+    exp.add_argument("--database-url", help="source (default: DATABASE_URL)")
+    exp.add_argument("--format", choices=sorted(EXTENSIONS), default="ndjson")
+    exp.add_argument("--chunk-rows", type=int, default=TRANSFER_CHUNK_ROWS)
+    imp = sub.add_parser("import", help="load a dump into a migrated, empty database")
+    imp.add_argument("directory")
+    imp.add_argument("--database-url", help="target (default: DATABASE_URL)")
+    imp.add_argument("--resume", action="store_true", help="continue an interrupted import")
+    imp.add_argument("--batch-size", type=int, default=TRANSFER_INSERT_BATCH)
+    imp.add_argument(
+        "--no-rebuild-cards",
+        dest="rebuild_cards",
+        action="store_false",
+        help="skip rebuilding dream_cards and the search index after the load",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+    engine = get_engine(args.database_url)
+    started = time.perf_counter()
+    if args.command == "export":
+        manifest = export(engine, args.directory, args.format, args.chunk_rows)
+        total = sum(p["rows"] for t in manifest["tables"].values() for p in t["parts"])
+    else:
+        total = sum(
+            import_(engine, args.directory, args.resume, args.batch_size, args.rebuild_cards).values()
+        )
+    logger.info("%s finished: %d row(s) in %.1fs", args.command, total, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,9 @@
 from app.db.base import SessionLocal
 from sqlalchemy.orm import Session
-from fastapi import Depends, Request, Response, HTTPException
+from fastapi import Depends, Header, Request, Response, HTTPException
 from app.db.repository import UserRepository
+from app.core.ratelimit import RateLimited, rate_limiter, llm_concurrency
+from app.core.idempotency import IdempotencyError, idempotency, scoped_key
 from app.core.jwt import (
     verify_jwt,
     rotate_refresh,
@@ -11,6 +13,9 @@ from app.core.jwt import (
     set_auth_cookies,
 )
 import jwt
+import logging
+
+logger = logging.getLogger("dreamscope.auth")
 
 
 def get_db():
@@ -52,21 +57,16 @@ def get_current_user(
                 raise HTTPException(status_code=401, detail="Not authenticated")
             return user
         except jwt.ExpiredSignatureError:
-            import traceback
-            traceback.print_exc()
             # fall through to refresh
-            pass
-        except jwt.InvalidTokenError:
-            import traceback
-            traceback.print_exc()
+            logger.debug("access token expired")
+        except jwt.InvalidTokenError as e:
             # fall through to refresh if available
-            pass
+            logger.debug("invalid access token: %s", e)
 
     # 2) Try refresh token
     if refresh_token:
         try:
             payload = verify_jwt(refresh_token)
-            print("refresh token payload: ", payload)
             if payload.get("type") != "refresh":
                 raise HTTPException(status_code=401, detail="Invalid refresh token")
             sub = payload.get("sub")
@@ -76,6 +76,7 @@ def get_current_user(
             if not user:
                 raise HTTPException(status_code=401, detail="User not found")
             # rotate tokens (re-issue without re-decoding again)
+            logger.debug("rotating tokens for user %s", user.id)
             new_access, new_refresh = issue_tokens(user)
             set_auth_cookies(response, new_access, new_refresh)
             return user
@@ -85,3 +86,63 @@ def get_current_user(
             raise HTTPException(status_code=401, detail="Invalid refresh token")
 
     raise HTTPException(status_code=401, detail="Not authenticated")
+
+
+
+def idempotency_key(
+    request: Request,
+    current_user=Depends(get_current_user),
+    key: str | None = Header(default=None, alias="Idempotency-Key"),
+) -> str | None:
+    """Client Idempotency-Key scoped to the current user and route, if sent."""
+    if not key:
+        return None
+    try:
+        return scoped_key(current_user.id, f"{request.method} {request.url.path}", key)
+    except IdempotencyError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+def run_idempotent(key: str | None, fn, fingerprint: str = ""):
+    """Run a write handler once per Idempotency-Key and replay its stored result.
+
+    `fn` must return a JSON-compatible value so the result can be stored.
+    """
+    if key is None:
+        return fn()
+    try:
+        return idempotency.run(key, fn, fingerprint=fingerprint)
+    except IdempotencyError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+def llm_admission(
+    current_user=Depends(get_current_user),
+    idem_key: str | None = Depends(idempotency_key),
+):
+    """Admission control for LLM-backed endpoints.
+
+    - Applies per-user and global token buckets.
+    - Holds one of the limited dream_graph slots for the duration of the request.
+    - Rejections become 429 with a Retry-After header.
+    - Retries whose Idempotency-Key already has a stored result are replayed
+      without the LLM, so they skip it. Duplicates of a request that is still
+      running are admitted like any other request: if the original fails, the
+      duplicate runs the graph itself.
+    """
+    if idem_key is not None and idempotency.has_result(idem_key):
+        yield
+        return
+    try:
+        rate_limiter.check(current_user.id)
+        llm_concurrency.acquire()
+    except RateLimited as e:
+        raise HTTPException(
+            status_code=429,
+            detail=e.detail,
+            headers={"Retry-After": e.retry_after_header},
+        )
+    try:
+        yield
+    finally:
+        llm_concurrency.release()
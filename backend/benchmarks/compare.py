@@ -0,0 +1,75 @@
+"""
+두 벤치마크 결과 파일 비교 (커밋 간 회귀 확인)
+- 케이스마다 p50/p95/p99와 처리량의 변화율을 출력
+- --threshold(기본 10%)보다 p95가 느려졌거나 처리량이 줄어든 케이스를 REGRESSION으로 표시
+- --fail-on-regression이면 회귀가 있을 때 종료 코드 1 (CI용)
+
+    cd backend && python -m benchmarks.compare benchmarks/results/load-abc1234.json benchmarks/results/load-def5678.json
+    cd backend && python -m benchmarks.compare --latest repositories
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+from benchmarks.results import RESULTS_DIR, load
+
+
+def latest_pair(name: str) -> tuple[str, str]:
+    paths = sorted(glob.glob(os.path.join(RESULTS_DIR, f"{name}-*.json")), key=os.path.getmtime)
+    if len(paths) < 2:
+        raise SystemExit(f"need two {name} results in {RESULTS_DIR}, found {len(paths)}")
+    return paths[-2], paths[-1]
+
+
+def _change(old: float, new: float) -> float:
+    return (new - old) / old * 100 if old else 0.0
+
+
+def compare(old: dict, new: dict, threshold: float) -> list[str]:
+    """Print a diff table and return the names of regressed cases."""
+    if old.get("config") != new.get("config"):
+        print(f"warning: configs differ\n  old: {old.get('config')}\n  new: {new.get('config')}")
+    print(f"{old['revision']} -> {new['revision']} ({old['benchmark']})")
+    cases = [k for k in new["results"] if k in old["results"]]
+    width = max([len(k) for k in cases] + [10])
+    print(f"{'case':<{width}} {'p50':>8} {'p95':>8} {'p99':>8} {'thru':>8}")
+    regressed = []
+    for key in cases:
+        o, n = old["results"][key], new["results"][key]
+        deltas = [_change(o[m], n[m]) for m in ("p50_ms", "p95_ms", "p99_ms", "throughput")]
+        flag = deltas[1] > threshold or -deltas[3] > threshold or n["errors"] > o["errors"]
+        if flag:
+            regressed.append(key)
+        print(
+            f"{key:<{width}} " + " ".join(f"{d:>+7.1f}%" for d in deltas)
+            + ("  REGRESSION" if flag else "")
+        )
+    for key in sorted(set(old["results"]) ^ set(new["results"])):
+        print(f"{key:<{width}} only in {'old' if key in old['results'] else 'new'}")
+    return regressed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="*", metavar="RESULT", help="old and new result files")
+    parser.add_argument("--latest", metavar="NAME", help="compare the two newest NAME results")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.latest:
+        old_path, new_path = latest_pair(args.latest)
+    elif len(args.paths) == 2:
+        old_path, new_path = args.paths
+    else:
+        parser.error("pass two result files or --latest NAME")
+    regressed = compare(load(old_path), load(new_path), args.threshold)
+    if regressed:
+        print(f"{len(regressed)} regression(s) over {args.threshold:.0f}%: {', '.join(regressed)}")
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
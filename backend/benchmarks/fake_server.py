@@ -0,0 +1,63 @@
+"""
+가짜 LLM으로 띄우는 벤치마크용 서버
+- serve.py와 같은 진입점이지만 fork 전에 채팅 모델을 고정 응답 모델로 바꿈
+  (BENCH_LLM_LATENCY_MS만큼 대기해 실제 모델 지연을 흉내)
+- 부하 테스트가 레이트 리밋에 걸리지 않도록 한도를 크게 잡음 (환경변수로 지정하면 그 값 사용)
+
+    cd backend && python -m benchmarks.fake_server --workers 2 --port 8765
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+for _key in ("RATE_LIMIT_USER_BURST", "RATE_LIMIT_GLOBAL_BURST"):
+    os.environ.setdefault(_key, "1000000")
+for _key in ("RATE_LIMIT_USER_PER_MIN", "RATE_LIMIT_GLOBAL_PER_MIN"):
+    os.environ.setdefault(_key, "60000000")
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+BENCH_LLM_LATENCY_MS = float(os.getenv("BENCH_LLM_LATENCY_MS", "0"))
+BENCH_LLM_TAGS = int(os.getenv("BENCH_LLM_TAGS", "300"))
+
+
+def fake_chat_model():
+    from langchain_core.messages import AIMessage
+    from langchain_core.runnables import RunnableLambda
+
+    from benchmarks.synthetic import tag_names, zipf_weights
+
+    names = tag_names(BENCH_LLM_TAGS)
+    weights = list(zipf_weights(len(names), 1.1))
+
+    def respond(prompt):
+        if BENCH_LLM_LATENCY_MS:
+            time.sleep(BENCH_LLM_LATENCY_MS / 1000)
+        picked = set(random.choices(names, weights=weights, k=3))
+        content = json.dumps(
+            {
+                "summary": f"A dream about {' and '.join(sorted(picked))}.",
+                "analysis": "Benchmark analysis. " * 20,
+                "tags": [{"name": n, "description": f"{n} meaning"} for n in sorted(picked)],
+            }
+        )
+        return AIMessage(
+            content=content,
+            usage_metadata={"input_tokens": 800, "output_tokens": 200, "total_tokens": 1000},
+        )
+
+    return RunnableLambda(respond)
+
+
+def main(argv=None) -> None:
+    import serve
+    from app.core.llm import set_llm
+
+    set_llm(fake_chat_model())
+    serve.main(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
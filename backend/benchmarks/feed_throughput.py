@@ -0,0 +1,121 @@
+"""
+워커 수별 피드(GET /dreams) 처리량 벤치마크
+- 임시 SQLite DB에 가짜 데이터를 채운 뒤 serve.py를 워커 수를 바꿔가며 띄우고
+  여러 클라이언트 프로세스가 피드 페이지를 반복 요청
+  (h11은 헤더/본문을 나눠 써서 keep-alive 연결에서는 delayed ACK로 ~40ms가 더해지므로
+  요청마다 새 연결을 사용)
+- 워커 수마다 초당 요청 수와 p50/p99 지연을 출력
+
+    cd backend && python -m benchmarks.feed_throughput --workers 1,2,4 --duration 10
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import seed
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_for_port(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not start on port {port}")
+
+
+def client(args) -> list[float]:
+    port, duration, pages = args
+    rng = random.Random(os.getpid())
+    latencies: list[float] = []
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        t0 = time.perf_counter()
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        conn.request("GET", f"/dreams/?page={rng.randint(1, pages)}&limit=10")
+        resp = conn.getresponse()
+        resp.read()
+        conn.close()
+        if resp.status != 200:
+            raise RuntimeError(f"unexpected status {resp.status}")
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def run_case(workers: int, port: int, database_url: str, args) -> dict:
+    env = dict(os.environ, DATABASE_URL=database_url)
+    server = subprocess.Popen(
+        [
+            sys.executable, "serve.py",
+            "--workers", str(workers),
+            "--port", str(port),
+            "--host", "127.0.0.1",
+            "--loop", args.loop,
+            "--http", args.http,
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(port)
+        client((port, 1.0, 10))  # warm-up
+        with multiprocessing.Pool(args.clients) as pool:
+            results = pool.map(
+                client, [(port, args.duration, args.pages)] * args.clients
+            )
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+    latencies = sorted(l for r in results for l in r)
+    q = statistics.quantiles(latencies, n=100)
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "rps": len(latencies) / args.duration,
+        "p50_ms": q[49] * 1000,
+        "p99_ms": q[98] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--dreams", type=int, default=2000)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--loop", default="auto")
+    parser.add_argument("--http", default="auto")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(database_url, users=50, dreams=args.dreams, tags=100)
+        print(f"{'workers':>8}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for w in (int(x) for x in args.workers.split(",")):
+            r = run_case(w, args.port, database_url, args)
+            print(
+                f"{r['workers']:>8}{r['requests']:>10}{r['rps']:>10.1f}"
+                f"{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
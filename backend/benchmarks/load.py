@@ -0,0 +1,198 @@
+"""
+HTTP 부하 테스트 (라우트별 p50/p95/p99 지연과 처리량)
+- 합성 데이터(benchmarks.synthetic)를 채운 임시 DB로 가짜 LLM 서버(benchmarks.fake_server)를 띄우고
+  라우트마다 --duration초 동안 --clients개 클라이언트 프로세스가 반복 요청
+- 경로 인자(꿈 id, 태그, 검색어, 페이지)는 Zipf 분포로 뽑음
+- 로그인이 필요한 라우트(꿈 작성, 댓글)는 시드 사용자 1의 access 쿠키로 요청
+- 요청마다 새 연결 사용 (feed_throughput 참고: keep-alive + delayed ACK 지연 회피)
+- 결과는 benchmarks/results/load-<커밋>.json 에 저장 (benchmarks.compare로 비교)
+
+    cd backend && python -m benchmarks.load --workers 2 --clients 4 --duration 5
+    cd backend && python -m benchmarks.load --routes feed,detail --database-url postgresql://localhost/bench
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.feed_throughput import wait_for_port
+from benchmarks.results import print_table, save, summarize
+from benchmarks.synthetic import WORDS, seed, tag_names, zipf_weights
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Paths:
+    """Random request targets with the same skew as the synthetic data."""
+
+    def __init__(self, rng: random.Random, dreams: int, tags: int):
+        self.rng = rng
+        self.dreams = dreams
+        self.names = tag_names(tags)
+        self.weights = list(zipf_weights(tags, 1.1))
+
+    def dream(self) -> int:
+        # 최근 글일수록 자주 열람
+        return max(1, self.dreams - int(self.rng.paretovariate(1.3)) + 1)
+
+    def tag(self) -> str:
+        return self.rng.choices(self.names, weights=self.weights)[0]
+
+    def page(self) -> int:
+        return min(50, int(self.rng.paretovariate(1.5)))
+
+
+# 이름 -> (메서드, 경로 생성, 본문 생성)
+ROUTES = {
+    "feed": ("GET", lambda p: f"/dreams/?page={p.page()}&limit=10", None),
+    "feed_tag": ("GET", lambda p: f"/dreams/?tags={p.tag()}&page={p.page()}&limit=10", None),
+    "feed_all_exclude": (
+        "GET",
+        lambda p: f"/dreams/?tags={p.tag()},{p.tag()}&match=all&exclude={p.tag()}",
+        None,
+    ),
+    "feed_discussed": ("GET", lambda p: f"/dreams/?sort=discussed&page={p.page()}", None),
+    "detail": ("GET", lambda p: f"/dreams/{p.dream()}", None),
+    "comments": ("GET", lambda p: f"/dreams/{p.dream()}/comments", None),
+    "related": ("GET", lambda p: f"/dreams/{p.dream()}/related", None),
+    "search": ("GET", lambda p: f"/search/?q={p.rng.choice(WORDS)}", None),
+    "tags": ("GET", lambda p: "/tags/", None),
+    "tags_meta": ("GET", lambda p: "/tags/meta", None),
+    "trending": ("GET", lambda p: "/tags/trending?window=24h", None),
+    "related_tags": ("GET", lambda p: f"/tags/{p.tag()}/related", None),
+    "comment_create": (
+        "POST",
+        lambda p: f"/dreams/{p.dream()}/comments",
+        lambda p: {"content": "load test comment"},
+    ),
+    "dream_create": (
+        "POST",
+        lambda p: "/dreams/",
+        lambda p: {"content": " ".join(p.rng.choices(WORDS, k=40))},
+    ),
+}
+
+
+def client(args) -> tuple[list[float], int]:
+    port, route, duration, cookie, dreams, tags = args
+    method, make_path, make_body = ROUTES[route]
+    paths = Paths(random.Random(os.getpid()), dreams, tags)
+    headers = {"Cookie": cookie}
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        path = make_path(paths)
+        body = None
+        if make_body is not None:
+            body = json.dumps(make_body(paths))
+            headers["Content-Type"] = "application/json"
+        t0 = time.perf_counter()
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        conn.request(method, path, body=body, headers=headers)
+        resp = conn.getresponse()
+        resp.read()
+        conn.close()
+        elapsed = time.perf_counter() - t0
+        if resp.status >= 400:
+            errors += 1
+        else:
+            latencies.append(elapsed)
+    return latencies, errors
+
+
+def auth_cookie() -> str:
+    sys.path.insert(0, BACKEND_DIR)
+    from app.core.jwt import ACCESS_COOKIE_NAME, issue_tokens
+
+    class SeedUser:
+        id = 1
+
+    access, _ = issue_tokens(SeedUser)
+    return f"{ACCESS_COOKIE_NAME}={access}"
+
+
+def run_route(route: str, args, cookie: str) -> dict:
+    job = (args.port, route, args.duration, cookie, args.dreams, args.tags)
+    client((args.port, route, min(1.0, args.duration), cookie, args.dreams, args.tags))  # warm-up
+    started = time.perf_counter()
+    with multiprocessing.Pool(args.clients) as pool:
+        results = pool.map(client, [job] * args.clients)
+    elapsed = time.perf_counter() - started
+    latencies = [l for r, _ in results for l in r]
+    return summarize(latencies, seconds=elapsed, errors=sum(e for _, e in results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--routes", default=",".join(ROUTES), help="comma separated route names")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5, help="seconds per route")
+    parser.add_argument("--database-url", help="default: a temporary SQLite file")
+    parser.add_argument("--no-seed", action="store_true", help="reuse an already seeded database")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--dreams", type=int, default=5000)
+    parser.add_argument("--tags", type=int, default=300)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="result path (default: benchmarks/results/)")
+    args = parser.parse_args()
+    routes = [r for r in args.routes.split(",") if r]
+    unknown = set(routes) - set(ROUTES)
+    if unknown:
+        parser.error(f"unknown route(s): {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        if not args.no_seed:
+            info = seed(database_url, users=args.users, dreams=args.dreams, tags=args.tags)
+            print(f"seeded {info['dreams']} dreams, {info['comments']} comments in {info['seconds']}s")
+
+        env = dict(os.environ, DATABASE_URL=database_url, BENCH_LLM_TAGS=str(args.tags))
+        server = subprocess.Popen(
+            [
+                sys.executable, "-m", "benchmarks.fake_server",
+                "--workers", str(args.workers),
+                "--port", str(args.port),
+                "--host", "127.0.0.1",
+            ],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_port(args.port)
+            cookie = auth_cookie()
+            results = {}
+            for route in routes:
+                results[route] = run_route(route, args, cookie)
+                r = results[route]
+                print(f"  {route}: {r['throughput']:.1f} req/s, p99 {r['p99_ms']:.1f} ms")
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+
+    print_table(results, unit="req/s")
+    config = {
+        "dialect": database_url.split(":", 1)[0],
+        "workers": args.workers,
+        "clients": args.clients,
+        "duration": args.duration,
+        "users": args.users,
+        "dreams": args.dreams,
+        "tags": args.tags,
+    }
+    print(f"saved {save('load', config, results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+저장소(repository) 메서드 마이크로 벤치마크
+- 합성 데이터(benchmarks.synthetic)를 채운 DB에서 DreamRepository / DreamCardRepository /
+  TagRepository / CommentRepository 메서드를 하나씩 반복 호출해 호출당 p50/p95/p99와 초당 호출 수를 측정
+- 인자는 매 호출 Zipf 분포로 뽑음 (인기 태그/최근 페이지가 더 자주 조회되는 실제 패턴)
+- 호출마다 세션의 identity map을 비워 ORM 캐시가 결과를 부풀리지 않게 함
+- 쓰기 케이스(create+delete)는 커밋까지 포함
+- 결과는 benchmarks/results/repositories-<커밋>.json 에 저장 (benchmarks.compare로 비교)
+
+    cd backend && python -m benchmarks.repositories --dreams 20000 --seconds 1
+    cd backend && python -m benchmarks.repositories --database-url postgresql://localhost/bench --no-seed
+"""
+
+import argparse
+import os
+import re
+import tempfile
+import time
+from typing import Callable
+
+import numpy as np
+
+from benchmarks.results import print_table, save, summarize
+from benchmarks.synthetic import WORDS, seed, tag_names, zipf_weights
+
+Case = Callable[[object, np.random.Generator], object]
+
+
+def build_cases(info: dict) -> dict[str, Case]:
+    from app.db.models import Comment, Dream
+    from app.db.repository import (
+        CommentRepository,
+        DreamCardRepository,
+        DreamRepository,
+        TagRepository,
+    )
+
+    dreams, users = info["dreams"], info["users"]
+    names = tag_names(info["tags"])
+    tag_p = zipf_weights(len(names), 1.1)
+    user_p = zipf_weights(users, 1.1)
+
+    def dream_id(rng):
+        # 최근 글일수록 자주 열람
+        return int(dreams - min(dreams - 1, rng.zipf(1.3) - 1))
+
+    def user_id(rng):
+        return int(rng.choice(users, p=user_p)) + 1
+
+    def tags(rng, n=1):
+        return [names[i] for i in rng.choice(len(names), size=n, replace=False, p=tag_p)]
+
+    def page(rng):
+        return int(min(50, rng.zipf(1.5)))
+
+    def word(rng):
+        return str(rng.choice(WORDS))
+
+    def comment_create_delete(s, rng):
+        repo = CommentRepository(s)
+        comment = repo.create(
+            Comment(dream_id=dream_id(rng), user_id=user_id(rng), content="benchmark comment")
+        )
+        repo.delete(comment)
+
+    def dream_create_delete(s, rng):
+        tag_repo = TagRepository(s)
+        dream = Dream(
+            user_id=user_id(rng),
+            content="benchmark dream",
+            summary="benchmark",
+            analysis="benchmark",
+            tags=[tag_repo.get_by_name(n) for n in tags(rng, 2)],
+        )
+        repo = DreamRepository(s)
+        repo.delete(repo.create(dream))
+
+    return {
+        "dream.get": lambda s, rng: DreamRepository(s).get(dream_id(rng)),
+        "dream.get_recent_for_user": lambda s, rng: DreamRepository(s).get_recent_for_user(user_id(rng)),
+        "dream.count_all": lambda s, rng: DreamRepository(s).count_all(),
+        "dream.get_page": lambda s, rng: DreamRepository(s).get_page(page(rng), 10),
+        "dream.search_like_page": lambda s, rng: DreamRepository(s).search_like_page(word(rng), 1, 10),
+        "dream.count_like": lambda s, rng: DreamRepository(s).count_like(word(rng)),
+        "dream.count_advanced[any]": lambda s, rng: DreamRepository(s).count_advanced(tags(rng, 2)),
+        "dream.count_advanced[all]": lambda s, rng: DreamRepository(s).count_advanced(tags(rng, 2), "all"),
+        "dream.search_advanced_page": lambda s, rng: DreamRepository(s).search_advanced_page(tags(rng), page(rng), 10),
+        "dream.create+delete": dream_create_delete,
+        "card.get": lambda s, rng: DreamCardRepository(s).get(dream_id(rng)),
+        "card.get_many": lambda s, rng: DreamCardRepository(s).get_many([dream_id(rng) for _ in range(10)]),
+        "card.get_page[recent]": lambda s, rng: DreamCardRepository(s).get_page(None, page(rng), 10),
+        "card.get_page[discussed]": lambda s, rng: DreamCardRepository(s).get_page(None, page(rng), 10, "discussed"),
+        "card.get_page[active]": lambda s, rng: DreamCardRepository(s).get_page(None, page(rng), 10, "active"),
+        "card.get_page[tag]": lambda s, rng: DreamCardRepository(s).get_page(tags(rng), page(rng), 10),
+        "card.get_page[all+exclude]": lambda s, rng: DreamCardRepository(s).get_page(
+            tags(rng, 2), 1, 10, match="all", exclude=tags(rng)
+        ),
+        "card.get_page_rows": lambda s, rng: DreamCardRepository(s).get_page_rows(None, page(rng), 10),
+        "card.search_rows": lambda s, rng: DreamCardRepository(s).search_rows(word(rng), 50),
+        "tag.get_by_name": lambda s, rng: TagRepository(s).get_by_name(tags(rng)[0]),
+        "tag.get_by_names": lambda s, rng: TagRepository(s).get_by_names(tags(rng, 3)),
+        "tag.get_all": lambda s, rng: TagRepository(s).get_all(),
+        "tag.get_names": lambda s, rng: TagRepository(s).get_names(),
+        "tag.get_for_dream": lambda s, rng: TagRepository(s).get_for_dream(dream_id(rng)),
+        "tag.resolve": lambda s, rng: TagRepository(s).resolve(tags(rng)[0].upper()),
+        "tag.resolve[fuzzy]": lambda s, rng: TagRepository(s).resolve(tags(rng)[0] + "x", fuzzy=True),
+        "comment.get_for_dream": lambda s, rng: CommentRepository(s).get_for_dream(dream_id(rng)),
+        "comment.get_rows_for_dream": lambda s, rng: CommentRepository(s).get_rows_for_dream(dream_id(rng)),
+        "comment.create+delete": comment_create_delete,
+    }
+
+
+def run_case(session_factory, case: Case, seconds: float, max_calls: int, rng) -> dict:
+    session = session_factory()
+    try:
+        for _ in range(3):  # warm-up (statement cache, page cache)
+            case(session, rng)
+            session.expunge_all()
+        latencies: list[float] = []
+        started = time.perf_counter()
+        while len(latencies) < max_calls and time.perf_counter() - started < seconds:
+            t0 = time.perf_counter()
+            result = case(session, rng)
+            if isinstance(result, list):
+                len(result)
+            latencies.append(time.perf_counter() - t0)
+            session.expunge_all()
+        session.rollback()
+    finally:
+        session.close()
+    return summarize(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", help="default: a temporary SQLite file")
+    parser.add_argument("--no-seed", action="store_true", help="reuse an already seeded database")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--dreams", type=int, default=5000)
+    parser.add_argument("--tags", type=int, default=300)
+    parser.add_argument("--seconds", type=float, default=1.0, help="time budget per method")
+    parser.add_argument("--max-calls", type=int, default=5000)
+    parser.add_argument("--filter", help="regex on case names")
+    parser.add_argument("--output", help="result path (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        info = {"users": args.users, "dreams": args.dreams, "tags": args.tags}
+        if not args.no_seed:
+            info = seed(database_url, users=args.users, dreams=args.dreams, tags=args.tags)
+            print(f"seeded {info['dreams']} dreams, {info['comments']} comments in {info['seconds']}s")
+
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        engine = create_engine(database_url)
+        session_factory = sessionmaker(bind=engine)
+        cases = build_cases(info)
+        if args.filter:
+            cases = {k: v for k, v in cases.items() if re.search(args.filter, k)}
+
+        rng = np.random.default_rng(7)
+        results = {
+            name: run_case(session_factory, case, args.seconds, args.max_calls, rng)
+            for name, case in cases.items()
+        }
+        engine.dispose()
+
+    print_table(results, unit="calls/s")
+    config = {
+        "dialect": database_url.split(":", 1)[0],
+        "users": info["users"],
+        "dreams": info["dreams"],
+        "tags": info["tags"],
+        "seconds": args.seconds,
+    }
+    print(f"saved {save('repositories', config, results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+벤치마크 결과 저장 / 비교 공용 함수
+- 지연 샘플 -> p50/p95/p99(ms), 처리량 요약
+- 결과는 benchmarks/results/<이름>-<커밋>.json 에 저장 (커밋 안 된 변경이 있으면 -dirty)
+  같은 이름의 두 파일을 benchmarks.compare로 비교해 커밋 간 회귀를 확인
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def summarize(latencies: list[float], seconds: float | None = None, errors: int = 0) -> dict:
+    """Percentiles in ms for per-call latencies given in seconds."""
+    ordered = sorted(latencies)
+    if len(ordered) >= 2:
+        q = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p95, p99 = q[49], q[94], q[98]
+    else:
+        p50 = p95 = p99 = ordered[0] if ordered else 0.0
+    total = seconds if seconds is not None else sum(ordered)
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "p50_ms": round(p50 * 1000, 4),
+        "p95_ms": round(p95 * 1000, 4),
+        "p99_ms": round(p99 * 1000, 4),
+        "throughput": round(len(ordered) / total, 2) if total else 0.0,
+    }
+
+
+def git_revision() -> str:
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{sha}-dirty" if dirty else sha
+
+
+def save(name: str, config: dict, results: dict[str, dict], path: str | None = None) -> str:
+    revision = git_revision()
+    path = path or os.path.join(RESULTS_DIR, f"{name}-{revision}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    payload = {
+        "benchmark": name,
+        "revision": revision,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": config,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    return path
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def print_table(results: dict[str, dict], unit: str = "ops/s") -> None:
+    width = max([len(k) for k in results] + [10])
+    print(f"{'case':<{width}} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {unit:>9} {'err':>4}")
+    for key, r in results.items():
+        print(
+            f"{key:<{width}} {r['count']:>7} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f}"
+            f" {r['p99_ms']:>9.3f} {r['throughput']:>9.1f} {r['errors']:>4}"
+        )
@@ -0,0 +1,98 @@
+"""
+피드 응답 직렬화 비용 측정 (항목당 µs)
+- before: DreamCard -> pydantic Dream/Tag 모델 -> response_model 재검증 -> JSONResponse(json.dumps)
+  (FastAPI가 response_model이 있는 라우트에서 하는 일을 그대로 재현)
+- after: dream_cards 행 -> dict -> ORJSONResponse(orjson.dumps)
+- 페이지 크기 10 / 100 / 1000, 태그 3개짜리 합성 카드 사용 (DB 조회 비용 제외)
+
+    cd backend && python -m benchmarks.serialization [--sizes 10,100,1000] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.api.schema import DreamListResponse  # noqa: E402
+from app.api.serializers import card_dicts, serialize_cards  # noqa: E402
+from app.db.models import DreamCard  # noqa: E402
+
+RESPONSE_ADAPTER = TypeAdapter(DreamListResponse)
+
+
+def make_cards(n: int) -> list[DreamCard]:
+    now = datetime(2026, 10, 19, 12, 0, 0)
+    return [
+        DreamCard(
+            dream_id=i,
+            user_id=1 + i % 50,
+            content="I was falling from a tall building while my family watched. " * 4,
+            summary="A falling dream with family watching from below.",
+            analysis="Falling dreams often point to a loss of control. " * 6,
+            created_at=now - timedelta(minutes=i),
+            author_name="Dream Writer",
+            author_avatar_url="https://example.com/avatar.png",
+            tags=[
+                {"name": "falling", "description": "Loss of control or letting go."},
+                {"name": "family", "description": "Home, support and belonging."},
+                {"name": "building", "description": "Ambition and structure."},
+            ],
+            comment_count=i % 7,
+            reply_count=i % 3,
+            last_activity_at=now - timedelta(minutes=i // 2),
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def before(cards: list[DreamCard]) -> bytes:
+    model = DreamListResponse(dreams=serialize_cards(cards), selected_tags=None)
+    validated = RESPONSE_ADAPTER.validate_python(model, from_attributes=True)
+    return JSONResponse(RESPONSE_ADAPTER.dump_python(validated, mode="json")).body
+
+
+def after(cards: list[DreamCard]) -> bytes:
+    return ORJSONResponse({"dreams": card_dicts(cards), "selected_tags": None}).body
+
+
+def per_item_us(fn, cards, min_seconds: float = 0.5) -> float:
+    fn(cards)  # warm-up
+    loops = 0
+    started = time.perf_counter()
+    while True:
+        fn(cards)
+        loops += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / loops / len(cards) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,100,1000")
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'page':>6} {'before µs/item':>15} {'after µs/item':>14} {'speedup':>8}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        cards = make_cards(size)
+        assert json.loads(before(cards)) == json.loads(after(cards))
+        b = per_item_us(before, cards)
+        a = per_item_us(after, cards)
+        results.append({"page_size": size, "before_us": b, "after_us": a})
+        print(f"{size:>6} {b:>15.2f} {a:>14.2f} {b / a:>7.1f}x")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+앱 프로필별 기동 비용 측정
+- 각 프로필(full / readonly)을 새 프로세스에서 임포트해 import 시간과 RSS를 기록
+- --with-graph: full 프로필에서 dream_graph를 실제로 만든 뒤의 비용도 함께 측정
+
+    cd backend && python -m benchmarks.startup --runs 5 [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = r"""
+import json, resource, time
+t0 = time.perf_counter()
+import main
+import_s = time.perf_counter() - t0
+graph_s = None
+if {with_graph}:
+    from app.core.pipeline import get_dream_graph
+    t1 = time.perf_counter()
+    get_dream_graph()
+    graph_s = time.perf_counter() - t1
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+print(json.dumps({{"import_s": import_s, "graph_s": graph_s, "rss_mb": rss_mb(),
+                  "routes": len(main.app.routes)}}))
+"""
+
+
+def probe(profile: str, with_graph: bool) -> dict:
+    env = dict(os.environ, APP_PROFILE=profile)
+    env.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(with_graph=with_graph)],
+        cwd=backend_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--with-graph", action="store_true")
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    cases = [("full", False), ("readonly", False)]
+    if args.with_graph:
+        cases.append(("full", True))
+
+    results = []
+    for profile, with_graph in cases:
+        samples = [probe(profile, with_graph) for _ in range(args.runs)]
+        row = {
+            "profile": profile + ("+graph" if with_graph else ""),
+            "import_ms": statistics.median(s["import_s"] for s in samples) * 1000,
+            "rss_mb": statistics.median(s["rss_mb"] for s in samples),
+            "routes": samples[0]["routes"],
+        }
+        if with_graph:
+            row["graph_ms"] = statistics.median(s["graph_s"] for s in samples) * 1000
+        results.append(row)
+
+    print(f"{'profile':<16}{'import ms':>12}{'graph ms':>12}{'RSS MB':>10}{'routes':>8}")
+    for r in results:
+        graph = f"{r['graph_ms']:.1f}" if "graph_ms" in r else "-"
+        print(
+            f"{r['profile']:<16}{r['import_ms']:>12.1f}{graph:>12}"
+            f"{r['rss_mb']:>10.1f}{r['routes']:>8}"
+        )
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
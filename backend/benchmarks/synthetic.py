@@ -0,0 +1,211 @@
+"""
+벤치마크용 합성 데이터 생성기
+- 사용자 / 꿈 / 태그 / 댓글 스레드를 실제 분포에 가깝게 생성
+  - 태그 인기도와 사용자 활동량은 Zipf 분포 (소수의 태그/사용자가 대부분을 차지)
+  - 꿈마다 태그 1~4개, 댓글 수는 꼬리가 긴 분포, 일부는 대댓글
+  - 작성 시각은 최근 DAYS일에 고르게 분포
+- 카운터(comment_count 등)와 피드 카드(dream_cards)까지 앱이 쓰는 것과 같은 상태로 채움
+- SQLite 파일 또는 로컬 Postgres URL 모두 사용 가능 (스키마는 create_all)
+
+    cd backend && python -m benchmarks.synthetic --database-url sqlite:///benchmarks/results/bench.db --dreams 20000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORDS = (
+    "house water school car night door forest sea mother father friend dog cat "
+    "road stairs window city train teacher baby fire sky rain mountain bridge "
+    "phone exam wedding money hospital elevator ocean river snake bird flying "
+    "running lost late chased dark light old new strange familiar empty crowded"
+).split()
+TAG_SEEDS = (
+    "falling flying chase teeth exam water family death ex-partner snake house "
+    "school driving lost naked late pregnancy wedding fire ocean baby dog cat "
+    "money celebrity war zombie elevator stairs train"
+).split()
+DAYS = 30
+BATCH = 2000
+
+
+def zipf_weights(n: int, s: float) -> np.ndarray:
+    w = 1.0 / np.arange(1, n + 1) ** s
+    return w / w.sum()
+
+
+def tag_names(n: int) -> list[str]:
+    names = list(TAG_SEEDS[:n])
+    i = 0
+    while len(names) < n:
+        names.append(f"{TAG_SEEDS[i % len(TAG_SEEDS)]}-{i // len(TAG_SEEDS) + 1}")
+        i += 1
+    return names
+
+
+def _text(rng: np.random.Generator, words: int, extra: list[str]) -> str:
+    picked = list(rng.choice(WORDS, size=words)) + extra
+    rng.shuffle(picked)
+    return " ".join(picked)
+
+
+def seed(
+    database_url: str,
+    users: int = 200,
+    dreams: int = 5000,
+    tags: int = 300,
+    comments: float = 2.0,
+    zipf: float = 1.1,
+    random_seed: int = 42,
+) -> dict:
+    """Create the schema and fill it; return a summary used by the benchmarks."""
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import sessionmaker
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app.core.tag_normalize import match_key
+    from app.db.base import Base
+    from app.db.models import Comment, Dream, Tag, User, dream_tags
+    from app.db.repository import DreamCardRepository
+
+    started = time.perf_counter()
+    rng = np.random.default_rng(random_seed)
+    if database_url.startswith("sqlite:///"):
+        os.makedirs(os.path.dirname(os.path.abspath(database_url[10:])), exist_ok=True)
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow().replace(microsecond=0)
+
+    names = tag_names(tags)
+    tag_p = zipf_weights(tags, zipf)
+    user_p = zipf_weights(users, zipf)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [
+                {
+                    "id": i + 1,
+                    "email": f"user{i + 1}@example.com",
+                    "given_name": "User",
+                    "family_name": str(i + 1),
+                    "picture": f"https://example.com/u/{i + 1}.png",
+                }
+                for i in range(users)
+            ],
+        )
+        conn.execute(
+            insert(Tag),
+            [
+                {
+                    "id": i + 1,
+                    "name": name,
+                    "match_key": match_key(name),
+                    "description": f"What {name} may mean in a dream.",
+                    "created_at": now - timedelta(days=DAYS),
+                }
+                for i, name in enumerate(names)
+            ],
+        )
+
+        comment_id = 0
+        total_comments = 0
+        for start in range(0, dreams, BATCH):
+            size = min(BATCH, dreams - start)
+            dream_rows, link_rows, comment_rows = [], [], []
+            owners = rng.choice(users, size=size, p=user_p) + 1
+            ages = np.sort(rng.uniform(0, DAYS * 86400, size=size))[::-1]
+            n_tags = rng.integers(1, 5, size=size)
+            # 파레토 꼬리: 대부분 0~2개, 일부 스레드는 수십 개
+            n_comments = np.minimum((rng.pareto(1.5, size=size) * comments).astype(int), 200)
+            for j in range(size):
+                dream_id = start + j + 1
+                created = now - timedelta(seconds=float(ages[j]))
+                chosen = rng.choice(tags, size=n_tags[j], replace=False, p=tag_p)
+                dream_tag_names = [names[t] for t in chosen]
+                replies = 0
+                last_activity = created
+                first_comment = comment_id + 1
+                for k in range(n_comments[j]):
+                    comment_id += 1
+                    at = created + timedelta(minutes=float(rng.exponential(180)) * (k + 1))
+                    parent = None
+                    if k and rng.random() < 0.3:
+                        parent = int(rng.integers(first_comment, comment_id))
+                        replies += 1
+                    comment_rows.append(
+                        {
+                            "id": comment_id,
+                            "dream_id": dream_id,
+                            "parent_id": parent,
+                            "user_id": int(rng.choice(users, p=user_p)) + 1,
+                            "content": _text(rng, 12, []),
+                            "created_at": at,
+                        }
+                    )
+                    last_activity = max(last_activity, at)
+                dream_rows.append(
+                    {
+                        "id": dream_id,
+                        "user_id": int(owners[j]),
+                        "content": _text(rng, 60, dream_tag_names),
+                        "summary": f"A dream about {' and '.join(dream_tag_names)}.",
+                        "analysis": _text(rng, 120, []),
+                        "created_at": created,
+                        "comment_count": int(n_comments[j]),
+                        "reply_count": replies,
+                        "last_activity_at": last_activity,
+                    }
+                )
+                link_rows.extend({"dream_id": dream_id, "tag_id": int(t) + 1} for t in chosen)
+            conn.execute(insert(Dream), dream_rows)
+            conn.execute(insert(dream_tags), link_rows)
+            if comment_rows:
+                conn.execute(insert(Comment), comment_rows)
+            total_comments += len(comment_rows)
+
+    session = sessionmaker(bind=engine)()
+    DreamCardRepository(session).rebuild_all()
+    session.close()
+    engine.dispose()
+    return {
+        "database_url": database_url,
+        "users": users,
+        "dreams": dreams,
+        "tags": tags,
+        "comments": total_comments,
+        "hot_tags": names[:3],
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--dreams", type=int, default=5000)
+    parser.add_argument("--tags", type=int, default=300)
+    parser.add_argument("--comments", type=float, default=2.0, help="comment scale per dream")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for tags/users")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    info = seed(
+        args.database_url,
+        users=args.users,
+        dreams=args.dreams,
+        tags=args.tags,
+        comments=args.comments,
+        zipf=args.zipf,
+        random_seed=args.seed,
+    )
+    print(json.dumps(info, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import auth, dreams, search, tags
-from app.db.base import Base, engine
+from app.api import auth, dreams, search, tags, users
+from app.core import metrics, tracing
 import os
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
+# full: 모든 라우트 / readonly: LLM 라우트를 마운트하지 않는 읽기 전용 워커
+APP_PROFILE = os.getenv("APP_PROFILE", "full").lower()
+
 app = FastAPI()
 
 # Allow Vite dev server origins
@@ -21,23 +25,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Total-Count"],
+    expose_headers=["X-Total-Count", "Server-Timing"],
 )
+app.add_middleware(tracing.TracingMiddleware)
+# 가장 바깥에서 요청 전체 시간을 잼 (쿼리 수/시간, Server-Timing, 느린 요청 로그)
+app.add_middleware(metrics.MetricsMiddleware)
 
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
+if APP_PROFILE != "readonly":
+    app.include_router(dreams.llm_router, prefix="/dreams", tags=["dreams"])
 app.include_router(dreams.router, prefix="/dreams", tags=["dreams"])
 app.include_router(search.router, prefix="/search", tags=["search"])
 app.include_router(tags.router, prefix="/tags", tags=["tags"])
-
-@app.on_event("startup")
-def on_startup():
-    # Ensure DB tables exist
-    Base.metadata.create_all(bind=engine)
+app.include_router(users.router, prefix="/users", tags=["users"])
 
 @app.get("/", tags=["root"])
 def read_root():
     return {"message": "Welcome to DreamScope!"}
 
+if metrics.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    def read_metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,43 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.db.base import Base, engine
+import app.db.models  # noqa: F401  모델을 metadata에 등록
+
+config = context.config
+# serve.py --migrate처럼 이미 로깅을 설정한 호출자는 configure_logger=False로 넘김
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=engine.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite는 ALTER TABLE 지원이 제한적이라 batch 모드로 테이블 재생성
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
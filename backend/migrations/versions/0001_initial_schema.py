@@ -0,0 +1,77 @@
+"""initial schema
+
+Baseline matching the tables previously created by Base.metadata.create_all.
+Tables that already exist (databases bootstrapped by create_all) are left
+untouched, so existing deployments can simply run `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String()),
+            sa.Column("given_name", sa.String()),
+            sa.Column("family_name", sa.String()),
+            sa.Column("picture", sa.String(255), nullable=True),
+        )
+    if "tags" not in existing:
+        op.create_table(
+            "tags",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(64)),
+            sa.Column("description", sa.String()),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_tags_name", "tags", ["name"], unique=True)
+    if "dreams" not in existing:
+        op.create_table(
+            "dreams",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+            sa.Column("content", sa.String()),
+            sa.Column("summary", sa.String(), nullable=True),
+            sa.Column("analysis", sa.String()),
+            sa.Column("created_at", sa.DateTime()),
+        )
+    if "comments" not in existing:
+        op.create_table(
+            "comments",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("dream_id", sa.Integer(), sa.ForeignKey("dreams.id"), nullable=False),
+            sa.Column("parent_id", sa.Integer(), sa.ForeignKey("comments.id"), nullable=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+            sa.Column("content", sa.String()),
+            sa.Column("created_at", sa.DateTime()),
+        )
+    if "dream_tags" not in existing:
+        op.create_table(
+            "dream_tags",
+            sa.Column("dream_id", sa.Integer(), sa.ForeignKey("dreams.id"), primary_key=True),
+            sa.Column("tag_id", sa.Integer(), sa.ForeignKey("tags.id"), primary_key=True),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("dream_tags")
+    op.drop_table("comments")
+    op.drop_table("dreams")
+    op.drop_index("ix_tags_name", table_name="tags")
+    op.drop_table("tags")
+    op.drop_table("users")
@@ -0,0 +1,38 @@
+"""indexes for hot queries
+
+- feed:      ORDER BY dreams.created_at DESC LIMIT/OFFSET
+- memories:  WHERE dreams.user_id = ? ORDER BY created_at DESC
+- comments:  WHERE comments.dream_id = ? ORDER BY created_at
+- replies:   WHERE comments.parent_id = ?
+- tag filter / tag -> dreams: dream_tags(tag_id, dream_id), the reverse of the PK
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_dreams_created_at_id", "dreams", ["created_at", "id"])
+    op.create_index("ix_dreams_user_id_created_at", "dreams", ["user_id", "created_at"])
+    op.create_index(
+        "ix_comments_dream_id_created_at", "comments", ["dream_id", "created_at"]
+    )
+    op.create_index("ix_comments_parent_id", "comments", ["parent_id"])
+    op.create_index("ix_dream_tags_tag_id_dream_id", "dream_tags", ["tag_id", "dream_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dream_tags_tag_id_dream_id", table_name="dream_tags")
+    op.drop_index("ix_comments_parent_id", table_name="comments")
+    op.drop_index("ix_comments_dream_id_created_at", table_name="comments")
+    op.drop_index("ix_dreams_user_id_created_at", table_name="dreams")
+    op.drop_index("ix_dreams_created_at_id", table_name="dreams")
@@ -0,0 +1,101 @@
+"""dream_cards feed read model
+
+Denormalized card per dream (author, tags, comment count) so the feed is a
+single index-ordered scan. Existing dreams are backfilled here.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    cards = op.create_table(
+        "dream_cards",
+        sa.Column("dream_id", sa.Integer(), sa.ForeignKey("dreams.id"), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("content", sa.String()),
+        sa.Column("summary", sa.String(), nullable=True),
+        sa.Column("analysis", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("author_name", sa.String()),
+        sa.Column("author_avatar_url", sa.String(255)),
+        sa.Column("tags", sa.JSON()),
+        sa.Column("comment_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    _backfill(cards)
+    op.create_index(
+        "ix_dream_cards_created_at_dream_id", "dream_cards", ["created_at", "dream_id"]
+    )
+
+
+def _backfill(cards: sa.Table) -> None:
+    bind = op.get_bind()
+    meta = sa.MetaData()
+    dreams = sa.Table("dreams", meta, autoload_with=bind)
+    users = sa.Table("users", meta, autoload_with=bind)
+    tags = sa.Table("tags", meta, autoload_with=bind)
+    dream_tags = sa.Table("dream_tags", meta, autoload_with=bind)
+    comments = sa.Table("comments", meta, autoload_with=bind)
+
+    comment_counts = dict(
+        bind.execute(
+            sa.select(comments.c.dream_id, sa.func.count()).group_by(comments.c.dream_id)
+        ).all()
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(dreams, users.c.given_name, users.c.family_name, users.c.picture)
+            .select_from(dreams.outerjoin(users, users.c.id == dreams.c.user_id))
+            .where(dreams.c.id > last_id)
+            .order_by(dreams.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        ids = [r.id for r in rows]
+        tags_by_dream: dict[int, list[dict]] = {}
+        for dream_id, name, description in bind.execute(
+            sa.select(dream_tags.c.dream_id, tags.c.name, tags.c.description)
+            .join(tags, tags.c.id == dream_tags.c.tag_id)
+            .where(dream_tags.c.dream_id.in_(ids))
+        ):
+            tags_by_dream.setdefault(dream_id, []).append(
+                {"name": name, "description": description}
+            )
+        op.bulk_insert(
+            cards,
+            [
+                {
+                    "dream_id": r.id,
+                    "user_id": r.user_id,
+                    "content": r.content,
+                    "summary": r.summary,
+                    "analysis": r.analysis,
+                    "created_at": r.created_at,
+                    "author_name": f"{r.given_name or ''} {r.family_name or ''}",
+                    "author_avatar_url": r.picture or "",
+                    "tags": tags_by_dream.get(r.id, []),
+                    "comment_count": comment_counts.get(r.id, 0),
+                }
+                for r in rows
+            ],
+        )
+        last_id = ids[-1]
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dream_cards_created_at_dream_id", table_name="dream_cards")
+    op.drop_table("dream_cards")
@@ -0,0 +1,80 @@
+"""dream comment counters
+
+Maintained comment_count / reply_count / last_activity_at on dreams and
+their feed cards, plus the card indexes behind sort=discussed|active.
+Existing rows are backfilled with one aggregate UPDATE per table.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ("dreams", "dream_cards"):
+        op.add_column(
+            table,
+            sa.Column("reply_count", sa.Integer(), nullable=False, server_default="0"),
+        )
+        op.add_column(table, sa.Column("last_activity_at", sa.DateTime(), nullable=True))
+    op.add_column(
+        "dreams",
+        sa.Column("comment_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    _backfill()
+    op.create_index(
+        "ix_dream_cards_comment_count_created_at",
+        "dream_cards",
+        ["comment_count", "created_at"],
+    )
+    op.create_index(
+        "ix_dream_cards_last_activity_at", "dream_cards", ["last_activity_at"]
+    )
+
+
+def _backfill() -> None:
+    bind = op.get_bind()
+    meta = sa.MetaData()
+    dreams = sa.Table("dreams", meta, autoload_with=bind)
+    cards = sa.Table("dream_cards", meta, autoload_with=bind)
+    comments = sa.Table("comments", meta, autoload_with=bind)
+
+    for table, key in ((dreams, dreams.c.id), (cards, cards.c.dream_id)):
+        of_dream = comments.c.dream_id == key
+        bind.execute(
+            table.update().values(
+                comment_count=sa.select(sa.func.count())
+                .where(of_dream)
+                .scalar_subquery(),
+                reply_count=sa.select(sa.func.count(comments.c.parent_id))
+                .where(of_dream)
+                .scalar_subquery(),
+                last_activity_at=sa.func.coalesce(
+                    sa.select(sa.func.max(comments.c.created_at))
+                    .where(of_dream)
+                    .scalar_subquery(),
+                    table.c.created_at,
+                ),
+            )
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dream_cards_last_activity_at", table_name="dream_cards")
+    op.drop_index("ix_dream_cards_comment_count_created_at", table_name="dream_cards")
+    with op.batch_alter_table("dreams") as batch:
+        batch.drop_column("last_activity_at")
+        batch.drop_column("reply_count")
+        batch.drop_column("comment_count")
+    with op.batch_alter_table("dream_cards") as batch:
+        batch.drop_column("last_activity_at")
+        batch.drop_column("reply_count")
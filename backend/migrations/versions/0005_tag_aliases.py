@@ -0,0 +1,55 @@
+"""tag match keys and aliases
+
+tags.match_key groups case/inflection variants of a tag name, and
+tag_aliases maps merged or synonym names to their canonical tag.
+Duplicates already in the table are merged by `python -m app.db.merge_tags`.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.tag_normalize import match_key
+
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("tags", sa.Column("match_key", sa.String(64), nullable=True))
+    bind = op.get_bind()
+    tags = sa.table("tags", sa.column("id", sa.Integer), sa.column("name", sa.String))
+    rows = bind.execute(sa.select(tags.c.id, tags.c.name)).all()
+    if rows:
+        bind.execute(
+            sa.text("UPDATE tags SET match_key = :key WHERE id = :id"),
+            [{"id": r.id, "key": match_key(r.name or "")} for r in rows],
+        )
+    op.create_index("ix_tags_match_key", "tags", ["match_key"])
+
+    op.create_table(
+        "tag_aliases",
+        sa.Column("alias", sa.String(64), primary_key=True),
+        sa.Column(
+            "tag_id",
+            sa.Integer(),
+            sa.ForeignKey("tags.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_tag_aliases_tag_id", "tag_aliases", ["tag_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tag_aliases_tag_id", table_name="tag_aliases")
+    op.drop_table("tag_aliases")
+    op.drop_index("ix_tags_match_key", table_name="tags")
+    with op.batch_alter_table("tags") as batch:
+        batch.drop_column("match_key")
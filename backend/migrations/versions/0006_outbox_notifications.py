@@ -0,0 +1,61 @@
+"""outbox events and in-app notifications
+
+outbox_events holds side effects written in the same transaction as the
+comment that caused them; app.core.outbox dispatches them into
+notifications (the per-user inbox) and optional webhooks.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("topic", sa.String(64), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("claim_token", sa.String(32), nullable=True),
+        sa.Column("locked_until", sa.DateTime(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("dispatched_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        "ix_outbox_events_dispatched_at_id", "outbox_events", ["dispatched_at", "id"]
+    )
+
+    op.create_table(
+        "notifications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("kind", sa.String(32), nullable=False),
+        sa.Column("dream_id", sa.Integer(), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("read_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        "ix_notifications_user_id_updated_at_id",
+        "notifications",
+        ["user_id", "updated_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notifications_user_id_updated_at_id", table_name="notifications")
+    op.drop_table("notifications")
+    op.drop_index("ix_outbox_events_dispatched_at_id", table_name="outbox_events")
+    op.drop_table("outbox_events")
@@ -0,0 +1,29 @@
+"""keyset index for per-user dream history
+
+Extends ix_dreams_user_id_created_at with id so GET /users/me/dreams can
+page on (created_at, id) without a sort step.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_dreams_user_id_created_at_id", "dreams", ["user_id", "created_at", "id"]
+    )
+    op.drop_index("ix_dreams_user_id_created_at", table_name="dreams")
+
+
+def downgrade() -> None:
+    op.create_index("ix_dreams_user_id_created_at", "dreams", ["user_id", "created_at"])
+    op.drop_index("ix_dreams_user_id_created_at_id", table_name="dreams")
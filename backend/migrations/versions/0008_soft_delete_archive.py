@@ -0,0 +1,76 @@
+"""soft delete and dream archive
+
+Adds deleted_at to dreams and comments and turns the hot read indexes
+into partial indexes over live rows (WHERE deleted_at IS NULL), plus
+partial indexes over deleted rows for the purge job. dream_archive
+keeps compressed copies of dreams moved out by `python -m app.db.archive`.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = sa.text("deleted_at IS NULL")
+DELETED = sa.text("deleted_at IS NOT NULL")
+
+# (이름, 테이블, 열)
+LIVE_INDEXES = [
+    ("ix_dreams_created_at_id", "dreams", ["created_at", "id"]),
+    ("ix_dreams_user_id_created_at_id", "dreams", ["user_id", "created_at", "id"]),
+    ("ix_comments_dream_id_created_at", "comments", ["dream_id", "created_at"]),
+    ("ix_comments_parent_id", "comments", ["parent_id"]),
+]
+
+
+def _create(name, table, columns, where=None) -> None:
+    op.create_index(name, table, columns, sqlite_where=where, postgresql_where=where)
+
+
+def upgrade() -> None:
+    op.add_column("dreams", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+    op.add_column("comments", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+    for name, table, columns in LIVE_INDEXES:
+        op.drop_index(name, table_name=table)
+        _create(name, table, columns, LIVE)
+    _create("ix_dreams_deleted_at", "dreams", ["deleted_at"], DELETED)
+    _create("ix_comments_deleted_at", "comments", ["deleted_at"], DELETED)
+
+    op.create_table(
+        "dream_archive",
+        sa.Column("dream_id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("archived_at", sa.DateTime()),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+    )
+    op.create_index("ix_dream_archive_user_id", "dream_archive", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dream_archive_user_id", table_name="dream_archive")
+    op.drop_table("dream_archive")
+    # soft delete된 행은 되돌릴 방법이 없으므로 지우고 나서 열을 없앰
+    op.execute("DELETE FROM comments WHERE deleted_at IS NOT NULL")
+    op.execute(
+        "DELETE FROM dream_tags WHERE dream_id IN (SELECT id FROM dreams WHERE deleted_at IS NOT NULL)"
+    )
+    op.execute("DELETE FROM comments WHERE dream_id IN (SELECT id FROM dreams WHERE deleted_at IS NOT NULL)")
+    op.execute("DELETE FROM dreams WHERE deleted_at IS NOT NULL")
+    op.drop_index("ix_comments_deleted_at", table_name="comments")
+    op.drop_index("ix_dreams_deleted_at", table_name="dreams")
+    for name, table, columns in LIVE_INDEXES:
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, columns)
+    with op.batch_alter_table("comments") as batch:
+        batch.drop_column("deleted_at")
+    with op.batch_alter_table("dreams") as batch:
+        batch.drop_column("deleted_at")
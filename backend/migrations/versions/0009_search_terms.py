@@ -0,0 +1,84 @@
+"""analyzed search index
+
+dream_search_terms is an inverted index (term, dream_id, weight) built
+from app.core.analysis, so GET /search/ reads posting lists instead of
+ILIKE-scanning dream text. Live dreams are indexed here; after changing
+the analyzer rebuild it with `python -m app.db.reindex_search`.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from collections import Counter
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.analysis import analyze
+
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+# SearchIndexRepository.FIELD_WEIGHTS와 같은 값
+TAG_WEIGHT, SUMMARY_WEIGHT, CONTENT_WEIGHT = 3, 2, 1
+
+
+def upgrade() -> None:
+    terms = op.create_table(
+        "dream_search_terms",
+        sa.Column("term", sa.String(64), primary_key=True),
+        sa.Column("dream_id", sa.Integer(), sa.ForeignKey("dreams.id"), primary_key=True),
+        sa.Column("weight", sa.Integer(), nullable=False, server_default="1"),
+    )
+    _backfill(terms)
+    op.create_index("ix_dream_search_terms_dream_id", "dream_search_terms", ["dream_id"])
+
+
+def _backfill(terms: sa.Table) -> None:
+    bind = op.get_bind()
+    meta = sa.MetaData()
+    dreams = sa.Table("dreams", meta, autoload_with=bind)
+    tags = sa.Table("tags", meta, autoload_with=bind)
+    dream_tags = sa.Table("dream_tags", meta, autoload_with=bind)
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(dreams.c.id, dreams.c.content, dreams.c.summary)
+            .where(dreams.c.id > last_id, dreams.c.deleted_at.is_(None))
+            .order_by(dreams.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        ids = [r.id for r in rows]
+        tag_names: dict[int, list[str]] = {}
+        for dream_id, name in bind.execute(
+            sa.select(dream_tags.c.dream_id, tags.c.name)
+            .join(tags, tags.c.id == dream_tags.c.tag_id)
+            .where(dream_tags.c.dream_id.in_(ids))
+        ):
+            tag_names.setdefault(dream_id, []).append(name)
+        postings = []
+        for r in rows:
+            weights: Counter[str] = Counter()
+            for text, weight in (
+                (" ".join(tag_names.get(r.id, [])), TAG_WEIGHT),
+                (r.summary or "", SUMMARY_WEIGHT),
+                (r.content or "", CONTENT_WEIGHT),
+            ):
+                for term in analyze(text):
+                    weights[term] += weight
+            postings.extend({"term": t, "dream_id": r.id, "weight": w} for t, w in weights.items())
+        if postings:
+            op.bulk_insert(terms, postings)
+        last_id = ids[-1]
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dream_search_terms_dream_id", table_name="dream_search_terms")
+    op.drop_table("dream_search_terms")
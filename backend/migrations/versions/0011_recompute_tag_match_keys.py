@@ -0,0 +1,45 @@
+"""recompute tag match keys
+
+match_key now only folds plurals and -ing/-ed forms (it used to strip a
+trailing e, so plane/plan or scared/scar shared a key). Keys written by
+0005 are recomputed with the current rule; tags that now share a key
+are merged by `python -m app.db.merge_tags`.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.tag_normalize import match_key
+
+revision: str = "0011"
+down_revision: Union[str, Sequence[str], None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    tags = sa.table(
+        "tags",
+        sa.column("id", sa.Integer),
+        sa.column("name", sa.String),
+        sa.column("match_key", sa.String),
+    )
+    rows = bind.execute(sa.select(tags.c.id, tags.c.name, tags.c.match_key)).all()
+    changed = [
+        {"id": r.id, "key": key}
+        for r in rows
+        if (key := match_key(r.name or "")) != r.match_key
+    ]
+    if changed:
+        bind.execute(sa.text("UPDATE tags SET match_key = :key WHERE id = :id"), changed)
+
+
+def downgrade() -> None:
+    # 이전 규칙의 키는 다시 만들 수 없음; 새 키로도 조회는 동작함
+    pass
@@ -0,0 +1,275 @@
+"""
+프로덕션 실행 진입점 (pre-fork 멀티 워커)
+- 부모 프로세스가 앱과 공유 읽기 전용 상태(설정, 태그 목록 등)를 미리 로드한 뒤 소켓을 열고 워커를 fork
+- 워커는 같은 리스닝 소켓을 공유하며 uvicorn Server로 요청 처리 (uvloop/httptools 선택 가능)
+- SIGTERM 수신 시 새 연결을 받지 않고, 진행 중인 LLM 요청과 백그라운드 후처리를 마감 시간까지 기다린 뒤 종료
+- 비정상 종료한 워커는 부모가 다시 띄움
+  - 시작 후 WORKER_MIN_UPTIME초 안에 죽으면 연속 실패로 보고 지수 백오프(WORKER_RESTART_BACKOFF ~ _MAX) 뒤 재시작
+  - 같은 슬롯이 WORKER_MAX_QUICK_FAILURES번 연속 바로 죽으면 (잘못된 설정, DB 장애 등) 전체를 내리고 종료 코드 1
+
+    python serve.py --workers 4 --port 8000
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+import uvicorn
+
+logger = logging.getLogger("dreamscope.serve")
+
+WORKER_MIN_UPTIME = float(os.getenv("WORKER_MIN_UPTIME", "10"))
+WORKER_RESTART_BACKOFF = float(os.getenv("WORKER_RESTART_BACKOFF", "1"))
+WORKER_RESTART_BACKOFF_MAX = float(os.getenv("WORKER_RESTART_BACKOFF_MAX", "30"))
+WORKER_MAX_QUICK_FAILURES = int(os.getenv("WORKER_MAX_QUICK_FAILURES", "10"))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="DreamScope production server")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+    )
+    parser.add_argument(
+        "--loop",
+        choices=["auto", "asyncio", "uvloop"],
+        default=os.getenv("UVICORN_LOOP", "auto"),
+    )
+    parser.add_argument(
+        "--http",
+        choices=["auto", "h11", "httptools"],
+        default=os.getenv("UVICORN_HTTP", "auto"),
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=float,
+        default=float(os.getenv("GRACEFUL_TIMEOUT", "30")),
+        help="seconds to drain in-flight requests and LLM jobs after SIGTERM",
+    )
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="run `alembic upgrade head` once in the parent before forking",
+    )
+    parser.add_argument(
+        "--no-preload",
+        dest="preload",
+        action="store_false",
+        help="import the app in each worker instead of once before fork",
+    )
+    return parser.parse_args(argv)
+
+
+def run_migrations() -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    config = Config(os.path.join(backend_dir, "alembic.ini"))
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+
+def preload_shared_state() -> None:
+    """Warm read-only state once in the parent so forked workers share it."""
+    from app.core.related import related_index
+    from app.core.tag_stats import tag_stats
+    from app.core.vocabulary import tag_vocabulary
+    from app.db.base import session_scope
+    from app.db.repository import TagRepository
+
+    try:
+        with session_scope() as db:
+            repo = TagRepository(db)
+            tag_vocabulary.refresh(lambda: [t.name for t in repo.get_all()])
+            tag_stats.load(repo.iter_dream_tags())
+            related_index.load(repo.iter_dream_tags())
+    except Exception:
+        # DB가 아직 준비되지 않았으면 워커가 첫 요청에서 채움
+        logger.warning("shared state preload failed", exc_info=True)
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class _Server(uvicorn.Server):
+    def handle_exit(self, sig, frame) -> None:
+        # 열린 SSE 스트림은 스스로 끝나지 않으므로 먼저 닫아야 graceful shutdown이 기다리지 않음
+        from app.core import pubsub
+
+        pubsub.hub.close_all()
+        super().handle_exit(sig, frame)
+
+
+def run_worker(args, sock: socket.socket) -> None:
+    from app.core import background, outbox, pubsub, tracing
+    from app.core.ratelimit import llm_concurrency
+    from app.db.base import engine
+
+    # fork 이전에 만들어진 커넥션 풀을 자식에서 재사용하지 않도록 분리
+    engine.dispose(close=False)
+    # 댓글 스트림 이벤트를 다른 워커에도 전달 (수신 스레드는 fork 이후에 시작)
+    pubsub.start_transport(engine, args.workers)
+
+    from main import app
+
+    config = uvicorn.Config(
+        app,
+        loop=args.loop,
+        http=args.http,
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    server = _Server(config)
+    if outbox.OUTBOX_DISPATCH_IN_WORKER:
+        outbox.dispatcher.start()
+    try:
+        server.run(sockets=[sock])
+    finally:
+        deadline = time.monotonic() + args.graceful_timeout
+        if not llm_concurrency.wait_idle(max(0.0, deadline - time.monotonic())):
+            logger.warning("worker %s exiting with LLM jobs in flight", os.getpid())
+        if not background.drain(max(0.0, deadline - time.monotonic())):
+            logger.warning("worker %s exiting with background tasks pending", os.getpid())
+        tracing.force_flush(max(0.0, deadline - time.monotonic()))
+
+
+def serve(args) -> int:
+    if args.migrate:
+        run_migrations()
+    if args.preload:
+        import main  # noqa: F401  앱/설정 모듈을 fork 전에 로드
+
+        preload_shared_state()
+
+    sock = bind_socket(args.host, args.port)
+    logger.info(
+        "listening on %s:%s with %s worker(s), loop=%s http=%s",
+        args.host, args.port, args.workers, args.loop, args.http,
+    )
+
+    if args.workers <= 1:
+        run_worker(args, sock)
+        return 0
+
+    children: dict[int, int] = {}
+    started_at: dict[int, float] = {}
+    quick_failures: dict[int, int] = {}
+    # 백오프 중인 슬롯 -> 재시작 시각 (monotonic)
+    restart_at: dict[int, float] = {}
+    stopping = threading.Event()
+    exit_code = 0
+
+    def spawn(slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(args, sock)
+            except Exception:
+                logger.exception("worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = slot
+        started_at[slot] = time.monotonic()
+
+    def kill_stragglers() -> None:
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def handle_stop(signum, frame) -> None:
+        if stopping.is_set():
+            return
+        stopping.set()
+        logger.info("received %s, draining workers", signal.Signals(signum).name)
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        # 마감 시간 + 여유 시간이 지나도 남은 워커는 강제 종료
+        timer = threading.Timer(args.graceful_timeout + 5, kill_stragglers)
+        timer.daemon = True
+        timer.start()
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    for slot in range(args.workers):
+        spawn(slot)
+
+    def schedule_restart(slot: int, pid: int, status: int) -> None:
+        nonlocal exit_code
+        if time.monotonic() - started_at[slot] >= WORKER_MIN_UPTIME:
+            quick_failures[slot] = 0
+        quick_failures[slot] = failures = quick_failures.get(slot, 0) + 1
+        if failures >= WORKER_MAX_QUICK_FAILURES:
+            logger.error(
+                "worker slot %s died %d times in a row within %.0fs of starting; shutting down",
+                slot, failures, WORKER_MIN_UPTIME,
+            )
+            exit_code = 1
+            handle_stop(signal.SIGTERM, None)
+            return
+        delay = 0.0 if failures == 1 else min(
+            WORKER_RESTART_BACKOFF * 2 ** (failures - 2), WORKER_RESTART_BACKOFF_MAX
+        )
+        logger.warning(
+            "worker %s exited (status %s); restarting in %.1fs", pid, status, delay
+        )
+        restart_at[slot] = time.monotonic() + delay
+
+    while children or (restart_at and not stopping.is_set()):
+        if stopping.is_set():
+            restart_at.clear()
+        now = time.monotonic()
+        for slot, at in list(restart_at.items()):
+            if at <= now:
+                del restart_at[slot]
+                spawn(slot)
+        try:
+            # 백오프 중인 슬롯이 있으면 기다리지 않고 확인
+            pid, status = os.waitpid(-1, os.WNOHANG if restart_at else 0)
+        except ChildProcessError:
+            pid = 0
+            if not restart_at:
+                break
+        if pid == 0:
+            time.sleep(0.1)
+            continue
+        slot = children.pop(pid, None)
+        if slot is not None and not stopping.is_set():
+            schedule_restart(slot, pid, status)
+    sock.close()
+    return exit_code
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    return serve(parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())